@@ -21,29 +21,40 @@ from datetime import datetime
 import requests
 import google.generativeai as genai
 import traceback
+from company_catalog import get_catalog
+from llm_quota import PRIORITY_INTERACTIVE, estimate_tokens, get_quota, rate_limit_retry_after
 
 load_dotenv()
 
 # Configure Gemini
 genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+GEMINI_QUESTION_MODEL = 'gemini-2.0-flash-exp'
+# A live turn cannot wait long for quota; past this the canned fallback question is used
+QUESTION_QUOTA_TIMEOUT = float(os.getenv('LLM_QUOTA_QUESTION_TIMEOUT', 15))
+
+
+def generate_question(prompt: str) -> str:
+    """Gemini question text, within the LLM quota shared with the API workers"""
+    quota = get_quota()
+    if quota is not None:
+        quota.acquire('gemini', GEMINI_QUESTION_MODEL, estimate_tokens(prompt),
+                      priority=PRIORITY_INTERACTIVE, timeout=QUESTION_QUOTA_TIMEOUT)
+    try:
+        return genai.GenerativeModel(GEMINI_QUESTION_MODEL).generate_content(prompt).text
+    except Exception as e:
+        # A 429 pauses Gemini for every process instead of each one retrying into it
+        retry_after = rate_limit_retry_after(e)
+        if retry_after is not None and quota is not None:
+            quota.backoff('gemini', GEMINI_QUESTION_MODEL, retry_after)
+        raise
  
 
 def get_company_info(company_name: str):
-    """Fetch company interview context from local JSON."""
-    file_path = os.path.join(os.getcwd(), "company_data.json")
-    if not os.path.exists(file_path):
-        print(f"⚠️ company_data.json not found at {file_path}")
-        return None
-
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    for segment in data:
-        for company in segment.get("companies", []):
-            if company["name"].lower() == company_name.lower():
-                return company
-    print(f"⚠️ No entry found for {company_name}")
-    return None
+    """Fetch company interview context from the shared company catalog."""
+    company = get_catalog().get(company_name)
+    if company is None:
+        print(f"⚠️ No entry found for {company_name}")
+    return company
 
 # Interview state management
 class InterviewState:
@@ -162,8 +173,6 @@ class InterviewState:
             return "That concludes our resume-based interview."
         
         try:
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            
             resume_projects = self.resume_data.get('projects', [])
             resume_skills = self.resume_data.get('skills', [])
             resume_certifications = self.resume_data.get('certifications', [])
@@ -205,8 +214,7 @@ IMPORTANT RULES:
 
 Return ONLY the question text, nothing else."""
 
-            response = model.generate_content(prompt)
-            question = response.text.strip().strip('"').strip("'")
+            question = generate_question(prompt).strip().strip('"').strip("'")
             
             print(f"Generated Resume/JD question: {question}")
             return question
@@ -242,8 +250,6 @@ Return ONLY the question text, nothing else."""
             return "That concludes our company-specific interview."
         
         try:
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            
             company_name = self.company_name
             interview_style = self.company_info.get('interview_style', '')
             focus_areas = self.company_info.get('focus_areas', '')
@@ -295,8 +301,7 @@ QUESTION SHOULD BE:
 
 Return ONLY the question text in {company_name}'s interview style, nothing else."""
 
-            response = model.generate_content(prompt)
-            question = response.text.strip().strip('"').strip("'")
+            question = generate_question(prompt).strip().strip('"').strip("'")
             
             print(f"✅ Generated {company_name}-specific question: {question}")
             return question
@@ -613,7 +618,8 @@ This will take about 15-20 minutes. Take your time with your responses and feel
 
     # Ask 5 questions
     for i in range(5):
-        question = state.get_next_question()
+        # Off the event loop: waiting for quota or Gemini must not stall the live session
+        question = await asyncio.to_thread(state.get_next_question)
         state.current_question = question
         await session.generate_reply(instructions=f"Ask this question naturally: {question}")
         await asyncio.sleep(5)
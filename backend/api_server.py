@@ -1,8 +1,8 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 from database import DatabaseManager
-from parser import extract_text_from_pdf
-from jd_parser import process_job_description
+from parser import extract_text_from_pdf, PARSER_VERSION as RESUME_PARSER_VERSION
+from jd_parser import process_job_description, PARSER_VERSION as JD_PARSER_VERSION
 import hashlib
 import os
 from dotenv import load_dotenv
@@ -11,14 +11,40 @@ import traceback
 from livekit import api
 import datetime
 import json
-from report_generator import InterviewReportGenerator
+from report_generator import InterviewReportGenerator, REPORT_RESUME_KEYS, REPORT_JD_KEYS
+from session_store import create_session_store
+from job_queue import FINISHED_STATUSES, JobQueue, PermanentJobError, job_status_payload
+from notifier import Notifier
+from company_catalog import get_catalog
+from response_cache import ResponseCache, make_etag
+from embedding_provider import EMBEDDING_ID, cache_stats as embedding_cache_stats, warm_up
+from parse_cache import ParseCache
+from upload_store import UploadStore
+from document_text import UnsupportedDocumentError, detect_format
+from llm_quota import get_quota
 
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
-interview_data_store = {}
+# Q&A + transcript posted by the agent, kept until the report is generated
+interview_store = create_session_store()
 timeout_interviews = set()  # Track which interviews timed out
+# Background jobs (report generation) - table shared by all workers on this host
+JOB_QUEUE_PATH = os.getenv('JOB_QUEUE_PATH', os.path.join('data', 'jobs.db'))
+job_queue = JobQueue(
+    JOB_QUEUE_PATH,
+    workers=int(os.getenv('JOB_WORKERS', 2)),
+    max_attempts=int(os.getenv('JOB_MAX_ATTEMPTS', 3)),
+    retention=float(os.getenv('JOB_RETENTION_DAYS', 7)) * 86400
+)
+# Upload parsing gets its own workers on the same table so slow report jobs never hold up uploads
+parse_queue = JobQueue(
+    JOB_QUEUE_PATH,
+    workers=int(os.getenv('PARSE_WORKERS', 2)),
+    max_attempts=int(os.getenv('JOB_MAX_ATTEMPTS', 3)),
+    retention=float(os.getenv('JOB_RETENTION_DAYS', 7)) * 86400
+)
 # Database configuration
 db_config = {
     'host': os.getenv('DB_HOST', 'localhost'),
@@ -28,7 +54,36 @@ db_config = {
     'port': int(os.getenv('DB_PORT', 5432))
 }
 
-db = DatabaseManager(db_config)
+db = DatabaseManager(
+    db_config,
+    pool_min=int(os.getenv('DB_POOL_MIN', 1)),
+    pool_max=int(os.getenv('DB_POOL_MAX', 10)),
+    checkout_timeout=float(os.getenv('DB_POOL_TIMEOUT', 10)),
+    max_idle=float(os.getenv('DB_POOL_MAX_IDLE', 300)),
+    max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', 3600)),
+)
+
+# Wakes report jobs as soon as the agent's data lands (LISTEN/NOTIFY reaches other workers)
+EVENT_BACKEND = os.getenv('EVENT_BACKEND', 'postgres').lower()
+notifier = Notifier(db if EVENT_BACKEND == 'postgres' else None)
+REPORT_DATA_WAIT_SECONDS = float(os.getenv('REPORT_DATA_WAIT_SECONDS', 20))
+
+# Serialized bodies for the per-user read endpoints; dropped in every worker when that user's data changes.
+# That needs EVENT_BACKEND=postgres: otherwise only the worker that made the change drops its copy and
+# the others serve the old body until RESPONSE_CACHE_TTL, so the default TTL is then kept short
+response_cache = ResponseCache(ttl_seconds=float(
+    os.getenv('RESPONSE_CACHE_TTL', 300 if EVENT_BACKEND == 'postgres' else 5)))
+db.add_change_listener(lambda entity, user_id: notifier.publish('user_data', user_id))
+notifier.subscribe('user_data', lambda user_id: response_cache.invalidate(key=user_id))
+# Lets status endpoints in any worker wake the moment a job finishes
+job_queue.add_finish_listener(lambda job: notifier.publish('job', job['job_id']))
+parse_queue.add_finish_listener(lambda job: notifier.publish('job', job['job_id']))
+
+# Parsed uploads keyed by file hash + parser version; identical re-uploads skip parsing
+parse_cache = ParseCache(
+    os.getenv('PARSE_CACHE_PATH', os.path.join('data', 'parse_cache.db')),
+    memory_entries=int(os.getenv('PARSE_CACHE_MEMORY_ENTRIES', 256))
+)
 
 # LiveKit configuration
 LIVEKIT_API_KEY = os.getenv('LIVEKIT_API_KEY')
@@ -47,57 +102,109 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['REPORTS_FOLDER'] = REPORTS_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
 
+# Upload bytes are handed to the parse job in memory; the original file is written in the
+# background (UPLOAD_PERSIST=false skips keeping it, and only spools it for retries and
+# crash recovery in other workers)
+upload_store = UploadStore(
+    UPLOAD_FOLDER,
+    persist=os.getenv('UPLOAD_PERSIST', 'true').lower() == 'true',
+    buffer_ttl=float(os.getenv('UPLOAD_BUFFER_TTL', 600)),
+    spool_folder=os.getenv('UPLOAD_SPOOL_DIR', os.path.join('data', 'upload_spool'))
+)
+parse_queue.add_finish_listener(
+    lambda job: upload_store.release(f"{job['kind'][len('parse_'):]}:{job['payload']['id']}"))
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def load_company_data():
-    """Load company data from JSON file"""
-    try:
-        company_file = os.path.join(os.getcwd(), 'company_data.json')
-        if not os.path.exists(company_file):
-            print(f"⚠️ company_data.json not found at {company_file}")
-            return []
-        
-        with open(company_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"❌ Error loading company data: {e}")
-        return []
-
-
 # Initialize report generator
 report_gen = InterviewReportGenerator()
 
+# Load the embedding model up front (with gunicorn --preload the workers share these pages)
+if os.getenv('EMBEDDING_WARMUP', 'false').lower() == 'true':
+    warm_up()
+
+@app.before_request
+def start_background_workers():
+    # Started per serving process (not at import) so forked/reloaded workers get their own threads
+    job_queue.start()
+    parse_queue.start()
+    notifier.start()
+
+
+def conditional_json(body: str, status: int, etag: str = None, cache_control: str = 'private, no-cache'):
+    """JSON response with an ETag; answers 304 when the client's If-None-Match still matches"""
+    response = Response(body, status=status, mimetype='application/json')
+    response.set_etag(etag or make_etag(body))
+    response.headers['Cache-Control'] = cache_control
+    return response.make_conditional(request)
+
+
+def cached_user_json(namespace: str, user_id: int, build):
+    """Serve build() -> (payload, status) for a user from response_cache"""
+    def serialize():
+        payload, status = build()
+        return app.json.dumps(payload), status
+
+    body, status, etag = response_cache.get_or_build(namespace, user_id, serialize)
+    return conditional_json(body, status, etag)
+
+
 # ==================== HEALTH CHECK ====================
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy', 'message': 'API is running'}), 200
 
 
+@app.route('/api/metrics/db-pool', methods=['GET'])
+def db_pool_metrics():
+    """Connection pool usage for this worker process"""
+    return jsonify({'success': True, 'pool': db.pool_stats()}), 200
+
+
+@app.route('/api/metrics/jobs', methods=['GET'])
+def job_metrics():
+    """Background job counts by status"""
+    return jsonify({
+        'success': True,
+        'jobs': job_queue.stats(),
+        'parse_jobs': parse_queue.stats(),
+        'uploads': upload_store.stats(),
+        'events': notifier.stats()
+    }), 200
+
+
+@app.route('/api/metrics/response-cache', methods=['GET'])
+def response_cache_metrics():
+    """Hit/miss counts for cached read endpoints in this worker process"""
+    return jsonify({'success': True, 'cache': response_cache.stats(), 'parse_cache': parse_cache.stats()}), 200
+
+
+@app.route('/api/metrics/embeddings', methods=['GET'])
+def embedding_metrics():
+    """Embedding cache hit rate in this worker process (misses are model forward passes)"""
+    return jsonify({'success': True, 'embedding_cache': embedding_cache_stats()}), 200
+
+
+@app.route('/api/metrics/llm', methods=['GET'])
+def llm_metrics():
+    """Shared LLM quota (bucket levels and queues across processes) and this worker's LLM client"""
+    quota = get_quota()
+    return jsonify({
+        'success': True,
+        'quota': quota.stats() if quota is not None else None,
+        'client': report_gen.llm.stats()
+    }), 200
+
+
 # ==================== COMPANY ENDPOINTS ====================
 @app.route('/api/companies', methods=['GET'])
 def get_companies():
     """Get list of all available companies"""
     try:
-        company_data = load_company_data()
-        
-        companies_list = []
-        for segment in company_data:
-            segment_name = segment.get('segment', 'Unknown')
-            for company in segment.get('companies', []):
-                companies_list.append({
-                    'name': company.get('name'),
-                    'segment': segment_name,
-                    'interview_style': company.get('interview_style'),
-                    'focus_areas': company.get('focus_areas')
-                })
-        
-        return jsonify({
-            'success': True,
-            'companies': companies_list,
-            'total': len(companies_list)
-        }), 200
+        body, etag = get_catalog().companies_json()
+        return conditional_json(body, 200, etag, cache_control='public, max-age=60')
         
     except Exception as e:
         print(f"Get companies error: {str(e)}")
@@ -109,22 +216,10 @@ def get_companies():
 def get_company_details(company_name):
     """Get detailed information about a specific company"""
     try:
-        company_data = load_company_data()
-        
-        for segment in company_data:
-            for company in segment.get('companies', []):
-                if company.get('name', '').lower() == company_name.lower():
-                    return jsonify({
-                        'success': True,
-                        'company': {
-                            'name': company.get('name'),
-                            'segment': segment.get('segment'),
-                            'interview_style': company.get('interview_style'),
-                            'focus_areas': company.get('focus_areas'),
-                            'question_tone': company.get('question_tone'),
-                            'keywords': company.get('keywords', [])
-                        }
-                    }), 200
+        cached = get_catalog().company_json(company_name)
+        if cached is not None:
+            body, etag = cached
+            return conditional_json(body, 200, etag, cache_control='public, max-age=60')
         
         return jsonify({
             'success': False,
@@ -200,103 +295,219 @@ def login():
         return jsonify({'success': False, 'error': 'Login failed'}), 500
 
 
-# ==================== RESUME UPLOAD ====================
+# ==================== RESUME / JD UPLOAD ====================
+UPLOAD_KINDS = {
+    # kind -> (form field, id key in responses, short name, display name)
+    'resume': ('resume', 'resume_id', 'resume', 'Resume'),
+    'jd': ('jd', 'jd_id', 'JD', 'Job description'),
+}
+
+
+def parser_version(kind):
+    if kind == 'resume':
+        return RESUME_PARSER_VERSION
+    # Header classification depends on the embedding model, so it is part of the version
+    return f"{JD_PARSER_VERSION}:{EMBEDDING_ID}"
+
+
+def parse_document(kind, source):
+    """Parse a file path or the uploaded bytes"""
+    if kind == 'resume':
+        return dict(extract_text_from_pdf(source))
+    return process_job_description(source)
+
+
+def accept_upload(kind):
+    """
+    Read the upload into memory and store its row right away. Files seen before are answered
+    from the parse cache; anything else is parsed from the held bytes by a background job this
+    worker runs, polled via status_url. The original file is written to disk off the request path.
+    """
+    field, id_key, noun, label = UPLOAD_KINDS[kind]
+    user_id = request.form.get('user_id')
+    
+    if not user_id:
+        return jsonify({'success': False, 'error': 'User ID required'}), 400
+    
+    if field not in request.files:
+        return jsonify({'success': False, 'error': f'No {noun} file provided'}), 400
+    
+    file = request.files[field]
+    
+    if file.filename == '':
+        return jsonify({'success': False, 'error': 'No file selected'}), 400
+    
+    if not allowed_file(file.filename):
+        return jsonify({'success': False, 'error': 'Invalid file type. Please upload a PDF or DOCX file'}), 400
+    
+    filename = f"{kind}_{user_id}_{secure_filename(file.filename)}"
+    filepath = upload_store.path_for(filename)
+    data = file.read()
+    try:
+        # By content, not extension: catches legacy .doc and renamed files before anything is stored
+        detect_format(data)
+    except UnsupportedDocumentError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    upload_store.save_async(filepath, data)
+    
+    store = db.store_resume if kind == 'resume' else db.store_jd
+    parsed_data = parse_cache.lookup(kind, parser_version(kind), data)
+    if parsed_data is not None:
+        doc_id = store(int(user_id), parsed_data, filepath)
+        return jsonify({
+            'success': True,
+            id_key: doc_id,
+            'status': 'parsed',
+            'parsed_data': parsed_data,
+            'cache_hit': True,
+            'message': f'{label} uploaded and parsed successfully'
+        }), 200
+    
+    # Row exists immediately (same shape, empty parsed_data) and is filled in by the parse job
+    doc_id = store(int(user_id), {}, filepath)
+    upload_store.hold(f"{kind}:{doc_id}", data, filepath)
+    # This worker runs the job from the bytes in memory; only retries, and jobs left behind by
+    # a crashed worker, go through the shared queue (and read the file back)
+    job = parse_queue.claim(f'parse_{kind}', {'id': doc_id, 'file_path': filepath},
+                            dedupe_key=str(doc_id), max_attempts=parse_queue.max_attempts)
+    if not job['deduplicated']:
+        parse_queue.run_claimed(job)
+    print(f"📥 {label} {doc_id} uploaded; parsing in job {job['job_id']}")
+    
+    return jsonify({
+        'success': True,
+        id_key: doc_id,
+        'status': 'pending',
+        'cache_hit': False,
+        'job_id': job['job_id'],
+        'status_url': f"/api/parse-status/{kind}/{doc_id}",
+        'message': f'{label} uploaded; parsing in progress'
+    }), 202
+
+
+def run_parse_job(kind, payload):
+    """Background job: parse an uploaded file and fill in its stored row"""
+    data = upload_store.read(f"{kind}:{payload['id']}", payload['file_path'])
+    if data is None:
+        # Not in this worker's memory, and the background write of the spooled or permanent
+        # copy has not landed (or failed); the retry backoff gives it time
+        raise RuntimeError(f"Upload for {kind} {payload['id']} is not available in this worker")
+    
+    try:
+        parsed_data, cache_hit = parse_cache.get_or_parse(
+            kind, parser_version(kind), data, lambda: parse_document(kind, data)
+        )
+    except UnsupportedDocumentError as e:
+        # The same bytes fail the same way on every attempt
+        raise PermanentJobError(str(e)) from e
+    update = db.update_resume_parsed_data if kind == 'resume' else db.update_jd_parsed_data
+    if not update(payload['id'], parsed_data):
+        raise PermanentJobError(f"{kind} {payload['id']} no longer exists")
+    
+    return {'kind': kind, 'id': payload['id'], 'cache_hit': cache_hit}
+
+
+parse_queue.register('parse_resume', lambda payload: run_parse_job('resume', payload))
+parse_queue.register('parse_jd', lambda payload: run_parse_job('jd', payload))
+
+
 @app.route('/api/upload-resume', methods=['POST'])
 def upload_resume():
     try:
-        user_id = request.form.get('user_id')
-        
-        if not user_id:
-            return jsonify({'success': False, 'error': 'User ID required'}), 400
-        
-        if 'resume' not in request.files:
-            return jsonify({'success': False, 'error': 'No resume file provided'}), 400
-        
-        file = request.files['resume']
-        
-        if file.filename == '':
-            return jsonify({'success': False, 'error': 'No file selected'}), 400
-        
-        if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            filename = f"resume_{user_id}_{filename}"
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-            
-            parsed_data = extract_text_from_pdf(filepath)
-            resume_id = db.store_resume(int(user_id), dict(parsed_data), filepath)
-            
-            return jsonify({
-                'success': True,
-                'resume_id': resume_id,
-                'parsed_data': dict(parsed_data),
-                'message': 'Resume uploaded and parsed successfully'
-            }), 200
-        
-        return jsonify({'success': False, 'error': 'Invalid file type. Please upload PDF'}), 400
-        
+        return accept_upload('resume')
     except Exception as e:
         print(f"Resume upload error: {str(e)}")
         traceback.print_exc()
         return jsonify({'success': False, 'error': f'Upload failed: {str(e)}'}), 500
 
 
-# ==================== JOB DESCRIPTION UPLOAD ====================
 @app.route('/api/upload-jd', methods=['POST'])
 def upload_jd():
     try:
-        user_id = request.form.get('user_id')
-        
-        if not user_id:
-            return jsonify({'success': False, 'error': 'User ID required'}), 400
-        
-        if 'jd' not in request.files:
-            return jsonify({'success': False, 'error': 'No JD file provided'}), 400
-        
-        file = request.files['jd']
-        
-        if file.filename == '':
-            return jsonify({'success': False, 'error': 'No file selected'}), 400
+        return accept_upload('jd')
+    except Exception as e:
+        print(f"JD upload error: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Upload failed: {str(e)}'}), 500
+
+
+@app.route('/api/parse-status/<kind>/<int:doc_id>', methods=['GET'])
+def parse_status(kind, doc_id):
+    """
+    Parse state of an upload. With ?wait=N (seconds, max 30) the request is held until the
+    parse finishes or N seconds pass, instead of the client polling.
+    """
+    if kind not in UPLOAD_KINDS:
+        return jsonify({'success': False, 'error': f'Unknown upload type {kind}'}), 404
+    id_key = UPLOAD_KINDS[kind][1]
+    
+    try:
+        wait = min(max(float(request.args.get('wait', 0)), 0), 30)
+        job = parse_queue.find(f'parse_{kind}', str(doc_id))
         
-        if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            filename = f"jd_{user_id}_{filename}"
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
+        if job is not None and job['status'] not in FINISHED_STATUSES and wait > 0:
+            job_id = job['job_id']
             
-            parsed_data = process_job_description(filepath)
-            jd_id = db.store_jd(int(user_id), parsed_data, filepath)
+            def finished_job():
+                current = parse_queue.get(job_id)
+                return current if current and current['status'] in FINISHED_STATUSES else None
             
+            job = notifier.wait_for('job', job_id, finished_job, timeout=wait) or parse_queue.get(job_id)
+        
+        if job is not None and job['status'] == 'failed':
             return jsonify({
-                'success': True,
-                'jd_id': jd_id,
-                'parsed_data': parsed_data,
-                'message': 'Job description uploaded and parsed successfully'
-            }), 200
+                'success': False,
+                id_key: doc_id,
+                'status': 'failed',
+                'error': f"Parsing failed: {job['error']}"
+            }), 500
         
-        return jsonify({'success': False, 'error': 'Invalid file type. Please upload PDF'}), 400
+        if job is not None and job['status'] != 'succeeded':
+            return jsonify({
+                'success': True,
+                id_key: doc_id,
+                'status': 'pending' if job['status'] == 'queued' else 'processing',
+                'cache_hit': False,
+                'job': job_status_payload(job)
+            }), 202
+        
+        # Parsed (or stored before uploads were asynchronous)
+        row = db.get_resume(doc_id) if kind == 'resume' else db.get_jd(doc_id)
+        if not row:
+            return jsonify({'success': False, 'error': f'{kind} {doc_id} not found'}), 404
+        return jsonify({
+            'success': True,
+            id_key: doc_id,
+            'status': 'parsed',
+            'parsed_data': row['parsed_data'],
+            # From the parse job; uploads answered from the cache at upload time have no job
+            'cache_hit': bool(job and (job['result'] or {}).get('cache_hit'))
+        }), 200
         
     except Exception as e:
-        print(f"JD upload error: {str(e)}")
+        print(f"Parse status error: {str(e)}")
         traceback.print_exc()
-        return jsonify({'success': False, 'error': f'Upload failed: {str(e)}'}), 500
+        return jsonify({'success': False, 'error': 'Failed to get parse status'}), 500
 
 
 # ==================== GET USER DATA ====================
 @app.route('/api/user-resume/<int:user_id>', methods=['GET'])
 def get_user_resume(user_id):
     try:
-        resume = db.get_latest_resume(user_id)
-        if resume:
-            return jsonify({
-                'success': True,
-                'resume': {
-                    'resume_id': resume['resume_id'],
-                    'uploaded_at': str(resume['uploaded_at']),
-                    'parsed_data': resume['parsed_data']
-                }
-            }), 200
-        return jsonify({'success': False, 'error': 'No resume found'}), 404
+        def build():
+            resume = db.get_latest_resume(user_id)
+            if resume:
+                return {
+                    'success': True,
+                    'resume': {
+                        'resume_id': resume['resume_id'],
+                        'uploaded_at': str(resume['uploaded_at']),
+                        'parsed_data': resume['parsed_data']
+                    }
+                }, 200
+            return {'success': False, 'error': 'No resume found'}, 404
+        
+        return cached_user_json('user-resume', user_id, build)
     except Exception as e:
         print(f"Get resume error: {str(e)}")
         traceback.print_exc()
@@ -306,17 +517,20 @@ def get_user_resume(user_id):
 @app.route('/api/user-jd/<int:user_id>', methods=['GET'])
 def get_user_jd(user_id):
     try:
-        jd = db.get_latest_jd(user_id)
-        if jd:
-            return jsonify({
-                'success': True,
-                'jd': {
-                    'jd_id': jd['jd_id'],
-                    'uploaded_at': str(jd['uploaded_at']),
-                    'parsed_data': jd['parsed_data']
-                }
-            }), 200
-        return jsonify({'success': False, 'error': 'No JD found'}), 404
+        def build():
+            jd = db.get_latest_jd(user_id)
+            if jd:
+                return {
+                    'success': True,
+                    'jd': {
+                        'jd_id': jd['jd_id'],
+                        'uploaded_at': str(jd['uploaded_at']),
+                        'parsed_data': jd['parsed_data']
+                    }
+                }, 200
+            return {'success': False, 'error': 'No JD found'}, 404
+        
+        return cached_user_json('user-jd', user_id, build)
     except Exception as e:
         print(f"Get JD error: {str(e)}")
         traceback.print_exc()
@@ -352,11 +566,10 @@ def create_interview():
 @app.route('/api/user-interviews/<int:user_id>', methods=['GET'])
 def get_user_interviews(user_id):
     try:
-        interviews = db.get_user_interviews(user_id)
-        return jsonify({
+        return cached_user_json('user-interviews', user_id, lambda: ({
             'success': True,
-            'interviews': interviews
-        }), 200
+            'interviews': db.get_user_interviews(user_id)
+        }, 200))
     except Exception as e:
         print(f"Get interviews error: {str(e)}")
         traceback.print_exc()
@@ -461,7 +674,7 @@ def interview_complete():
 # ==================== SAVE INTERVIEW DATA ====================
 @app.route('/api/save-interview-qa', methods=['POST'])
 def save_interview_qa():
-    """Store Q&A pairs in memory - NO DATABASE"""
+    """Store Q&A pairs in the interview session store - NO DATABASE"""
     try:
         data = request.json
         if not data:
@@ -475,22 +688,21 @@ def save_interview_qa():
         if not interview_id:
             return jsonify({'success': False, 'error': 'Missing interview_id'}), 400
 
-        print(f"\n💾 Storing Interview Data IN MEMORY:")
+        print(f"\n💾 Storing Interview Data in session store:")
         print(f"  Interview ID: {interview_id}")
         print(f"  Company: {company_name if company_name else 'N/A'}")
         print(f"  Q&A Pairs: {len(qa_pairs)}")
         print(f"  Conversation History: {len(conversation_history.get('items', [])) if conversation_history else 0} messages")
 
-        # Store in memory
-        global interview_data_store
-        interview_data_store[str(interview_id)] = {
+        interview_store.put(str(interview_id), {
             'qa_pairs': qa_pairs,
             'conversation_history': conversation_history,
             'company_name': company_name,  # NEW: Store company name
             'timestamp': datetime.datetime.now().isoformat()
-        }
+        })
+        notifier.publish('interview_data', interview_id)
 
-        print(f"  ✅ Stored in memory successfully!")
+        print(f"  ✅ Stored successfully!")
 
         return jsonify({
             'success': True,
@@ -507,12 +719,11 @@ def save_interview_qa():
 # ==================== CHECK INTERVIEW DATA ====================
 @app.route('/api/check-interview-data/<int:interview_id>', methods=['GET'])
 def check_interview_data(interview_id):
-    """Check if interview data is available in memory (non-blocking)"""
+    """Check if interview data is available in the session store (non-blocking)"""
     try:
-        interview_id_str = str(interview_id)
+        stored_data = interview_store.get(str(interview_id))
         
-        if interview_id_str in interview_data_store:
-            stored_data = interview_data_store[interview_id_str]
+        if stored_data:
             qa_pairs = stored_data.get('qa_pairs', [])
             conversation_history = stored_data.get('conversation_history', {})
             
@@ -532,7 +743,7 @@ def check_interview_data(interview_id):
                 'data_available': False,
                 'interview_id': interview_id,
                 'message': 'Interview data not yet available',
-                'stored_interviews': list(interview_data_store.keys())
+                'stored_interviews': interview_store.keys()
             }), 200
             
     except Exception as e:
@@ -545,107 +756,254 @@ def check_interview_data(interview_id):
 
 
 # ==================== GENERATE REPORT (UPDATED FOR COMPANY-SPECIFIC) ====================
+def load_report_inputs(interview_id):
+    """Q&A, transcript and interview context for a report (PermanentJobError if missing)"""
+    interview_id_str = str(interview_id)
+    
+    # Wake as soon as the agent's Q&A data is saved (or give up at the deadline)
+    def qa_ready():
+        stored = interview_store.get(interview_id_str)
+        return stored if stored and stored.get('qa_pairs') else None
+
+    stored_data = qa_ready()
+    if not stored_data:
+        print(f"  ⏳ Waiting up to {REPORT_DATA_WAIT_SECONDS:.0f}s for interview data...")
+        stored_data = notifier.wait_for('interview_data', interview_id, qa_ready,
+                                        timeout=REPORT_DATA_WAIT_SECONDS)
+        stored_data = stored_data or interview_store.get(interview_id_str)
+
+    if not stored_data:
+        print(f"  ❌ No data found in session store for interview {interview_id}")
+        raise PermanentJobError('Interview data not found. Please complete the interview first.')
+    
+    qa_pairs = stored_data.get('qa_pairs', [])
+    full_transcript = stored_data.get('conversation_history') or {}
+    company_name = stored_data.get('company_name')  # NEW
+    
+    print(f"  ✅ Data retrieved from session store")
+    print(f"  Company: {company_name if company_name else 'N/A'}")
+    print(f"  Q&A Pairs: {len(qa_pairs)}")
+    print(f"  Transcript Items: {len(full_transcript.get('items', []))}")
+    
+    if not qa_pairs or len(qa_pairs) == 0:
+        raise PermanentJobError('No Q&A data found')
+    
+    # Interview metadata, resume/JD and user name in a single query
+    interview = db.get_report_context(
+        interview_id,
+        resume_keys=REPORT_RESUME_KEYS,
+        jd_keys=REPORT_JD_KEYS
+    )
+    
+    if not interview:
+        raise PermanentJobError('Interview not found')
+    
+    print(f"  Interview Type: {interview['interview_type']}")
+    
+    resume_data = interview.get('resume_data')
+    jd_data = interview.get('jd_data')
+    
+    print(f"  Resume Data: {'✓' if resume_data else '✗'}")
+    print(f"  JD Data: {'✓' if jd_data else '✗'}")
+    
+    return {
+        'interview_type': interview['interview_type'],
+        'qa_pairs': qa_pairs,
+        'resume_data': resume_data,
+        'jd_data': jd_data,
+        'full_transcript': full_transcript,
+        'company_name': company_name
+    }
+
+
+def finish_report(interview_id, inputs, report_data):
+    """Render the PDF, drop the session data and build the result body"""
+    interview_id_str = str(interview_id)
+    qa_pairs = inputs['qa_pairs']
+    full_transcript = inputs['full_transcript']
+    company_name = inputs['company_name']
+    
+    # Generate PDF
+    print("📄 Creating PDF report...")
+    pdf_filename = f"interview_report_{interview_id}.pdf"
+    pdf_path = os.path.join(app.config['REPORTS_FOLDER'], pdf_filename)
+    
+    report_gen.create_pdf_report(report_data, pdf_path)
+    
+    print(f"✓ PDF created: {pdf_path}")
+    
+    # Clean up stored session after successful report generation (a fallback report keeps it,
+    # so the report can be generated again once the LLM is back)
+    if not report_data.get('is_fallback') and interview_store.delete(interview_id_str):
+        print(f"🗑️ Cleaned up session data for interview {interview_id}")
+    
+    return {
+        'success': True,
+        'message': 'Report generated successfully',
+        'report_data': report_data,
+        'pdf_path': pdf_filename,
+        'interview_id': interview_id,
+        'company_name': company_name,  # NEW
+        'qa_count': len(qa_pairs),
+        'transcript_items': len(full_transcript.get('items', []))
+    }
+
+
+def run_report_job(payload):
+    """Background job: build the report from the session store, then render the PDF"""
+    interview_id = payload['interview_id']
+    print(f"\n📊 Generating Report for Interview {interview_id}...")
+    inputs = load_report_inputs(interview_id)
+    
+    # Generate report using LLM
+    print("🤖 Calling LLM to generate comprehensive report...")
+    report_data = report_gen.generate_report(**inputs)  # company_name included
+    if report_data.get('is_fallback'):
+        # Raised rather than returned: the queue retries with backoff, and a fallback report
+        # never becomes the succeeded result that dedupe keeps serving
+        raise RuntimeError(f"LLM report generation failed: {report_data.get('fallback_reason') or 'unusable response'}")
+    
+    print("✓ Report data generated by LLM")
+    return finish_report(interview_id, inputs, report_data)
+
+
+job_queue.register('report', run_report_job)
+
+
+def report_job_response(job, status_code=200):
+    """Status payload for a report job, with links for polling"""
+    return jsonify({
+        'success': True,
+        'job': job_status_payload(job),
+        'interview_id': job['payload'].get('interview_id'),
+        'status_url': f"/api/report-jobs/{job['job_id']}",
+        'result_url': f"/api/report-jobs/{job['job_id']}/result"
+    }), status_code
+
+
 @app.route('/api/generate-report/<int:interview_id>', methods=['POST'])
 def generate_report(interview_id):
-    """Generate report directly from memory - NO DATABASE RETRIEVAL"""
+    """Queue report generation; poll the returned job for the result"""
     try:
-        print(f"\n📊 Generating Report for Interview {interview_id}...")
-        
-        # Get data from memory
-        interview_id_str = str(interview_id)
-        if interview_id_str not in interview_data_store:
-            print(f"  ❌ No data found in memory for interview {interview_id}")
-            return jsonify({'success': False, 'error': 'Interview data not found. Please complete the interview first.'}), 404
-        
-        # Wait up to ~20s for in-memory data to appear
-        import time
-        start = time.time()
-        timeout = 20
-        while time.time() - start < timeout:
-            stored = interview_data_store.get(interview_id_str)
-            if stored and stored.get('qa_pairs'):
-                break
-            print("  ⏳ Waiting for in-memory interview data...")
-            time.sleep(1)
-
-        stored_data = interview_data_store[interview_id_str]
-        qa_pairs = stored_data.get('qa_pairs', [])
-        full_transcript = stored_data.get('conversation_history', {})
-        company_name = stored_data.get('company_name')  # NEW
-        
-        print(f"  ✅ Data retrieved from memory")
-        print(f"  Company: {company_name if company_name else 'N/A'}")
-        print(f"  Q&A Pairs: {len(qa_pairs)}")
-        print(f"  Transcript Items: {len(full_transcript.get('items', []))}")
-        
-        if not qa_pairs or len(qa_pairs) == 0:
-            return jsonify({'success': False, 'error': 'No Q&A data found'}), 404
-        
-        # Get interview details from database (for metadata only)
-        interview = db.get_interview_details(interview_id)
+        force = request.args.get('force', 'false').lower() == 'true'
+        job = job_queue.submit('report', {'interview_id': interview_id},
+                               dedupe_key=str(interview_id), force=force)
         
-        if not interview:
-            return jsonify({'success': False, 'error': 'Interview not found'}), 404
+        print(f"\n📊 Report job {job['job_id']} for interview {interview_id}: {job['status']}"
+              f"{' (existing)' if job['deduplicated'] else ''}")
         
-        print(f"  Interview Type: {interview['interview_type']}")
-        
-        # Get resume and JD data
-        resume = db.get_resume_by_id(interview['resume_id'])
-        jd = db.get_jd_by_id(interview['jd_id'])
-        
-        resume_data = resume.get('parsed_data') if resume else None
-        jd_data = jd.get('parsed_data') if jd else None
-        
-        print(f"  Resume Data: {'✓' if resume_data else '✗'}")
-        print(f"  JD Data: {'✓' if jd_data else '✗'}")
-        
-        # Get user info
-        user_id = interview['user_id']
-        user_info = db.get_user_info(user_id)
-        user_name = user_info.get('full_name', 'Candidate') if user_info else 'Candidate'
-        
-        # Generate report using LLM
-        print("🤖 Calling LLM to generate comprehensive report...")
-        report_data = report_gen.generate_report(
-            interview_type=interview['interview_type'],
-            qa_pairs=qa_pairs,
-            resume_data=resume_data,
-            jd_data=jd_data,
-            full_transcript=full_transcript,
-            company_name=company_name  # NEW: Pass company name to report generator
-        )
-        
-        print("✓ Report data generated by LLM")
-        
-        # Generate PDF
-        print("📄 Creating PDF report...")
-        pdf_filename = f"interview_report_{interview_id}.pdf"
-        pdf_path = os.path.join(app.config['REPORTS_FOLDER'], pdf_filename)
-        
-        report_gen.create_pdf_report(report_data, pdf_path)
-        
-        print(f"✓ PDF created: {pdf_path}")
-        
-        # Clean up memory after successful report generation
-        if interview_id_str in interview_data_store:
-            del interview_data_store[interview_id_str]
-            print(f"🗑️ Cleaned up memory for interview {interview_id}")
-        
-        return jsonify({
-            'success': True,
-            'message': 'Report generated successfully',
-            'report_data': report_data,
-            'pdf_path': pdf_filename,
-            'interview_id': interview_id,
-            'company_name': company_name,  # NEW
-            'qa_count': len(qa_pairs),
-            'transcript_items': len(full_transcript.get('items', []))
-        }), 200
+        return report_job_response(job, 200 if job['status'] == 'succeeded' else 202)
         
     except Exception as e:
         print(f"Generate report error: {str(e)}")
         traceback.print_exc()
+        return jsonify({'success': False, 'error': f'Failed to queue report: {str(e)}'}), 500
+
+
+def sse_event(event, data):
+    """One server-sent event with a JSON body"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.route('/api/generate-report/<int:interview_id>/stream', methods=['GET'])
+def stream_report(interview_id):
+    """
+    Generate the report and relay it as server-sent events while the LLM writes it:
+    'chunk' events carry markdown as it arrives, 'done' the same body the report job
+    result returns once the report is stored and its PDF rendered, plus 'error' when the
+    LLM failed and the body holds the fallback report. The stream holds the interview's
+    report job while it runs, so a report that already exists is replayed and one being
+    generated elsewhere (queued job or another stream) is reported as a 'job' event.
+    """
+    force = request.args.get('force', 'false').lower() == 'true'
+    job = job_queue.claim('report', {'interview_id': interview_id},
+                          dedupe_key=str(interview_id), force=force)
+    if job['deduplicated']:
+        def replay():
+            if job['status'] == 'succeeded':
+                yield sse_event('chunk', {'text': job['result']['report_data']['full_report']})
+                yield sse_event('done', dict(job['result'], job_id=job['job_id'], error=None))
+            else:
+                yield sse_event('job', {
+                    'job': job_status_payload(job),
+                    'status_url': f"/api/report-jobs/{job['job_id']}",
+                    'result_url': f"/api/report-jobs/{job['job_id']}/result"
+                })
+        return Response(replay(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+    job_id = job['job_id']
+    
+    print(f"\n📊 Streaming Report for Interview {interview_id} (job {job_id})...")
+    try:
+        inputs = load_report_inputs(interview_id)
+        stream = report_gen.stream_report(**inputs)
+    except Exception as e:
+        job_queue.complete(job_id, error=str(e))
+        if isinstance(e, PermanentJobError):
+            return jsonify({'success': False, 'error': str(e)}), 404
+        print(f"Stream report error: {str(e)}")
+        traceback.print_exc()
         return jsonify({'success': False, 'error': f'Failed to generate report: {str(e)}'}), 500
+    
+    def events():
+        result, error = None, 'Report stream closed before the report was finished'
+        try:
+            yield sse_event('start', {'interview_id': interview_id, 'job_id': job_id})
+            for chunk in stream:
+                yield sse_event('chunk', {'text': chunk})
+            try:
+                result = finish_report(interview_id, inputs, stream.report)
+                # The fallback report is still shown, but the job is recorded as failed so
+                # dedupe does not serve it and the next request generates a real report
+                error = (f"LLM report generation failed ({stream.error or 'unusable response'}); "
+                         f"showing a fallback report") if stream.report.get('is_fallback') else None
+            except Exception as e:
+                print(f"Stream report error: {str(e)}")
+                traceback.print_exc()
+                error = f'Failed to save report: {str(e)}'
+        finally:
+            # Also runs when the client goes away mid-stream, so the job never stays 'running'
+            job_queue.complete(job_id, result=result, error=error)
+        
+        if result is None:
+            yield sse_event('error', {'success': False, 'error': error, 'job_id': job_id})
+            return
+        yield sse_event('done', dict(result, job_id=job_id, error=error,
+                                     first_chunk_seconds=stream.first_chunk_seconds))
+    
+    # X-Accel-Buffering stops nginx from holding chunks back
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/report-jobs/<job_id>', methods=['GET'])
+def get_report_job(job_id):
+    """Status of a report generation job"""
+    job = job_queue.get(job_id)
+    if not job or job['kind'] != 'report':
+        return jsonify({'success': False, 'error': 'Report job not found'}), 404
+    return report_job_response(job)
+
+
+@app.route('/api/report-jobs/<job_id>/result', methods=['GET'])
+def get_report_job_result(job_id):
+    """Finished report (same body the synchronous endpoint used to return)"""
+    job = job_queue.get(job_id)
+    if not job or job['kind'] != 'report':
+        return jsonify({'success': False, 'error': 'Report job not found'}), 404
+    
+    if job['status'] == 'succeeded':
+        return jsonify(job['result']), 200
+    if job['status'] == 'failed':
+        return jsonify({
+            'success': False,
+            'status': 'failed',
+            'error': f"Failed to generate report: {job['error']}"
+        }), 500
+    return jsonify({
+        'success': False,
+        'status': job['status'],
+        'error': 'Report is still being generated'
+    }), 202
 
 
 # ==================== DOWNLOAD REPORT PDF ====================
@@ -675,13 +1033,13 @@ def download_report(interview_id):
 if __name__ == '__main__':
     print("🚀 Starting Flask API server...")
     print(f"📊 Database: {db_config['host']}:{db_config['port']}/{db_config['database']}")
+    print(f"🔌 DB pool: min={db.pool_min}, max={db.pool_max}")
     print(f"🎥 LiveKit URL: {LIVEKIT_URL}")
     print(f"📁 Upload folder: {UPLOAD_FOLDER}")
     print(f"📄 Reports folder: {REPORTS_FOLDER}")
     
     # Check company data
-    companies = load_company_data()
-    print(f"🏢 Companies loaded: {sum(len(seg.get('companies', [])) for seg in companies)}")
+    print(f"🏢 Companies loaded: {get_catalog().company_count()}")
     
     # Check email configuration
     if os.getenv('SMTP_USERNAME') and os.getenv('SMTP_PASSWORD'):
@@ -0,0 +1,155 @@
+"""
+Embedding backend benchmark: torch (sentence-transformers) vs onnxruntime, fp32 and int8.
+
+Each backend runs in a fresh process, so load time and resident memory are measured from a
+clean start. The texts are the header lines of the JDs in backend/uploads plus a fixed set
+of typical JD headers. Parity against the first backend is reported two ways: the cosine
+similarity of the embeddings, and agreement of the SectionClassifier labels (the decision
+jd_parser actually makes). The embedding cache is switched off, so every timed call runs
+the model.
+
+    cd backend && python benchmarks/bench_embedding_backends.py \\
+        [--onnx-dir exported_model] [--configs torch onnx onnx-int8]
+
+Without --onnx-dir the ONNX files are fetched from the Hub (see embedding_provider).
+"""
+
+import argparse
+import glob
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+CONFIGS = {
+    # name -> environment for embedding_provider
+    'torch': {'EMBEDDING_BACKEND': 'torch'},
+    'onnx': {'EMBEDDING_BACKEND': 'onnx', 'EMBEDDING_ONNX_FILE': os.path.join('onnx', 'model.onnx')},
+    'onnx-int8': {'EMBEDDING_BACKEND': 'onnx',
+                  'EMBEDDING_ONNX_FILE': os.path.join('onnx', 'model_quint8_avx2.onnx')},
+}
+
+TYPICAL_HEADERS = [
+    "About the role", "About us", "Who we are", "What you'll do", "What you will be doing",
+    "Your responsibilities", "Key responsibilities", "Day to day", "What we're looking for",
+    "Who you are", "Requirements", "Minimum qualifications", "Preferred qualifications",
+    "Nice to have", "Bonus points", "Skills", "Technical skills", "Our tech stack",
+    "Education", "Experience", "Benefits", "Perks", "What we offer", "Compensation",
+    "Location", "How to apply", "Equal opportunity employer", "Culture and values",
+]
+
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_config(env, texts, repeat):
+    """Runs in a fresh process: load, time, embed and classify"""
+    os.environ.update(env)
+    # Otherwise the repeated encode() calls below time cache lookups, not the model
+    os.environ['EMBEDDING_CACHE'] = 'false'
+    baseline = rss_mb()
+    started = time.perf_counter()
+    import embedding_provider
+    embedding_provider.get_model()
+    load_seconds = time.perf_counter() - started
+    loaded_rss = rss_mb()
+
+    from jd_parser import section_classifier
+    embeddings = embedding_provider.encode(texts)
+    labels = section_classifier.classify_many(texts)
+
+    single, batch = [], []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        embedding_provider.encode(texts[:1])
+        single.append(time.perf_counter() - t)
+        t = time.perf_counter()
+        embedding_provider.encode(texts)
+        batch.append(time.perf_counter() - t)
+
+    return {
+        'id': embedding_provider.EMBEDDING_ID,
+        'load_seconds': load_seconds,
+        'rss_mb': loaded_rss - baseline,
+        'peak_rss_mb': rss_mb(),
+        'single_ms': statistics.median(single) * 1000,
+        'batch_ms': statistics.median(batch) * 1000,
+        'embeddings': embeddings,
+        'labels': labels,
+    }
+
+
+def jd_header_lines():
+    from document_text import extract_lines
+    from jd_parser import is_section_header
+    headers = []
+    for path in sorted(glob.glob(os.path.join(BACKEND_DIR, 'uploads', 'jd_*.pdf'))):
+        lines = extract_lines(path)
+        for i, line in enumerate(lines):
+            if is_section_header(line, lines[i + 1] if i + 1 < len(lines) else None):
+                headers.append(line)
+    return headers
+
+
+def main():
+    args_parser = argparse.ArgumentParser()
+    args_parser.add_argument('--configs', nargs='+', default=list(CONFIGS), choices=list(CONFIGS))
+    args_parser.add_argument('--onnx-dir', help="exported model directory (EMBEDDING_ONNX_DIR)")
+    args_parser.add_argument('--repeat', type=int, default=20)
+    args = args_parser.parse_args()
+
+    texts = list(dict.fromkeys(jd_header_lines() + TYPICAL_HEADERS))
+    print(f"{len(texts)} header texts\n")
+
+    results = {}
+    for name in args.configs:
+        env = dict(CONFIGS[name])
+        if args.onnx_dir:
+            env['EMBEDDING_ONNX_DIR'] = args.onnx_dir
+        # A fresh interpreter per backend so memory and load time are not shared
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            try:
+                results[name] = pool.submit(run_config, env, texts, args.repeat).result()
+            except Exception as e:
+                print(f"❌ {name}: {type(e).__name__}: {e}")
+                continue
+        r = results[name]
+        print(f"{name:<10} load {r['load_seconds']:6.2f}s  model RSS {r['rss_mb']:7.1f} MB "
+              f"(process {r['peak_rss_mb']:.0f} MB)  1 text {r['single_ms']:6.2f} ms  "
+              f"{len(texts)} texts {r['batch_ms']:7.2f} ms")
+
+    if len(results) < 2:
+        return 0
+    reference_name = next(iter(results))
+    reference = results[reference_name]
+    print(f"\nParity against {reference_name}:")
+    disagreements = 0
+    for name, r in results.items():
+        if name == reference_name:
+            continue
+        a, b = reference['embeddings'], r['embeddings']
+        cosine = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+        differing = [(t, x, y) for t, x, y in zip(texts, reference['labels'], r['labels']) if x != y]
+        disagreements += len(differing)
+        print(f"  {name:<10} cosine min {cosine.min():.4f} mean {cosine.mean():.4f}  "
+              f"section labels agree {len(texts) - len(differing)}/{len(texts)}")
+        for text, expected, got in differing:
+            print(f"    {text!r}: {expected} -> {got}")
+    return 1 if disagreements else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
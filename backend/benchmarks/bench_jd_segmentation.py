@@ -0,0 +1,118 @@
+"""
+JD segmentation regression check and benchmark: LinearJDSegmenter vs. the legacy
+group -> merge -> rescan pipeline.
+
+For every JD in backend/uploads both engines must return the same section dict. Random
+documents built from the sample lines (shuffled, with extra headers and bullets) are
+compared too, and timings are reported for documents of growing length to show how each
+engine scales. The batch API (process_job_descriptions) is timed against calling
+process_job_description once per file. Header embeddings go through embedding_provider as configured; both engines
+use the same classifier, so parity does not depend on which model is loaded.
+
+    cd backend && python benchmarks/bench_jd_segmentation.py [--fuzz 300] [--batch 32] [jd.pdf ...]
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jd_parser import (extract_text_from_pdf, process_job_description,  # noqa: E402
+                       process_job_descriptions, segment_jd_lines)
+
+EXTRA_LINES = [
+    "Responsibilities:", "What You'll Do", "Requirements", "Nice To Have", "About Us",
+    "Benefits", "Why Join Us?", "Education:", "• Bachelor's degree in computer science",
+    "• 3+ years of experience with Python and SQL", "- Strong communication skills",
+    "1. Build data pipelines", "Our Mission", "Equal opportunity employer", "Perks & Benefits",
+    "you will", "ability", "to work independently", "written and", "verbal communication",
+]
+
+
+def best_time(lines, engine, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        segment_jd_lines(lines, engine)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def compare(lines):
+    """'same', 'different' or 'legacy raised' for one document"""
+    try:
+        legacy = segment_jd_lines(lines, 'legacy')
+    except KeyError:
+        # The legacy rescan indexes rescued lines by final section and raises on
+        # Education / Experience / Equal Opportunity; the linear engine merges them
+        return 'legacy raised'
+    return 'same' if segment_jd_lines(lines, 'linear') == legacy else 'different'
+
+
+def main():
+    args_parser = argparse.ArgumentParser()
+    args_parser.add_argument('paths', nargs='*')
+    args_parser.add_argument('--fuzz', type=int, default=300, help="random documents to compare")
+    args_parser.add_argument('--repeat', type=int, default=5)
+    args_parser.add_argument('--batch', type=int, default=32, help="copies of each JD in the batch run")
+    args = args_parser.parse_args()
+
+    paths = args.paths or sorted(glob.glob(os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads', 'jd_*.pdf')))
+    if not paths:
+        print("No JD PDFs found (pass paths or add jd_*.pdf to backend/uploads)")
+        return 1
+
+    documents = {os.path.basename(path): extract_text_from_pdf(path) for path in paths}
+    failures = 0
+    for name, lines in documents.items():
+        outcome = compare(lines)
+        failures += outcome == 'different'
+        print(f"📄 {name}: {len(lines)} lines, {outcome}")
+
+    pool = [line for lines in documents.values() for line in lines] + EXTRA_LINES
+    rng = random.Random(0)
+    outcomes = {'same': 0, 'different': 0, 'legacy raised': 0}
+    for _ in range(args.fuzz):
+        lines = [rng.choice(pool) for _ in range(rng.randint(1, 120))]
+        outcome = compare(lines)
+        outcomes[outcome] += 1
+        if outcome == 'different' and outcomes['different'] == 1:
+            print(f"  first differing document: {lines!r}")
+    failures += outcomes['different']
+    print(f"Random documents: {outcomes}")
+
+    # Warm the embedding cache / model so timings measure segmentation only
+    base = [line for lines in documents.values() for line in lines]
+    for scale in (1, 4, 16):
+        segment_jd_lines(base * scale, 'linear')
+    print("\nLines   legacy ms   linear ms   speedup")
+    for scale in (1, 4, 16):
+        lines = base * scale
+        legacy = best_time(lines, 'legacy', args.repeat)
+        linear = best_time(lines, 'linear', args.repeat)
+        print(f"{len(lines):5d}  {legacy * 1000:10.2f}  {linear * 1000:10.2f}  {legacy / linear:7.2f}x")
+
+    batch = paths * args.batch
+    process_job_descriptions(paths)     # start the extraction pool
+    started = time.perf_counter()
+    one_by_one = [process_job_description(path) for path in batch]
+    loop_seconds = time.perf_counter() - started
+    results, stats = process_job_descriptions(batch)
+    mismatched = sum(a != b for a, b in zip(one_by_one, results))
+    failures += mismatched
+    print(f"\nBatch of {len(batch)}: one at a time {loop_seconds:.2f}s, "
+          f"process_job_descriptions {stats['total_seconds']:.2f}s "
+          f"({loop_seconds / stats['total_seconds']:.2f}x), {mismatched} differing")
+    print(f"  {stats}")
+
+    print(f"\nDocuments where the engines differ: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Keyword scoring benchmark: compiled KeywordMatcher vs. the per-keyword `in` loop.
+
+Scores the same chunks jd_parser scores (single lines, 5-line buffers, 3-line rescan groups)
+for every sample JD in backend/uploads, checks that both engines agree, and reports timings.
+Also repeats the run with a keyword table 4x larger to show how each engine scales.
+
+    cd backend && python benchmarks/bench_keyword_matcher.py [jd.pdf ...]
+"""
+
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jd_parser import extract_text_from_pdf, section_keywords  # noqa: E402
+from keyword_matcher import KeywordMatcher  # noqa: E402
+
+
+def loop_scores(text, keywords_by_section):
+    """Reference implementation (the original calculate_section_scores)"""
+    text_lower = text.lower()
+    return {section: sum(1 for keyword in keywords if keyword.lower() in text_lower)
+            for section, keywords in keywords_by_section.items()}
+
+
+def chunks_for(lines):
+    chunks = list(lines)
+    chunks += [' '.join(lines[i:i + 5]) for i in range(0, len(lines), 5)]
+    chunks += [' '.join(lines[i:i + 3]) for i in range(len(lines))]
+    return chunks
+
+
+def time_engine(score, chunks, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for chunk in chunks:
+            score(chunk)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(label, keywords_by_section, chunks, repeat=5):
+    started = time.perf_counter()
+    matcher = KeywordMatcher(keywords_by_section)
+    build = time.perf_counter() - started
+
+    mismatches = sum(1 for chunk in chunks
+                     if matcher.scores(chunk) != loop_scores(chunk, keywords_by_section))
+
+    loop_time = time_engine(lambda c: loop_scores(c, keywords_by_section), chunks, repeat)
+    matcher_time = time_engine(matcher.scores, chunks, repeat)
+    keyword_count = sum(len(k) for k in keywords_by_section.values())
+    print(f"{label}: {keyword_count} keywords, {len(chunks)} chunks, build {build * 1000:.1f} ms")
+    print(f"  loop    {loop_time * 1000:8.2f} ms")
+    print(f"  matcher {matcher_time * 1000:8.2f} ms  ({loop_time / matcher_time:.2f}x)")
+    print(f"  mismatches: {mismatches}")
+    return mismatches
+
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob(os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads', 'jd_*.pdf')))
+    if not paths:
+        print("No JD PDFs found (pass paths or add jd_*.pdf to backend/uploads)")
+        return 1
+
+    chunks = []
+    for path in paths:
+        lines = extract_text_from_pdf(path)
+        chunks += chunks_for(lines)
+        print(f"📄 {os.path.basename(path)}: {len(lines)} lines")
+
+    # Same vocabulary plus three suffixed variants of each keyword
+    large = {section: [f"{k}{suffix}" for k in keywords for suffix in ('', ' team', ' role', ' program')]
+             for section, keywords in section_keywords.items()}
+
+    mismatches = run("section_keywords", section_keywords, chunks)
+    mismatches += run("4x keywords", large, chunks)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
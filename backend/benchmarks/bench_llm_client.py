@@ -0,0 +1,83 @@
+"""
+LLM client benchmark: a fresh client per call (asyncio.run + new AsyncGroq, or a bare
+requests.post to Ollama, as report generation used to do) vs the pooled LLMClient.
+
+Short prompts make connection setup (TCP + TLS + event loop) a large share of each call,
+which is where reuse shows. Uses Groq when GROQ_API_KEY is set, else a local Ollama.
+
+    cd backend && python benchmarks/bench_llm_client.py [--calls 10] [--prompt "Say OK"]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_client import OLLAMA_URL, LLMClient  # noqa: E402
+
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1")
+
+
+def fresh_call(prompt, groq_key):
+    if groq_key:
+        from groq import AsyncGroq
+
+        async def call():
+            client = AsyncGroq(api_key=groq_key)
+            completion = await client.chat.completions.create(
+                model=GROQ_MODEL, messages=[{"role": "user", "content": prompt}], max_completion_tokens=8)
+            return completion.choices[0].message.content
+        return asyncio.run(call())
+
+    import requests
+    response = requests.post(f"{OLLAMA_URL}/api/generate", timeout=120,
+                             json={"model": OLLAMA_MODEL, "prompt": prompt, "stream": False,
+                                   "options": {"num_predict": 8}})
+    response.raise_for_status()
+    return response.json().get("response", "")
+
+
+def pooled_call(client, prompt, groq_key):
+    if groq_key:
+        return client.chat_groq(GROQ_MODEL, [{"role": "user", "content": prompt}], max_completion_tokens=8)
+    return client.generate_ollama(OLLAMA_MODEL, prompt, num_predict=8)
+
+
+def timed(fn, calls):
+    times = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def main():
+    args_parser = argparse.ArgumentParser()
+    args_parser.add_argument('--calls', type=int, default=10)
+    args_parser.add_argument('--prompt', default="Reply with the single word OK.")
+    args = args_parser.parse_args()
+
+    groq_key = os.getenv("GROQ_API_KEY")
+    print(f"Provider: {'Groq ' + GROQ_MODEL if groq_key else 'Ollama ' + OLLAMA_MODEL}, {args.calls} calls\n")
+    client = LLMClient(groq_key=groq_key)
+
+    results = {
+        'fresh client per call': timed(lambda: fresh_call(args.prompt, groq_key), args.calls),
+        'pooled LLMClient': timed(lambda: pooled_call(client, args.prompt, groq_key), args.calls),
+    }
+    for name, times in results.items():
+        print(f"{name:<22} first {times[0] * 1000:8.1f} ms   median {statistics.median(times) * 1000:8.1f} ms   "
+              f"median after first {statistics.median(times[1:] or times) * 1000:8.1f} ms")
+    print(f"\n{client.stats()}")
+    client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
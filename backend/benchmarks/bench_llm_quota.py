@@ -0,0 +1,127 @@
+"""
+Shared LLM quota check: several processes drawing on one LLMQuota file must together stay
+within the configured requests per minute, waiters must be served in priority order, a
+provider 429 (backoff) must pause every caller, and a bounded wait must raise QuotaTimeout.
+
+No LLM is called; the quota lives in a temporary SQLite file. Exits non-zero on a failure.
+
+    cd backend && python benchmarks/bench_llm_quota.py [--processes 3] [--rpm 60] [--extra 6]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_quota import (PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, LLMQuota,  # noqa: E402
+                       QuotaTimeout)
+
+PROVIDER, MODEL = 'groq', 'bench-model'
+
+
+def quota(path, rpm):
+    return LLMQuota(path, {PROVIDER: {'rpm': rpm}})
+
+
+def drain(path, rpm, calls, results):
+    q = quota(path, rpm)
+    for _ in range(calls):
+        q.acquire(PROVIDER, MODEL)
+        results.put(time.time())
+
+
+def check_processes(path, rpm, processes, extra):
+    """rpm calls go through at once, the next ones at rpm/60 per second across all processes"""
+    total = rpm + extra
+    per_process = -(-total // processes)
+    results = multiprocessing.Queue()
+    started = time.time()
+    workers = [multiprocessing.Process(target=drain, args=(path, rpm, per_process, results))
+               for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    times = sorted(results.get() - started for _ in range(per_process * processes))
+    for worker in workers:
+        worker.join()
+
+    burst = times[rpm - 1]
+    last = times[total - 1]
+    expected = extra * 60.0 / rpm
+    print(f"{processes} processes, {rpm} rpm: call {rpm} at {burst:.2f}s, call {total} at {last:.2f}s "
+          f"(expected ~{expected:.1f}s)")
+    return burst < 2.0 and expected * 0.8 <= last <= expected + 2.0
+
+
+def check_priority(path, rpm):
+    """With the bucket empty, a later interactive waiter is served before earlier background ones"""
+    order = []
+
+    def wait(priority, name, delay):
+        time.sleep(delay)
+        quota(path, rpm).acquire(PROVIDER, MODEL, priority=priority)
+        order.append(name)
+
+    threads = [threading.Thread(target=wait, args=(PRIORITY_BACKGROUND, 'background-1', 0)),
+               threading.Thread(target=wait, args=(PRIORITY_BACKGROUND, 'background-2', 0.05)),
+               threading.Thread(target=wait, args=(PRIORITY_INTERACTIVE, 'interactive', 0.3))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"priority order: {', '.join(order)}")
+    return order[0] == 'interactive'
+
+
+def check_backoff(path, rpm, pause=2.0):
+    """A 429 pause holds back callers even though tokens are available"""
+    q = quota(path, rpm)
+    time.sleep(60.0 / rpm * 2)
+    q.backoff(PROVIDER, MODEL, pause)
+    started = time.time()
+    q.acquire(PROVIDER, MODEL)
+    waited = time.time() - started
+    print(f"after a {pause:g}s backoff the next call waited {waited:.2f}s")
+    return waited >= pause * 0.9
+
+
+def check_timeout(path, rpm):
+    """A bounded wait on an empty bucket raises QuotaTimeout"""
+    q = quota(path, rpm)
+    try:
+        for _ in range(rpm + 1):
+            q.acquire(PROVIDER, MODEL, timeout=0.1)
+    except QuotaTimeout as e:
+        print(f"timeout raised: {e}")
+        return True
+    print("timeout not raised")
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=3)
+    parser.add_argument('--rpm', type=int, default=60)
+    parser.add_argument('--extra', type=int, default=6, help='calls past the burst (each waits 60/rpm s)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'llm_quota.db')
+        checks = [
+            ('processes', lambda: check_processes(path, args.rpm, args.processes, args.extra)),
+            ('priority', lambda: check_priority(path, args.rpm)),
+            ('backoff', lambda: check_backoff(path, args.rpm)),
+            ('timeout', lambda: check_timeout(path, args.rpm)),
+        ]
+        failed = [name for name, check in checks if not check()]
+
+    print(f"{'❌ failed: ' + ', '.join(failed) if failed else '✅ all quota checks passed'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
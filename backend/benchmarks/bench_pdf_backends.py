@@ -0,0 +1,112 @@
+"""
+PDF text backend benchmark: extraction speed and section-detection parity.
+
+For every PDF in backend/uploads, extracts the text with each backend (pdfplumber, pdfium,
+auto = pdfium with pdfplumber fallback) and compares the parsed sections against
+pdfplumber's: resume_*.pdf through parser.extract_text_from_pdf, jd_*.pdf through
+jd_parser.process_job_description (loads the embedding model).
+
+Line-for-line equality is not expected: pdfium returns text in content-stream order (so
+two-column layouts stay in column order) while pdfplumber interleaves columns by height.
+Parity is therefore reported as "same section headers" plus the word overlap of each
+section's content.
+
+    cd backend && python benchmarks/bench_pdf_backends.py [--skip-jd] [file.pdf ...]
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_text import extract_lines, pdfium  # noqa: E402
+from parser import extract_text_from_pdf as parse_resume  # noqa: E402
+
+BACKENDS = ('pdfplumber', 'pdfium', 'auto')
+
+
+def best_time(fn, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def words(lines):
+    return Counter(re.findall(r"\w+", ' '.join(lines).lower()))
+
+
+def section_parity(reference, candidate):
+    """(same section headers?, word overlap of section contents in [0, 1])"""
+    same_keys = set(reference) == set(candidate)
+    shared = total = 0
+    for key in set(reference) | set(candidate):
+        a, b = words(reference.get(key, [])), words(candidate.get(key, []))
+        shared += sum((a & b).values())
+        total += max(sum(a.values()), sum(b.values()))
+    return same_keys, shared / total if total else 1.0
+
+
+def main():
+    args_parser = argparse.ArgumentParser()
+    args_parser.add_argument('paths', nargs='*')
+    args_parser.add_argument('--repeat', type=int, default=3)
+    args_parser.add_argument('--skip-jd', action='store_true', help="skip JD parity (needs the embedding model)")
+    args = args_parser.parse_args()
+
+    if pdfium is None:
+        print("pypdfium2 is not installed; nothing to compare")
+        return 1
+
+    paths = args.paths or sorted(glob.glob(os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads', '*.pdf')))
+    if not paths:
+        print("No PDFs found in backend/uploads")
+        return 1
+
+    parse_jd = None
+    if not args.skip_jd:
+        from jd_parser import process_job_description as parse_jd
+
+    totals = dict.fromkeys(BACKENDS, 0.0)
+    mismatched = 0
+    for path in paths:
+        name = os.path.basename(path)
+        timings = {}
+        for backend in BACKENDS:
+            timings[backend], _ = best_time(
+                lambda: extract_lines(path, max_pages=0, time_budget=0, backend=backend), args.repeat)
+            totals[backend] += timings[backend]
+
+        parse = parse_resume if name.startswith('resume') else parse_jd
+        parity = ''
+        if parse is not None:
+            reference = dict(parse(path, backend='pdfplumber'))
+            for backend in ('pdfium', 'auto'):
+                same_keys, overlap = section_parity(reference, dict(parse(path, backend=backend)))
+                mismatched += not same_keys
+                parity += (f"  {backend}: {'same' if same_keys else 'DIFFERENT'} section headers, "
+                           f"{overlap:.0%} word overlap")
+
+        print(f"📄 {name}")
+        print("  " + "  ".join(f"{b} {timings[b] * 1000:7.1f} ms" for b in BACKENDS)
+              + f"  ({timings['pdfplumber'] / timings['auto']:.1f}x)")
+        if parity:
+            print(parity)
+
+    print("\nTotal extraction time:")
+    for backend in BACKENDS:
+        print(f"  {backend:<10} {totals[backend] * 1000:8.1f} ms")
+    print(f"Documents whose section headers differ from pdfplumber: {mismatched}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
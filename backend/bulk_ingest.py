@@ -0,0 +1,242 @@
+"""
+Bulk Ingestion
+Parses a directory of resumes or job descriptions in a process pool and stores them in
+batches, for onboarding whole cohorts at once instead of one upload per HTTP call.
+
+    python bulk_ingest.py resume ./cohort_2025 --user-id 42
+    python bulk_ingest.py jd ./jds --user-map owners.csv --workers 6
+
+Every stored file is appended to a state file, so an interrupted run picks up where it
+stopped when started again with the same arguments.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from dotenv import load_dotenv
+
+from database import DatabaseManager
+
+KINDS = ('resume', 'jd')
+EXTENSIONS = ('.pdf', '.docx')
+
+_parse_cache = None
+
+
+# ==================== WORKER PROCESS ====================
+
+def _init_worker(kind, use_cache):
+    """Runs once per pool process: load the parser (and model) before the first file arrives"""
+    global _parse_cache
+    if kind == 'jd':
+        from embedding_provider import warm_up
+        warm_up()
+    if use_cache:
+        from parse_cache import ParseCache
+        _parse_cache = ParseCache(os.getenv('PARSE_CACHE_PATH', os.path.join('data', 'parse_cache.db')))
+
+
+def _parse_file(kind, path):
+    """Runs in a pool process -> (path, parsed_data or None, error or None, seconds, cache_hit)"""
+    started = time.perf_counter()
+    try:
+        # Read once: the bytes are both hashed for the cache and parsed
+        with open(path, 'rb') as f:
+            data = f.read()
+        if kind == 'resume':
+            from parser import PARSER_VERSION, extract_text_from_pdf
+            version = PARSER_VERSION
+            parse = lambda: dict(extract_text_from_pdf(data))
+        else:
+            from embedding_provider import EMBEDDING_ID
+            from jd_parser import PARSER_VERSION, process_job_description
+            version = f"{PARSER_VERSION}:{EMBEDDING_ID}"
+            parse = lambda: process_job_description(data)
+
+        if _parse_cache is None:
+            parsed_data, cache_hit = parse(), False
+        else:
+            parsed_data, cache_hit = _parse_cache.get_or_parse(kind, version, data, parse)
+        return path, parsed_data, None, time.perf_counter() - started, cache_hit
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}", time.perf_counter() - started, False
+
+
+# ==================== STATE FILE ====================
+
+def default_state_path(kind, directory):
+    digest = hashlib.sha1(os.path.abspath(directory).encode('utf-8')).hexdigest()[:10]
+    return os.path.join('data', f"bulk_ingest_{kind}_{digest}.jsonl")
+
+
+def load_done(state_path):
+    """Files already stored by earlier runs"""
+    done = set()
+    if os.path.exists(state_path):
+        with open(state_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)['file'])
+                except (ValueError, KeyError):
+                    continue    # torn last line from an interrupted write
+    return done
+
+
+def append_done(state_file, stored):
+    for doc_id, path in stored:
+        state_file.write(json.dumps({'file': path, 'id': doc_id}) + '\n')
+    state_file.flush()
+    os.fsync(state_file.fileno())
+
+
+# ==================== INGESTION ====================
+
+def list_files(directory):
+    paths = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.lower().endswith(EXTENSIONS):
+                paths.append(os.path.abspath(os.path.join(root, name)))
+    return sorted(paths)
+
+
+def load_user_map(path):
+    """CSV of file name (or path),user_id"""
+    user_map = {}
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            if len(row) >= 2 and row[1].strip().isdigit():
+                user_map[row[0].strip()] = int(row[1])
+    return user_map
+
+
+def owner_of(path, user_id, user_map):
+    if user_map:
+        owner = user_map.get(path, user_map.get(os.path.basename(path)))
+        if owner is not None:
+            return owner
+    return user_id
+
+
+def ingest(args, db):
+    paths = list_files(args.directory)
+    state_path = args.state_file or default_state_path(args.kind, args.directory)
+    os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+    done = load_done(state_path)
+    user_map = load_user_map(args.user_map) if args.user_map else {}
+
+    pending = []
+    unowned = 0
+    for path in paths:
+        if path in done:
+            continue
+        if owner_of(path, args.user_id, user_map) is None:
+            unowned += 1
+            continue
+        pending.append(path)
+
+    print(f"📂 {len(paths)} files, {len(paths) - len(pending) - unowned} already ingested, "
+          f"{unowned} without an owner, {len(pending)} to process")
+    if not pending:
+        return 0
+
+    store = db.store_resumes if args.kind == 'resume' else db.store_jds
+    parse_times, failures, batch = [], [], []
+    stored_count = cache_hits = 0
+    insert_seconds = 0.0
+    total_bytes = sum(os.path.getsize(p) for p in pending)
+    started = time.perf_counter()
+
+    def flush(state_file):
+        nonlocal stored_count, insert_seconds
+        if not batch:
+            return
+        t = time.perf_counter()
+        stored = store(batch)
+        insert_seconds += time.perf_counter() - t
+        append_done(state_file, stored)
+        stored_count += len(stored)
+        batch.clear()
+
+    # One process per worker; each extracts its PDFs serially instead of starting its own pool
+    os.environ.setdefault('PDF_WORKERS', '1')
+    executor = ProcessPoolExecutor(max_workers=args.workers,
+                                   mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_init_worker, initargs=(args.kind, not args.no_cache))
+    with executor, open(state_path, 'a', encoding='utf-8') as state_file:
+        try:
+            results = executor.map(_parse_file, [args.kind] * len(pending), pending, chunksize=1)
+            for index, (path, parsed_data, error, seconds, cache_hit) in enumerate(results, 1):
+                parse_times.append(seconds)
+                if error:
+                    failures.append((path, error))
+                    print(f"❌ {os.path.basename(path)}: {error}")
+                else:
+                    cache_hits += cache_hit
+                    batch.append((owner_of(path, args.user_id, user_map), parsed_data, path))
+                    if len(batch) >= args.batch_size:
+                        flush(state_file)
+
+                if index % args.progress_every == 0:
+                    elapsed = time.perf_counter() - started
+                    print(f"  … {index}/{len(pending)} files ({index / elapsed:.1f} files/s)")
+            flush(state_file)
+        except KeyboardInterrupt:
+            # Keep what was parsed so far; the next run skips it
+            flush(state_file)
+            print("⏹️ Interrupted; progress saved")
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Stored {stored_count} {args.kind}s in {elapsed:.1f}s "
+          f"({stored_count / elapsed:.2f} files/s, {total_bytes / elapsed / 1e6:.2f} MB/s)")
+    print(f"   parse time per file: mean {statistics.mean(parse_times):.2f}s, "
+          f"p50 {statistics.median(parse_times):.2f}s, max {max(parse_times):.2f}s")
+    print(f"   database inserts: {insert_seconds:.2f}s total, batches of {args.batch_size}")
+    print(f"   cache hits: {cache_hits}, failures: {len(failures)} (re-run to retry them)")
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse and store a directory of resumes or JDs")
+    parser.add_argument('kind', choices=KINDS)
+    parser.add_argument('directory')
+    parser.add_argument('--user-id', type=int, help="owner of every file (unless --user-map names one)")
+    parser.add_argument('--user-map', help="CSV of file,user_id for per-file owners")
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    parser.add_argument('--batch-size', type=int, default=50, help="rows per INSERT")
+    parser.add_argument('--state-file', help="progress file for resuming (default under data/)")
+    parser.add_argument('--no-cache', action='store_true', help="always re-parse, ignoring the parse cache")
+    parser.add_argument('--progress-every', type=int, default=25)
+    args = parser.parse_args(argv)
+
+    if args.user_id is None and not args.user_map:
+        parser.error("give --user-id and/or --user-map")
+    if not os.path.isdir(args.directory):
+        parser.error(f"{args.directory} is not a directory")
+
+    load_dotenv()
+    db = DatabaseManager({
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'database': os.getenv('DB_NAME', 'capstone_db'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD', 'secret'),
+        'port': int(os.getenv('DB_PORT', 5432))
+    }, pool_min=1, pool_max=2)
+    try:
+        return ingest(args, db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Company Catalog
+Loads company_data.json once per process, indexes it by normalized company name and
+segment, reloads when the file changes on disk, and keeps the JSON bodies (and their ETags)
+for the company API endpoints pre-serialized.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from response_cache import make_etag
+
+
+def normalize_name(name: str) -> str:
+    """Case- and whitespace-insensitive lookup key"""
+    return ' '.join((name or '').casefold().split())
+
+
+class CompanyCatalog:
+    def __init__(self, path: str = None, check_interval: float = 2.0):
+        """
+        path           -> company_data.json (default: COMPANY_DATA_PATH or ./company_data.json)
+        check_interval -> minimum seconds between mtime checks of the file
+        """
+        self.path = path or os.getenv('COMPANY_DATA_PATH',
+                                      os.path.join(os.getcwd(), 'company_data.json'))
+        self.check_interval = check_interval
+        self.version = 0
+
+        self._lock = threading.Lock()
+        self._signature = None
+        self._last_check = 0.0
+        self._segments = []
+        self._by_name = {}
+        self._by_segment = {}
+        self._companies_json = None
+        self._company_json = {}
+
+    # ==================== LOADING ====================
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self):
+        """Reload the catalog if the file changed (checked at most every check_interval)"""
+        now = time.monotonic()
+        if self.version and now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            if self.version and now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+            signature = self._file_signature()
+            if self.version and signature == self._signature:
+                return
+            self._load(signature)
+
+    def _load(self, signature):
+        segments = []
+        if signature is None:
+            print(f"⚠️ company_data.json not found at {self.path}")
+        else:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    segments = json.load(f)
+            except Exception as e:
+                print(f"❌ Error loading company data: {e}")
+                if self.version:
+                    # Keep serving the last good copy
+                    return
+
+        by_name, by_segment, companies_list, company_json = {}, {}, [], {}
+        for segment in segments:
+            segment_name = segment.get('segment', 'Unknown')
+            for company in segment.get('companies', []):
+                key = normalize_name(company.get('name', ''))
+                by_name.setdefault(key, company)
+                by_segment.setdefault(normalize_name(segment_name), []).append(company)
+
+                companies_list.append({
+                    'name': company.get('name'),
+                    'segment': segment_name,
+                    'interview_style': company.get('interview_style'),
+                    'focus_areas': company.get('focus_areas')
+                })
+                if key not in company_json:
+                    company_json[key] = self._with_etag(json.dumps({
+                        'success': True,
+                        'company': {
+                            'name': company.get('name'),
+                            'segment': segment.get('segment'),
+                            'interview_style': company.get('interview_style'),
+                            'focus_areas': company.get('focus_areas'),
+                            'question_tone': company.get('question_tone'),
+                            'keywords': company.get('keywords', [])
+                        }
+                    }))
+
+        self._segments = segments
+        self._by_name = by_name
+        self._by_segment = by_segment
+        self._company_json = company_json
+        self._companies_json = self._with_etag(json.dumps({
+            'success': True,
+            'companies': companies_list,
+            'total': len(companies_list)
+        }))
+        self._signature = signature
+        self.version += 1
+
+    @staticmethod
+    def _with_etag(body: str) -> Tuple[str, str]:
+        # Hashed once per load instead of on every request
+        return body, make_etag(body)
+
+    # ==================== LOOKUPS ====================
+
+    def segments(self) -> List[Dict]:
+        """Raw company_data.json contents (treat as read-only)"""
+        self._refresh()
+        return self._segments
+
+    def get(self, company_name: str) -> Optional[Dict]:
+        """Company entry by name, case-insensitive (treat as read-only)"""
+        self._refresh()
+        return self._by_name.get(normalize_name(company_name))
+
+    def by_segment(self, segment_name: str) -> List[Dict]:
+        self._refresh()
+        return list(self._by_segment.get(normalize_name(segment_name), []))
+
+    def company_count(self) -> int:
+        self._refresh()
+        return len(self._by_name)
+
+    # ==================== PRE-SERIALIZED PAYLOADS ====================
+
+    def companies_json(self) -> Tuple[str, str]:
+        """(body, etag) for GET /api/companies"""
+        self._refresh()
+        return self._companies_json
+
+    def company_json(self, company_name: str) -> Optional[Tuple[str, str]]:
+        """(body, etag) for GET /api/company/<name>, or None if unknown"""
+        self._refresh()
+        return self._company_json.get(normalize_name(company_name))
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> CompanyCatalog:
+    """Process-wide catalog instance"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = CompanyCatalog()
+    return _catalog
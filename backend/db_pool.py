@@ -0,0 +1,254 @@
+"""
+Pooled PostgreSQL connections for DatabaseManager
+Thread-safe checkout with health checks, idle recycling and pool metrics
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out before the timeout"""
+
+
+class ConnectionPool:
+    def __init__(self, db_config: dict, min_size: int = 1, max_size: int = 10,
+                 checkout_timeout: float = 10.0, max_idle: float = 300.0,
+                 max_lifetime: float = 3600.0, health_check_after: float = 30.0):
+        """
+        min_size / max_size    -> connections kept open / hard cap on open connections
+        checkout_timeout       -> seconds to wait for a free connection before giving up
+        max_idle               -> idle connections above min_size are closed after this
+        max_lifetime           -> connections older than this are recycled on checkout
+        health_check_after     -> connections idle longer than this are pinged before reuse
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+
+        self.db_config = db_config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+
+        self._cond = threading.Condition()
+        self._idle = []          # LIFO stack of (conn, last_used)
+        self._created_at = {}    # id(conn) -> monotonic creation time
+        self._open = 0
+        self._in_use = 0
+        self._closed = False
+        self._last_reap = time.monotonic()
+
+        self._stats = {
+            'checkouts': 0,
+            'connections_created': 0,
+            'connections_recycled': 0,
+            'health_check_failures': 0,
+            'checkout_timeouts': 0,
+            'waits': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+        }
+
+        for _ in range(min_size):
+            with self._cond:
+                self._open += 1
+            conn = self._connect()
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+
+    def _connect(self):
+        """Open a new physical connection (caller has already reserved a slot)"""
+        try:
+            conn = psycopg2.connect(**self.db_config)
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created_at[id(conn)] = time.monotonic()
+            self._stats['connections_created'] += 1
+        return conn
+
+    def _close(self, conn, recycled: bool = False):
+        """Close a connection and release its slot"""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._created_at.pop(id(conn), None)
+            self._open -= 1
+            if recycled:
+                self._stats['connections_recycled'] += 1
+            self._cond.notify()
+
+    # ==================== CHECKOUT ====================
+
+    def getconn(self):
+        """Check out a healthy connection, blocking up to checkout_timeout"""
+        start = time.monotonic()
+        deadline = start + self.checkout_timeout
+        waited = False
+
+        while True:
+            conn, last_used = None, None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise psycopg2.InterfaceError("Connection pool is closed")
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+                    if self._open < self.max_size:
+                        self._open += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['checkout_timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available after {self.checkout_timeout}s "
+                            f"(max_size={self.max_size})"
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+
+            if conn is None:
+                conn = self._connect()
+            elif not self._is_reusable(conn, last_used):
+                continue
+
+            waited_ms = (time.monotonic() - start) * 1000
+            with self._cond:
+                self._in_use += 1
+                self._stats['checkouts'] += 1
+                self._stats['waits'] += int(waited)
+                self._stats['total_wait_ms'] += waited_ms
+                self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], waited_ms)
+            return conn
+
+    def _is_reusable(self, conn, last_used: float) -> bool:
+        """Health-check an idle connection, closing it if it should not be reused"""
+        now = time.monotonic()
+        if conn.closed:
+            self._close(conn)
+            return False
+
+        with self._cond:
+            created_at = self._created_at.get(id(conn), now)
+        if now - created_at > self.max_lifetime:
+            self._close(conn, recycled=True)
+            return False
+
+        if now - last_used > self.health_check_after and not self._ping(conn):
+            with self._cond:
+                self._stats['health_check_failures'] += 1
+            self._close(conn)
+            return False
+
+        return True
+
+    def _ping(self, conn) -> bool:
+        """Cheap liveness probe for a connection that sat idle"""
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def putconn(self, conn, close: bool = False):
+        """Return a connection, rolling back anything the caller left open"""
+        with self._cond:
+            self._in_use -= 1
+
+        if not close and not conn.closed:
+            try:
+                if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                close = True
+
+        if close or conn.closed or self._closed:
+            self._close(conn)
+            return
+
+        now = time.monotonic()
+        with self._cond:
+            self._idle.append((conn, now))
+            self._cond.notify()
+            reap_due = now - self._last_reap > self.max_idle / 2
+            if reap_due:
+                self._last_reap = now
+        if reap_due:
+            self.close_idle()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of a with-block"""
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.InterfaceError, psycopg2.OperationalError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, close=broken)
+
+    # ==================== MAINTENANCE ====================
+
+    def close_idle(self) -> int:
+        """Close idle connections above min_size that exceeded max_idle"""
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            keep = []
+            # Oldest entries sit at the bottom of the LIFO stack
+            for conn, last_used in self._idle:
+                surplus = len(self._idle) - len(expired) - self.min_size
+                if surplus > 0 and now - last_used > self.max_idle:
+                    expired.append(conn)
+                else:
+                    keep.append((conn, last_used))
+            self._idle = keep
+
+        for conn in expired:
+            self._close(conn, recycled=True)
+        return len(expired)
+
+    def closeall(self):
+        """Close every idle connection and refuse further checkouts"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close(conn)
+
+    def stats(self) -> dict:
+        """Snapshot of pool usage for health/metrics endpoints"""
+        with self._cond:
+            snapshot = dict(self._stats)
+            checkouts = snapshot['checkouts']
+            snapshot.update({
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'open': self._open,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'avg_wait_ms': round(snapshot['total_wait_ms'] / checkouts, 3) if checkouts else 0.0,
+                'max_wait_ms': round(snapshot['max_wait_ms'], 3),
+                'pid': os.getpid(),
+            })
+            snapshot.pop('total_wait_ms')
+        return snapshot
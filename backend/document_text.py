@@ -0,0 +1,436 @@
+"""
+Document Text Extraction
+Streams page texts out of a PDF so parsers can start on page 1 while later pages are still
+being extracted. Large documents are split into page ranges and extracted in a process
+pool; a page and time budget stops pathological PDFs from holding a worker indefinitely.
+
+Text comes from a pluggable backend. The default ("auto") uses pypdfium2, which reads the
+text layer directly and is much faster than pdfplumber's layout analysis, and re-extracts
+any page whose text fails basic quality checks with pdfplumber.
+
+A document can be given as a file path, the raw bytes, or a readable binary stream (such as
+an upload's request stream), so uploads are parsed without a round trip through the disk.
+extract_lines_many() extracts a batch of documents, one document per pool process.
+
+Word files (.docx) are recognised by their leading bytes and zip contents (other Office and
+zip files are rejected) and read straight from the XML with python-docx (paragraphs and table cells in document order), as a single page. Legacy .doc
+files are rejected with UnsupportedDocumentError.
+
+    PDF_TEXT_BACKEND             auto | pdfium | pdfplumber (default auto)
+    PDF_MAX_PAGES                default page budget (default 50)
+    PDF_TIME_BUDGET              default seconds per document (default 20)
+    PDF_PARALLEL_PAGE_THRESHOLD  use the process pool above this many pages (default 8)
+    PDF_WORKERS                  process pool size (default min(4, cpu count); 1 disables it)
+"""
+
+import io
+import multiprocessing
+import os
+import threading
+import time
+import unicodedata
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import BinaryIO, Iterator, List, Optional, Union
+
+import pdfplumber
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # optional fast backend
+    pdfium = None
+
+try:
+    import docx
+    from docx.oxml.ns import qn
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+except ImportError:  # DOCX uploads need python-docx
+    docx = None
+
+DEFAULT_BACKEND = os.getenv('PDF_TEXT_BACKEND', 'auto').lower()
+DEFAULT_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', 50))
+DEFAULT_TIME_BUDGET = float(os.getenv('PDF_TIME_BUDGET', 20))
+PARALLEL_PAGE_THRESHOLD = int(os.getenv('PDF_PARALLEL_PAGE_THRESHOLD', 8))
+PDF_WORKERS = int(os.getenv('PDF_WORKERS', min(4, os.cpu_count() or 1)))
+PAGES_PER_TASK = 4
+
+# File path, document bytes or a readable binary stream
+DocumentSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_in_pool_worker = False     # set in pool processes extracting whole documents
+
+
+# ==================== SOURCES ====================
+
+class UnsupportedDocumentError(ValueError):
+    """The document is not a PDF or DOCX file"""
+
+
+OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'     # legacy .doc (and other Office 97-2003 files)
+
+def read_source(source: DocumentSource) -> Union[str, bytes]:
+    """
+    Path or bytes for a document. Streams are read into memory once, so every backend (and
+    the pdfplumber fallback) can open the same bytes without sharing a file position.
+    """
+    if isinstance(source, (str, os.PathLike, bytes)):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'read'):
+        return source.read()
+    raise TypeError(f"Expected a file path, bytes or a binary stream, got {type(source).__name__}")
+
+
+def detect_format(source) -> str:
+    """'pdf' or 'docx' from the leading bytes of a path or bytes; raises UnsupportedDocumentError"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            head = f.read(1024)
+    else:
+        head = bytes(source[:1024])
+    # The PDF header may follow a few junk bytes
+    if b'%PDF-' in head:
+        return 'pdf'
+    if head.startswith(b'PK\x03\x04'):
+        # .xlsx, .pptx and plain zips share the header; only DOCX has the Word body part
+        try:
+            with zipfile.ZipFile(source if isinstance(source, (str, os.PathLike)) else io.BytesIO(source)) as archive:
+                names = set(archive.namelist())
+        except zipfile.BadZipFile as e:
+            raise UnsupportedDocumentError(f"Not a readable DOCX file ({e})") from e
+        if 'word/document.xml' not in names:
+            raise UnsupportedDocumentError("Not a PDF or DOCX file")
+        return 'docx'
+    if head.startswith(OLE_MAGIC):
+        raise UnsupportedDocumentError(
+            "Legacy Word (.doc) files are not supported; save the file as .docx or PDF and upload it again")
+    raise UnsupportedDocumentError("Not a PDF or DOCX file")
+
+
+def source_name(source) -> str:
+    """Short name of a document for log messages"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.basename(source)
+    return f"in-memory document ({len(source)} bytes)" if isinstance(source, bytes) else "in-memory document"
+
+
+# ==================== DOCX ====================
+
+def _docx_lines(container, parent) -> Iterator[str]:
+    """Paragraph and table-cell texts of a body or cell element, in document order"""
+    for child in container.iterchildren():
+        if child.tag == qn('w:p'):
+            yield Paragraph(child, parent).text
+        elif child.tag == qn('w:tbl'):
+            seen = set()
+            for row in Table(child, parent).rows:
+                for cell in row.cells:
+                    # Merged cells are returned once per grid column they span
+                    if cell._tc in seen:
+                        continue
+                    seen.add(cell._tc)
+                    yield from _docx_lines(cell._tc, cell)
+
+
+def docx_text(source) -> str:
+    """Text of a DOCX file (path or bytes), one paragraph or table-cell paragraph per line"""
+    if docx is None:
+        raise RuntimeError("python-docx is not installed")
+    try:
+        document = docx.Document(io.BytesIO(source) if isinstance(source, bytes) else source)
+    except Exception as e:
+        raise UnsupportedDocumentError(f"Not a readable DOCX file ({e})") from e
+    return '\n'.join(_docx_lines(document.element.body, document))
+
+
+# ==================== BACKENDS ====================
+
+class TextBackend:
+    """Extracts the text layer of a PDF page by page"""
+    name = None
+
+    def open(self, source):
+        """source is a file path or the PDF bytes"""
+        raise NotImplementedError
+
+    def page_count(self, doc) -> int:
+        raise NotImplementedError
+
+    def page_text(self, doc, index: int) -> str:
+        raise NotImplementedError
+
+    def close(self, doc):
+        pass
+
+
+class PdfplumberBackend(TextBackend):
+    """Layout-aware extraction (slow, robust)"""
+    name = 'pdfplumber'
+
+    def open(self, source):
+        return pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+    def page_count(self, doc):
+        return len(doc.pages)
+
+    def page_text(self, doc, index):
+        return doc.pages[index].extract_text() or ''
+
+    def close(self, doc):
+        doc.close()
+
+
+class PdfiumBackend(TextBackend):
+    """Direct text-layer extraction through PDFium (fast)"""
+    name = 'pdfium'
+    # PDFium is not thread-safe; calls are serialized within a process
+    _lock = threading.RLock()
+
+    def open(self, source):
+        if pdfium is None:
+            raise RuntimeError("pypdfium2 is not installed")
+        with self._lock:
+            return pdfium.PdfDocument(source)
+
+    def page_count(self, doc):
+        with self._lock:
+            return len(doc)
+
+    def page_text(self, doc, index):
+        with self._lock:
+            page = doc[index]
+            try:
+                textpage = page.get_textpage()
+                try:
+                    text = textpage.get_text_range()
+                finally:
+                    textpage.close()
+            finally:
+                page.close()
+        # PDFium ends lines with \r\n, writes U+FFFE for hyphens at line breaks and marks
+        # soft hyphens with control characters
+        text = text.replace('\r\n', '\n').replace('\r', '\n').replace('\ufffe', '-')
+        return ''.join(ch for ch in text
+                       if ch in '\n\t' or unicodedata.category(ch) not in ('Cc', 'Cf'))
+
+    def close(self, doc):
+        with self._lock:
+            doc.close()
+
+
+BACKENDS = {
+    'pdfplumber': PdfplumberBackend(),
+    'pdfium': PdfiumBackend(),
+}
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Concrete configuration name: 'auto' (pdfium + pdfplumber fallback), 'pdfium' or 'pdfplumber'"""
+    backend = (backend or DEFAULT_BACKEND).lower()
+    if backend not in ('auto', 'pdfium', 'pdfplumber'):
+        raise ValueError(f"Unknown PDF text backend: {backend}")
+    if backend in ('auto', 'pdfium') and pdfium is None:
+        return 'pdfplumber'
+    return backend
+
+
+def text_looks_ok(text: str) -> bool:
+    """Cheap sanity checks for an extracted page (empty, garbled or glued-together text fails)"""
+    stripped = text.strip()
+    if not stripped:
+        return False
+    bad = sum(1 for ch in stripped if ch == '\ufffd' or unicodedata.category(ch) in ('Co', 'Cn'))
+    if bad > 0.02 * len(stripped):
+        return False
+    # Missing word spacing shows up as very long runs without whitespace
+    if len(stripped) > 200 and sum(ch.isspace() for ch in stripped) < 0.05 * len(stripped):
+        return False
+    return True
+
+
+class _Extractor:
+    """Opened document for one backend configuration, with per-page pdfplumber fallback"""
+
+    def __init__(self, source, backend: str):
+        self.source = source
+        self.backend = backend
+        self._primary = BACKENDS['pdfplumber' if backend == 'pdfplumber' else 'pdfium']
+        self._doc = self._primary.open(source)
+        self._fallback_doc = None
+        self.fallback_pages = 0
+
+    def page_count(self) -> int:
+        return self._primary.page_count(self._doc)
+
+    def page_text(self, index: int) -> str:
+        text = self._primary.page_text(self._doc, index)
+        if self.backend != 'auto' or text_looks_ok(text):
+            return text
+        fallback = BACKENDS['pdfplumber']
+        if self._fallback_doc is None:
+            self._fallback_doc = fallback.open(self.source)
+        self.fallback_pages += 1
+        fallback_text = fallback.page_text(self._fallback_doc, index)
+        return fallback_text if fallback_text.strip() else text
+
+    def close(self):
+        self._primary.close(self._doc)
+        if self._fallback_doc is not None:
+            BACKENDS['pdfplumber'].close(self._fallback_doc)
+
+
+# ==================== PROCESS POOL ====================
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Extraction pool for this process (spawned, so it is safe from threaded servers)"""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS,
+                                            mp_context=multiprocessing.get_context('spawn'))
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def _extract_document(source, max_pages, time_budget, backend: str) -> List[str]:
+    """Runs in a pool process: every line of one document"""
+    global _in_pool_worker
+    # The pool is already busy with other documents, so pages are not fanned out again
+    _in_pool_worker = True
+    return extract_lines(source, max_pages, time_budget, backend)
+
+
+def _extract_page_range(source, start: int, stop: int, backend: str) -> List[str]:
+    """Runs in a pool process: text of pages [start, stop)"""
+    extractor = _Extractor(source, backend)
+    try:
+        return [extractor.page_text(index) for index in range(start, stop)]
+    finally:
+        extractor.close()
+
+
+# ==================== PAGE STREAM ====================
+
+def iter_page_texts(source: DocumentSource, max_pages: Optional[int] = None,
+                    time_budget: Optional[float] = None, backend: Optional[str] = None) -> Iterator[str]:
+    """
+    Yield the text of each page in order ('' for pages without a text layer). Stops early,
+    with a warning, once max_pages pages were read or time_budget seconds have passed
+    (None uses the configured default, 0 means no limit). backend overrides PDF_TEXT_BACKEND.
+    A DOCX document is yielded as one page; the budgets and backend only apply to PDFs.
+    """
+    backend = resolve_backend(backend)
+    source = read_source(source)
+    if detect_format(source) == 'docx':
+        yield docx_text(source)
+        return
+    name = source_name(source)
+    max_pages = DEFAULT_MAX_PAGES if max_pages is None else max_pages
+    time_budget = DEFAULT_TIME_BUDGET if time_budget is None else time_budget
+    deadline = time.monotonic() + time_budget if time_budget else float('inf')
+
+    extractor = _Extractor(source, backend)
+    try:
+        page_count = extractor.page_count()
+        if max_pages and page_count > max_pages:
+            print(f"⚠️ {name} has {page_count} pages; reading the first {max_pages}")
+            page_count = max_pages
+
+        if page_count <= PARALLEL_PAGE_THRESHOLD or PDF_WORKERS <= 1 or _in_pool_worker:
+            for index in range(page_count):
+                if time.monotonic() > deadline:
+                    print(f"⚠️ Time budget hit after {index}/{page_count} pages of {name}")
+                    return
+                yield extractor.page_text(index)
+            if extractor.fallback_pages:
+                print(f"ℹ️ {extractor.fallback_pages} page(s) of {name} "
+                      f"re-extracted with pdfplumber")
+            return
+    finally:
+        extractor.close()
+
+    yield from _iter_page_texts_parallel(source, page_count, deadline, backend)
+
+
+def _iter_page_texts_parallel(source, page_count: int, deadline: float,
+                              backend: str) -> Iterator[str]:
+    pool = _get_pool()
+    futures = [pool.submit(_extract_page_range, source, start,
+                           min(start + PAGES_PER_TASK, page_count), backend)
+               for start in range(0, page_count, PAGES_PER_TASK)]
+    try:
+        for done, future in enumerate(futures):
+            try:
+                remaining = deadline - time.monotonic()
+                texts = future.result(timeout=None if remaining == float('inf') else max(remaining, 0))
+            except FutureTimeoutError:
+                print(f"⚠️ Time budget hit after {done * PAGES_PER_TASK}/{page_count} pages "
+                      f"of {source_name(source)}")
+                return
+            yield from texts
+    finally:
+        # Generator closed early (budget hit or consumer stopped): drop queued ranges
+        for future in futures:
+            future.cancel()
+
+
+# ==================== LINE STREAM ====================
+
+def iter_lines(page_texts) -> Iterator[str]:
+    """Non-empty stripped lines across pages, with consecutive duplicates removed"""
+    prev_line = None
+    for text in page_texts:
+        for line in text.split('\n'):
+            line = line.strip()
+            if line and line != prev_line:
+                yield line
+                prev_line = line
+
+
+def extract_lines(source: DocumentSource, max_pages: Optional[int] = None,
+                  time_budget: Optional[float] = None, backend: Optional[str] = None) -> List[str]:
+    """All cleaned lines of a PDF or DOCX document (path, bytes or binary stream)"""
+    return list(iter_lines(iter_page_texts(source, max_pages, time_budget, backend)))
+
+
+def extract_lines_many(sources: List[DocumentSource], max_pages: Optional[int] = None,
+                       time_budget: Optional[float] = None,
+                       backend: Optional[str] = None) -> List[Union[List[str], Exception]]:
+    """
+    extract_lines for each source, one document per pool process. An entry is the
+    document's lines, or the exception raised while extracting it.
+    """
+    backend = resolve_backend(backend)
+    results = []
+    if len(sources) <= 1 or PDF_WORKERS <= 1:
+        for source in sources:
+            try:
+                results.append(extract_lines(source, max_pages, time_budget, backend))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    pool = _get_pool()
+    futures = []
+    for source in sources:
+        try:
+            # Streams cannot be pickled; paths are opened by the worker
+            futures.append(pool.submit(_extract_document, read_source(source), max_pages,
+                                       time_budget, backend))
+        except Exception as e:
+            futures.append(e)
+    for future in futures:
+        if isinstance(future, Exception):
+            results.append(future)
+            continue
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(e)
+    return results
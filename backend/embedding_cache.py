@@ -0,0 +1,214 @@
+"""
+Embedding Cache
+Embeddings memoized by model id and normalized text. JD headers ("Responsibilities",
+"About the Role", "What we offer") repeat across nearly every document, so most parses
+find every vector here and skip the model entirely.
+
+A per-process LRU sits in front of an on-disk store shared by every process on the host:
+a float32 matrix file read through a memory map, plus a SQLite index of text -> row.
+Appends take an exclusive file lock, write the vectors first and index them second, so a
+reader never sees an index entry whose row is not fully written. Without fcntl (Windows)
+only the in-memory LRU is used.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # no shared on-disk store on this platform
+    fcntl = None
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Cache key text; whitespace differences do not change the tokens a model sees"""
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+class EmbeddingCache:
+    def __init__(self, directory: str, model_id: str, memory_entries: int = 4096):
+        """
+        directory      -> where the index and vector files live (one pair per model id)
+        model_id       -> vectors from different models / backends never mix
+        memory_entries -> vectors kept in this process (LRU)
+        """
+        self.directory = directory
+        self.model_id = model_id
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()    # normalized text -> vector
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stored': 0}
+
+        os.makedirs(directory, exist_ok=True)
+        stem = hashlib.sha1(model_id.encode('utf-8')).hexdigest()[:16]
+        self.index_path = os.path.join(directory, f"{stem}.db")
+        self.vectors_path = os.path.join(directory, f"{stem}.f32")
+        self.lock_path = os.path.join(directory, f"{stem}.lock")
+        self._dim = None
+        self._map = None                # memmap over the rows known when it was opened
+        self._map_rows = 0
+        self._map_pid = None
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                text TEXT PRIMARY KEY,
+                row INTEGER NOT NULL
+            )
+        """)
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('model_id', ?)", (model_id,))
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.index_path, timeout=10)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _dimension(self):
+        if self._dim is None:
+            row = self._conn().execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+            self._dim = int(row[0]) if row else None
+        return self._dim
+
+    # ==================== DISK STORE ====================
+
+    def _rows(self, rows: List[int]) -> np.ndarray:
+        """Vectors for row numbers; remaps the file when it has grown past the current map"""
+        needed = max(rows) + 1
+        with self._lock:
+            if self._map is None or self._map_rows < needed or self._map_pid != os.getpid():
+                dim = self._dimension()
+                total = os.path.getsize(self.vectors_path) // (dim * 4)
+                self._map = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(total, dim))
+                self._map_rows = total
+                self._map_pid = os.getpid()
+            return np.array(self._map[rows])
+
+    def _index_rows(self, texts: List[str]) -> Dict[str, int]:
+        found = {}
+        conn = self._conn()
+        # Chunked to stay under SQLite's bound-parameter limit
+        for start in range(0, len(texts), 500):
+            chunk = texts[start:start + 500]
+            found.update(conn.execute(
+                f"SELECT text, row FROM embeddings WHERE text IN ({','.join('?' * len(chunk))})",
+                chunk).fetchall())
+        return found
+
+    def _disk_get(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        if fcntl is None or self._dimension() is None:
+            return {}
+        found = self._index_rows(texts)
+        if not found:
+            return {}
+        names = list(found)
+        vectors = self._rows([found[name] for name in names])
+        return dict(zip(names, vectors))
+
+    def _disk_put(self, items: Dict[str, np.ndarray]):
+        if fcntl is None:
+            return
+        dim = len(next(iter(items.values())))
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                conn = self._conn()
+                stored_dim = self._dimension()
+                if stored_dim is None:
+                    with conn:
+                        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('dim', ?)", (str(dim),))
+                    self._dim = stored_dim = dim
+                if stored_dim != dim:
+                    raise ValueError(f"Embedding size {dim} does not match the cache ({stored_dim})")
+
+                present = self._index_rows(list(items))
+                new = [text for text in items if text not in present]
+                if not new:
+                    return
+                rows = conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM embeddings").fetchone()[0]
+                block = np.stack([items[text] for text in new]).astype(np.float32, copy=False)
+                with open(self.vectors_path, 'ab') as f:
+                    # Drop a partial row left by a writer that died mid-append
+                    f.truncate(rows * dim * 4)
+                    f.write(block.tobytes())
+                with conn:
+                    conn.executemany("INSERT INTO embeddings (text, row) VALUES (?, ?)",
+                                     [(text, rows + i) for i, text in enumerate(new)])
+                with self._lock:
+                    self._stats['stored'] += len(new)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ==================== LOOKUP ====================
+
+    def get_or_encode(self, texts: List[str], encode: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Vectors for texts in order; encode() is called once, with only the texts not cached"""
+        keys = [normalize_text(text) for text in texts]
+        vectors = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None and key not in vectors:
+                    self._memory.move_to_end(key)
+                    vectors[key] = vector
+            self._stats['memory_hits'] += len(vectors)
+
+        pending = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if pending:
+            try:
+                from_disk = self._disk_get(pending)
+            except (sqlite3.Error, OSError, ValueError) as e:
+                print(f"⚠️ Embedding cache read failed: {e}")
+                from_disk = {}
+            vectors.update(from_disk)
+            self._remember(from_disk)
+            with self._lock:
+                self._stats['disk_hits'] += len(from_disk)
+            pending = [key for key in pending if key not in from_disk]
+
+        if pending:
+            encoded = np.asarray(encode(pending), dtype=np.float32)
+            fresh = dict(zip(pending, encoded))
+            vectors.update(fresh)
+            self._remember(fresh)
+            with self._lock:
+                self._stats['misses'] += len(pending)
+            try:
+                self._disk_put(fresh)
+            except (sqlite3.Error, OSError, ValueError) as e:
+                print(f"⚠️ Embedding cache write failed: {e}")
+
+        return np.stack([vectors[key] for key in keys])
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((lookups - stats['misses']) / lookups, 4) if lookups else None
+        stats['model_id'] = self.model_id
+        return stats
+
+    def _remember(self, items: Dict[str, np.ndarray]):
+        with self._lock:
+            for key, vector in items.items():
+                self._memory[key] = vector
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
@@ -0,0 +1,414 @@
+"""
+Embedding Provider
+Single access point for sentence embeddings. The SentenceTransformer is loaded lazily on
+first use (importing a parser no longer pulls in torch), can be warmed up at startup, and
+can optionally live in one shared embedding server process that every API worker talks to
+instead of each worker holding its own copy of the model.
+
+    EMBEDDING_MODEL           model name (default all-MiniLM-L6-v2)
+    EMBEDDING_BACKEND         torch (sentence-transformers, default) | onnx (onnxruntime, no torch)
+    EMBEDDING_ONNX_DIR        exported model directory for the onnx backend (unset = from the Hub)
+    EMBEDDING_ONNX_FILE       ONNX file in that directory (default onnx/model.onnx;
+                              onnx/model_quint8_avx2.onnx etc. for int8)
+    EMBEDDING_THREADS         onnxruntime intra-op threads (default: runtime default)
+    EMBEDDING_CACHE           memoize vectors by text (default true)
+    EMBEDDING_CACHE_DIR       on-disk cache shared by processes on the host (default data/embedding_cache)
+    EMBEDDING_CACHE_MEMORY_ENTRIES  vectors kept per process (default 4096)
+    EMBEDDING_SERVER          unix:/path or host:port of a shared server (unset = load in-process)
+    EMBEDDING_SERVER_AUTHKEY  shared secret, required for host:port (optional extra check on unix sockets)
+    EMBEDDING_FALLBACK_LOCAL  load the model in-process if the server is unreachable (default true)
+
+Run the shared server with:  python embedding_provider.py serve [address]
+The server listens on a unix socket only its own user can open (default unix:data/embedding.sock).
+The wire format is plain length-prefixed frames: a JSON list of texts in, a JSON header and raw
+float32 bytes out, so nothing a client sends is ever unpickled or executed.
+Export an ONNX copy of a model (on a machine with torch) with:
+    python embedding_provider.py export-onnx <directory> [--int8]
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from typing import List
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+
+MODEL_NAME = os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+BACKEND = os.getenv('EMBEDDING_BACKEND', 'torch').lower()
+ONNX_FILE = os.getenv('EMBEDDING_ONNX_FILE', os.path.join('onnx', 'model.onnx'))
+# Identifies the vectors this process produces (cached results keyed by it are not mixed
+# across backends; int8 models give slightly different vectors)
+EMBEDDING_ID = MODEL_NAME if BACKEND == 'torch' else \
+    f"{MODEL_NAME}:onnx:{os.path.splitext(os.path.basename(ONNX_FILE))[0]}"
+DEFAULT_SERVER_ADDRESS = 'unix:' + os.path.join('data', 'embedding.sock')
+MAX_FRAME_BYTES = int(os.getenv('EMBEDDING_SERVER_MAX_FRAME_MB', 64)) * 1024 * 1024
+
+_model = None
+_model_lock = threading.Lock()
+_cache = None
+_cache_lock = threading.Lock()
+_client_local = threading.local()
+
+
+# ==================== ONNX BACKEND ====================
+
+def _hub_repo(model_name: str) -> str:
+    return model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+
+
+def _read_json(path: str, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class OnnxEmbedder:
+    """
+    Sentence-transformers pipeline (tokenize, transformer, pooling, normalize) on onnxruntime.
+    Reads a model directory laid out like a sentence-transformers save: tokenizer.json,
+    modules.json, sentence_bert_config.json, 1_Pooling/config.json and the ONNX file.
+    """
+
+    def __init__(self, model_dir: str, onnx_file: str = ONNX_FILE, threads: int = 0):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, onnx_file), options, providers=['CPUExecutionProvider'])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        modules = _read_json(os.path.join(model_dir, 'modules.json'), [])
+        self.normalize = any(m.get('type', '').endswith('Normalize') for m in modules)
+        pooling = _read_json(os.path.join(model_dir, '1_Pooling', 'config.json'), {})
+        self.pooling = 'cls' if pooling.get('pooling_mode_cls_token') else 'mean'
+        if pooling.get('pooling_mode_max_tokens') or pooling.get('pooling_mode_mean_sqrt_len_tokens'):
+            raise ValueError(f"Unsupported pooling in {model_dir}: {pooling}")
+        max_length = _read_json(os.path.join(model_dir, 'sentence_bert_config.json'), {}).get('max_seq_length', 256)
+        pad_token = _read_json(os.path.join(model_dir, 'tokenizer_config.json'), {}).get('pad_token', '[PAD]')
+        if isinstance(pad_token, dict):
+            pad_token = pad_token.get('content', '[PAD]')
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, 'tokenizer.json'))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token) or 0, pad_token=pad_token)
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Same contract as SentenceTransformer.encode for a list of strings"""
+        # Longest first, like sentence-transformers, so each batch pads to a similar length
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        batches = []
+        for start in range(0, len(order), batch_size):
+            encodings = self.tokenizer.encode_batch([texts[i] for i in order[start:start + batch_size]])
+            feeds = {
+                'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+                'attention_mask': np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            }
+            if 'token_type_ids' in self.input_names:
+                feeds['token_type_ids'] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+            hidden = self.session.run(None, feeds)[0]
+
+            if self.pooling == 'cls':
+                pooled = hidden[:, 0]
+            else:
+                mask = feeds['attention_mask'][:, :, None].astype(np.float32)
+                pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            batches.append(pooled)
+
+        embeddings = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.concatenate(batches)
+        if self.normalize:
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings
+
+
+def _onnx_model_dir() -> str:
+    model_dir = os.getenv('EMBEDDING_ONNX_DIR')
+    if model_dir:
+        return model_dir
+    from huggingface_hub import snapshot_download
+    return snapshot_download(_hub_repo(MODEL_NAME), allow_patterns=[
+        ONNX_FILE.replace(os.sep, '/'), '*.json', '1_Pooling/*'])
+
+
+def export_onnx(output_dir: str, int8: bool = False):
+    """Save MODEL_NAME as an ONNX model directory (needs sentence-transformers[onnx] and torch)"""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+    model = SentenceTransformer(MODEL_NAME, backend='onnx')
+    model.save(output_dir)
+    if int8:
+        export_dynamic_quantized_onnx_model(model, 'avx2', output_dir)
+    files = sorted(os.listdir(os.path.join(output_dir, 'onnx')))
+    print(f"📦 Exported {MODEL_NAME} to {output_dir}: {', '.join(files)}")
+    print(f"   EMBEDDING_BACKEND=onnx EMBEDDING_ONNX_DIR={output_dir} EMBEDDING_ONNX_FILE=onnx/<file>")
+
+
+# ==================== IN-PROCESS MODEL ====================
+
+def get_model():
+    """The embedding model for this process (SentenceTransformer or OnnxEmbedder), loaded on first call"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                started = time.time()
+                if BACKEND == 'onnx':
+                    _model = OnnxEmbedder(_onnx_model_dir(), ONNX_FILE,
+                                          threads=int(os.getenv('EMBEDDING_THREADS', 0)))
+                elif BACKEND == 'torch':
+                    # Imported here so processes that never embed never load torch
+                    from sentence_transformers import SentenceTransformer
+                    _model = SentenceTransformer(MODEL_NAME)
+                else:
+                    raise ValueError(f"Unknown EMBEDDING_BACKEND: {BACKEND}")
+                print(f"🧠 Loaded embedding model {EMBEDDING_ID} ({BACKEND}) in {time.time() - started:.1f}s")
+    return _model
+
+
+def _encode_local(texts: List[str]) -> np.ndarray:
+    return np.asarray(get_model().encode(list(texts)), dtype=np.float32)
+
+
+# ==================== WIRE PROTOCOL ====================
+# Every message is a 4-byte big-endian length followed by that many bytes.
+#   server -> client  32-byte random challenge
+#   client -> server  HMAC-SHA256(authkey, challenge)
+#   client -> server  JSON list of texts
+#   server -> client  JSON header {"status": "ok", "shape": [n, dim]} or {"status": "error", "error": ...}
+#   server -> client  n * dim little-endian float32 values (only after an ok header)
+
+def _parse_address(address: str):
+    if address.startswith('unix:'):
+        return address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    return (host or '127.0.0.1', int(port))
+
+
+def _authkey(address) -> bytes:
+    """Shared secret for address; TCP is refused without one"""
+    key = os.getenv('EMBEDDING_SERVER_AUTHKEY', '')
+    if not key and not isinstance(address, str):
+        raise RuntimeError("EMBEDDING_SERVER_AUTHKEY must be set to use a host:port embedding server; "
+                           "use a unix:/path address for an unauthenticated local socket")
+    return key.encode('utf-8')
+
+
+def _send_frame(sock, payload: bytes):
+    sock.sendall(struct.pack('>I', len(payload)) + payload)
+
+
+def _recv_exact(sock, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(min(size - len(buffer), 1 << 20))
+        if not chunk:
+            raise EOFError("embedding server connection closed")
+        buffer += chunk
+    return bytes(buffer)
+
+
+def _recv_frame(sock) -> bytes:
+    (size,) = struct.unpack('>I', _recv_exact(sock, 4))
+    if size > MAX_FRAME_BYTES:
+        raise ValueError(f"frame of {size} bytes exceeds {MAX_FRAME_BYTES}")
+    return _recv_exact(sock, size)
+
+
+def _signature(authkey: bytes, challenge: bytes) -> bytes:
+    return hmac.new(authkey, challenge, hashlib.sha256).digest()
+
+
+# ==================== SHARED SERVER CLIENT ====================
+
+def _server_connection():
+    """Per-thread (and per-process) connection to the embedding server"""
+    conn = getattr(_client_local, 'conn', None)
+    if conn is None or getattr(_client_local, 'pid', None) != os.getpid():
+        address = _parse_address(os.environ['EMBEDDING_SERVER'])
+        authkey = _authkey(address)
+        if isinstance(address, str):
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.connect(address)
+        else:
+            conn = socket.create_connection(address)
+        _send_frame(conn, _signature(authkey, _recv_frame(conn)))
+        _client_local.conn = conn
+        _client_local.pid = os.getpid()
+    return conn
+
+
+def _drop_server_connection():
+    conn = getattr(_client_local, 'conn', None)
+    _client_local.conn = None
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def _encode_remote(texts: List[str]) -> np.ndarray:
+    # One retry covers a server restart between requests
+    for attempt in range(2):
+        try:
+            conn = _server_connection()
+            _send_frame(conn, json.dumps(list(texts)).encode('utf-8'))
+            try:
+                header = json.loads(_recv_frame(conn))
+                if header.get('status') == 'ok':
+                    rows, dim = header['shape']
+                    embeddings = np.frombuffer(_recv_frame(conn), dtype='<f4').reshape(rows, dim)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                # Oversized or malformed reply: the stream is out of step, so it is never reused
+                raise ConnectionError(f"bad reply from embedding server: {e}") from e
+            break
+        except (OSError, EOFError):
+            _drop_server_connection()
+            if attempt:
+                raise
+    if header.get('status') != 'ok':
+        raise RuntimeError(f"Embedding server error: {header.get('error')}")
+    return embeddings.astype(np.float32)
+
+
+# ==================== PUBLIC API ====================
+
+def get_cache():
+    """The embedding cache for this process, or None when EMBEDDING_CACHE=false"""
+    global _cache
+    if os.getenv('EMBEDDING_CACHE', 'true').lower() != 'true':
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(
+                    os.getenv('EMBEDDING_CACHE_DIR', os.path.join('data', 'embedding_cache')),
+                    EMBEDDING_ID,
+                    memory_entries=int(os.getenv('EMBEDDING_CACHE_MEMORY_ENTRIES', 4096)))
+    return _cache
+
+
+def cache_stats():
+    cache = get_cache()
+    return cache.stats() if cache is not None else {'enabled': False}
+
+
+def encode(texts: List[str], use_cache: bool = True) -> np.ndarray:
+    """Embed a list of strings -> float32 array of shape (len(texts), dim)"""
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    cache = get_cache() if use_cache else None
+    if cache is not None:
+        return cache.get_or_encode(list(texts), _encode_uncached)
+    return _encode_uncached(texts)
+
+
+def _encode_uncached(texts: List[str]) -> np.ndarray:
+    if os.getenv('EMBEDDING_SERVER'):
+        try:
+            return _encode_remote(texts)
+        except (OSError, EOFError) as e:
+            if os.getenv('EMBEDDING_FALLBACK_LOCAL', 'true').lower() != 'true':
+                raise
+            print(f"⚠️ Embedding server unavailable ({e}); using in-process model")
+    return _encode_local(texts)
+
+
+def warm_up():
+    """Load the model (or connect to the server) now instead of on the first request"""
+    started = time.time()
+    # Past the cache, so the model really is loaded
+    encode(['warm up'], use_cache=False)
+    where = os.getenv('EMBEDDING_SERVER') or 'in-process'
+    print(f"🔥 Embeddings ready ({where}) in {time.time() - started:.1f}s")
+
+
+# ==================== SHARED SERVER ====================
+
+def _handle_client(conn, encode_lock, authkey: bytes):
+    try:
+        challenge = os.urandom(32)
+        _send_frame(conn, challenge)
+        # Without a key (unix socket) the file permissions are the access check
+        if authkey and not hmac.compare_digest(_recv_frame(conn), _signature(authkey, challenge)):
+            print("⚠️ Rejected embedding client: bad authkey")
+            return
+        if not authkey:
+            _recv_frame(conn)
+        while True:
+            try:
+                texts = json.loads(_recv_frame(conn))
+            except EOFError:
+                return
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                _send_frame(conn, json.dumps({'status': 'error', 'error': 'expected a list of strings'}).encode('utf-8'))
+                continue
+            try:
+                # One forward pass at a time; the runtime already parallelizes within a batch
+                with encode_lock:
+                    embeddings = _encode_local(texts)
+            except Exception as e:
+                _send_frame(conn, json.dumps({'status': 'error', 'error': str(e)}).encode('utf-8'))
+                continue
+            embeddings = np.ascontiguousarray(embeddings, dtype='<f4').reshape(len(texts), -1)
+            _send_frame(conn, json.dumps({'status': 'ok', 'shape': list(embeddings.shape)}).encode('utf-8'))
+            _send_frame(conn, embeddings.tobytes())
+    except (OSError, EOFError, ValueError) as e:
+        print(f"⚠️ Embedding client dropped: {e}")
+    finally:
+        conn.close()
+
+
+def _listen(address):
+    """Listening socket for address; unix sockets are created readable by this user only"""
+    if not isinstance(address, str):
+        return socket.create_server(address)
+    directory = os.path.dirname(address)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if os.path.exists(address):
+        os.unlink(address)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    previous = os.umask(0o177)
+    try:
+        sock.bind(address)
+    finally:
+        os.umask(previous)
+    os.chmod(address, 0o600)
+    sock.listen()
+    return sock
+
+
+def serve(address: str = None):
+    """Run the shared embedding server (blocks forever)"""
+    address = address or os.getenv('EMBEDDING_SERVER', DEFAULT_SERVER_ADDRESS)
+    parsed = _parse_address(address)
+    authkey = _authkey(parsed)
+    get_model()
+    encode_lock = threading.Lock()
+    listener = _listen(parsed)
+    print(f"🧠 Embedding server listening on {address}")
+    while True:
+        conn, _ = listener.accept()
+        threading.Thread(target=_handle_client, args=(conn, encode_lock, authkey), daemon=True).start()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == 'serve':
+        serve(sys.argv[2] if len(sys.argv) > 2 else None)
+    elif len(sys.argv) >= 3 and sys.argv[1] == 'export-onnx':
+        export_onnx(sys.argv[2], int8='--int8' in sys.argv[3:])
+    else:
+        print("Usage: python embedding_provider.py serve [unix:/path | host:port]")
+        print("       python embedding_provider.py export-onnx <directory> [--int8]")
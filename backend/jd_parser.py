@@ -1,25 +1,21 @@
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np 
-import pdfplumber
+import os
 import re
+import threading
+import time
 
-def extract_text_from_pdf(file_path):
-    text = ""
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() + "\n"
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
+from embedding_provider import encode
+from keyword_matcher import KeywordMatcher
+from document_text import extract_lines, extract_lines_many, resolve_backend, source_name
 
-    cleaned_lines = []
-    prev_line = None
-    for line in lines:
-        if line != prev_line:
-            cleaned_lines.append(line)
-            prev_line = line
-    return cleaned_lines
+# Bump when sectioning output changes so cached results are not reused
+PARSER_VERSION = f"1:{resolve_backend()}"
+# 'linear' (single pass over the lines) or 'legacy' (group, merge, then rescan Miscellaneous)
+SEGMENT_ENGINE = os.getenv('JD_SEGMENT_ENGINE', 'linear').lower()
 
-model = SentenceTransformer('all-MiniLM-L6-v2')
+def extract_text_from_pdf(source, backend=None):
+    """Cleaned lines of the JD (path, PDF bytes or binary stream; no blanks or consecutive duplicates)"""
+    return extract_lines(source, backend=backend)
 
 # Define very specific patterns with keywords
 section_keywords = {
@@ -93,19 +89,19 @@ section_keywords = {
     ]
 }
 
+_keyword_matchers = {}
+
+def get_keyword_matcher(section_keywords):
+    """Compiled matcher for a keyword table (built once per table)"""
+    entry = _keyword_matchers.get(id(section_keywords))
+    if entry is None or entry[0] is not section_keywords:
+        entry = (section_keywords, KeywordMatcher(section_keywords))
+        _keyword_matchers[id(section_keywords)] = entry
+    return entry[1]
+
 def calculate_section_scores(text_chunk, section_keywords):
-    """Calculate keyword-based scores for each section"""
-    text_lower = text_chunk.lower()
-    scores = {}
-    
-    for section, keywords in section_keywords.items():
-        score = 0
-        for keyword in keywords:
-            if keyword.lower() in text_lower:
-                score += 1
-        scores[section] = score
-    
-    return scores
+    """Calculate keyword-based scores for each section (one pass over the text)"""
+    return get_keyword_matcher(section_keywords).scores(text_chunk)
 
 def is_section_header(line, next_line=None):
     """Detect if a line is a section header"""
@@ -154,8 +150,96 @@ def classify_by_keywords(text, section_keywords):
         return max(scores.items(), key=lambda x: x[1])[0]
     return None
 
+class SectionClassifier:
+    """
+    Semantic fallback for headers that match no keywords. Label embeddings are computed
+    once per process and kept L2-normalized in a matrix, so scoring a batch of headers is
+    one encode call plus one matrix multiply.
+    """
+    
+    def __init__(self, section_keywords, use_keywords=False, threshold=0.5):
+        """
+        use_keywords -> also embed every keyword phrase; a label scores as the best of its
+                        name and its keywords
+        threshold    -> cosine similarity a label must exceed to be chosen
+        """
+        self.labels = list(section_keywords)
+        self.use_keywords = use_keywords
+        self.threshold = threshold
+        
+        # Each matrix row is a phrase; row_owner[i] is the label index it votes for
+        phrases = list(self.labels)
+        owners = list(range(len(self.labels)))
+        if use_keywords:
+            for index, label in enumerate(self.labels):
+                phrases.extend(section_keywords[label])
+                owners.extend([index] * len(section_keywords[label]))
+        self._phrases = phrases
+        self._row_owner = np.array(owners)
+        self._matrix = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _normalize(vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+    
+    def _label_matrix(self):
+        if self._matrix is None:
+            with self._lock:
+                if self._matrix is None:
+                    self._matrix = self._normalize(encode(self._phrases))
+        return self._matrix
+    
+    def classify_many(self, headers):
+        """Best label per header, or None when no label clears the threshold"""
+        if not headers:
+            return []
+        unique = list(dict.fromkeys(headers))
+        sims = self._normalize(encode(unique)) @ self._label_matrix().T
+        
+        if self.use_keywords:
+            # Collapse phrase columns to one score per label (max over its phrases)
+            label_sims = np.full((len(unique), len(self.labels)), -np.inf, dtype=np.float32)
+            for index in range(len(self.labels)):
+                label_sims[:, index] = sims[:, self._row_owner == index].max(axis=1)
+            sims = label_sims
+        
+        best = sims.argmax(axis=1)
+        by_header = {}
+        for row, header in enumerate(unique):
+            score = sims[row, best[row]]
+            by_header[header] = self.labels[best[row]] if score > self.threshold else None
+        return [by_header[header] for header in headers]
+
+
+section_classifier = SectionClassifier(section_keywords)
+
+def classify_headers(lines):
+    """
+    Section for every header line in the document, keyed by line index. Keyword matches win;
+    the remaining headers are embedded together in one batch.
+    """
+    header_sections = {}
+    unmatched = []
+    for i, line in enumerate(lines):
+        next_line = lines[i+1] if i + 1 < len(lines) else None
+        if is_section_header(line, next_line):
+            header_sections[i] = classify_by_keywords(line, section_keywords)
+            if header_sections[i] is None:
+                unmatched.append(i)
+    
+    if unmatched:
+        labels = section_classifier.classify_many([lines[i] for i in unmatched])
+        for i, label in zip(unmatched, labels):
+            header_sections[i] = label or "Miscellaneous"
+    
+    return header_sections
+
 def group_jd_sections_hybrid(lines):
     """Hybrid approach: structure + keywords + context"""
+    header_sections = classify_headers(lines)
     sections = {}
     current_section = "Miscellaneous"
     sections[current_section] = []
@@ -163,10 +247,8 @@ def group_jd_sections_hybrid(lines):
     buffer = []  # Buffer to accumulate lines before deciding section
     
     for i, line in enumerate(lines):
-        next_line = lines[i+1] if i + 1 < len(lines) else None
-        
         # Detect headers
-        if is_section_header(line, next_line):
+        if i in header_sections:
             # Before switching, classify accumulated buffer
             if buffer:
                 buffer_text = ' '.join(buffer)
@@ -180,28 +262,8 @@ def group_jd_sections_hybrid(lines):
                 sections[current_section].extend(buffer)
                 buffer = []
             
-            # Classify the header itself
-            header_section = classify_by_keywords(line, section_keywords)
-            
-            if header_section:
-                current_section = header_section
-            else:
-                # Check with semantic embedding as fallback
-                line_emb = model.encode([line])[0]
-                
-                # Create embeddings for section names
-                section_name_embs = {}
-                for section in section_keywords.keys():
-                    section_name_embs[section] = model.encode([section])[0]
-                
-                sims = {section: cosine_similarity([line_emb], [emb])[0][0] 
-                        for section, emb in section_name_embs.items()}
-                best_section, best_score = max(sims.items(), key=lambda x: x[1])
-                
-                if best_score > 0.5:
-                    current_section = best_section
-                else:
-                    current_section = "Miscellaneous"
+            # Header classified up front (keywords, else batched embedding fallback)
+            current_section = header_sections[i]
             
             if current_section not in sections:
                 sections[current_section] = []
@@ -317,6 +379,13 @@ def rescan_miscellaneous(sections, section_keywords):
     
     return sections
 
+# Sections folded into another one in the final output
+MERGED_SECTIONS = {
+    "Education": "Requirements",
+    "Experience": "Requirements",
+    "Equal Opportunity": "Company Info",
+}
+
 def post_process_sections(sections):
     """Merge and clean sections"""
     
@@ -336,12 +405,9 @@ def post_process_sections(sections):
         if not lines:
             continue
         
-        # Merge education and experience into requirements
-        if section in ["Education", "Experience"]:
-            final_sections["Requirements"].extend(lines)
-        # Merge equal opportunity into company info
-        elif section == "Equal Opportunity":
-            final_sections["Company Info"].extend(lines)
+        # Merge education and experience into requirements, equal opportunity into company info
+        if section in MERGED_SECTIONS:
+            final_sections[MERGED_SECTIONS[section]].extend(lines)
         # Keep others as is
         elif section in final_sections:
             final_sections[section].extend(lines)
@@ -355,12 +421,221 @@ def post_process_sections(sections):
     return {k: v for k, v in final_sections.items() if v}
 
 
-def process_job_description(file_path):
-    """Full pipeline: extract, group, and post-process JD sections"""
-    lines = extract_text_from_pdf(file_path)
-    jd_sections = group_jd_sections_hybrid(lines)
-    jd_sections = post_process_sections(jd_sections)
-    return jd_sections
+# ==================== LINEAR SEGMENTATION ====================
+
+FINAL_SECTIONS = ["Company Info", "Role", "Responsibilities", "Requirements",
+                  "Technical Skills", "Soft Skills", "Benefits", "Miscellaneous"]
+
+def _best_section(scores):
+    """classify_by_keywords on precomputed scores (same tie-breaking)"""
+    section, score = max(scores.items(), key=lambda x: x[1])
+    return section if score > 0 else None
+
+class LinearJDSegmenter:
+    """
+    Same output as group_jd_sections_hybrid + post_process_sections, in one pass over the
+    lines. Every line is scanned for keywords exactly once; the score of any run of lines
+    is the OR of their keyword bitmasks plus a short scan around each join, so windows are
+    never re-scored from scratch. Headers without a keyword match are embedded together
+    in one batch, and the Miscellaneous rescan reuses the same per-line masks.
+    """
+    
+    def __init__(self, section_keywords, classifier):
+        self.section_keywords = section_keywords
+        self.classifier = classifier
+    
+    def segment(self, lines):
+        """Section dict for the cleaned lines of one JD"""
+        return self.segment_many([lines])[0]
+    
+    def segment_many(self, documents, stats=None):
+        """
+        Section dicts for several documents' lines. All lines are scanned for keywords in one
+        pass, runs of lines with the same keywords share one score, and the headers needing
+        embeddings across every document go to the model in one batch. stats, if given, gets
+        the header counts and embedding time.
+        """
+        matcher = get_keyword_matcher(self.section_keywords)
+        lines = [line for document in documents for line in document]
+        scanned = matcher.scan_lines(lines)
+        by_mask = {}
+        
+        def classify(indices):
+            # (best keyword section, its score) for these lines joined by spaces
+            mask = scanned.mask_of(indices)
+            if mask not in by_mask:
+                scores = matcher.scores_from_mask(mask)
+                by_mask[mask] = (_best_section(scores), max(scores.values()))
+            return by_mask[mask]
+        
+        # Global line index ranges, one per document
+        spans = []
+        start = 0
+        for document in documents:
+            spans.append(range(start, start + len(document)))
+            start += len(document)
+        
+        header_sections = self._classify_headers(lines, spans, classify, stats)
+        return [self._finish(lines, self._group(lines, span, header_sections, classify), classify)
+                for span in spans]
+    
+    def _classify_headers(self, lines, spans, classify, stats=None):
+        header_sections = {}
+        unmatched = []
+        for span in spans:
+            for i in span:
+                if is_section_header(lines[i], lines[i+1] if i + 1 < span.stop else None):
+                    header_sections[i] = classify([i])[0]
+                    if header_sections[i] is None:
+                        unmatched.append(i)
+        started = time.perf_counter()
+        if unmatched:
+            labels = self.classifier.classify_many([lines[i] for i in unmatched])
+            for i, label in zip(unmatched, labels):
+                header_sections[i] = label or "Miscellaneous"
+        if stats is not None:
+            stats['headers'] = len(header_sections)
+            stats['headers_embedded'] = len({lines[i] for i in unmatched})
+            stats['embed_seconds'] = time.perf_counter() - started
+        return header_sections
+    
+    @staticmethod
+    def _group(lines, span, header_sections, classify):
+        """The grouping state machine, on the line indices of one document"""
+        sections = {"Miscellaneous": []}
+        current = "Miscellaneous"
+        buffer = []
+        
+        def flush(switch_if):
+            nonlocal current
+            keyword_section = classify(buffer)[0]
+            if keyword_section and switch_if(keyword_section):
+                current = keyword_section
+            sections.setdefault(current, []).extend(buffer)
+            buffer.clear()
+        
+        for i in span:
+            if i in header_sections:
+                if buffer:
+                    flush(lambda found: current == "Miscellaneous")
+                current = header_sections[i]
+                sections.setdefault(current, []).append(i)
+            else:
+                buffer.append(i)
+                if len(buffer) >= 5:
+                    flush(lambda found: found != current)
+        if buffer:
+            flush(lambda found: True)
+        return sections
+    
+    @staticmethod
+    def _rescue(lines, misc, classify):
+        """rescan_miscellaneous on line indices -> (rescued indices by final section, remaining)"""
+        headers = [is_section_header(lines[k], lines[misc[pos+1]] if pos + 1 < len(misc) else None)
+                   for pos, k in enumerate(misc)]
+        rescued = {}
+        remaining = []
+        
+        def rescue(section, indices):
+            rescued.setdefault(MERGED_SECTIONS.get(section, section), []).extend(indices)
+        
+        pos = 0
+        while pos < len(misc):
+            k = misc[pos]
+            line_section = classify([k])[0]
+            if headers[pos]:
+                if line_section:
+                    # The header and everything up to the next header
+                    end = pos + 1
+                    while end < len(misc) and not headers[end]:
+                        end += 1
+                    rescue(line_section, misc[pos:end])
+                    pos = end
+                else:
+                    remaining.append(k)
+                    pos += 1
+            elif line_section and is_bullet_or_numbered(lines[k]):
+                rescue(line_section, [k])
+                pos += 1
+            else:
+                group = misc[pos:pos+3]
+                best, score = classify(group)
+                if score >= 2:
+                    rescue(best, group)
+                    pos += len(group)
+                else:
+                    remaining.append(k)
+                    pos += 1
+        return rescued, remaining
+    
+    def _finish(self, lines, sections, classify):
+        final = {name: [] for name in FINAL_SECTIONS}
+        for section, indices in sections.items():
+            target = MERGED_SECTIONS.get(section, section)
+            final[target if target in final else "Miscellaneous"].extend(indices)
+        
+        rescued, final["Miscellaneous"] = self._rescue(lines, final["Miscellaneous"], classify)
+        for section, indices in rescued.items():
+            final[section].extend(indices)
+        
+        return {name: [lines[i] for i in indices] for name, indices in final.items() if indices}
+
+linear_segmenter = LinearJDSegmenter(section_keywords, section_classifier)
+
+def segment_jd_lines(lines, engine=None):
+    """Section dict for the cleaned lines of a JD; engine overrides JD_SEGMENT_ENGINE"""
+    engine = (engine or SEGMENT_ENGINE).lower()
+    if engine == 'linear':
+        return linear_segmenter.segment(lines)
+    if engine == 'legacy':
+        return post_process_sections(group_jd_sections_hybrid(lines))
+    raise ValueError(f"Unknown JD segmentation engine: {engine}")
+
+
+def process_job_description(source, backend=None, engine=None):
+    """Full pipeline: extract, group, and post-process JD sections (source: path, bytes or stream)"""
+    lines = extract_text_from_pdf(source, backend)
+    return segment_jd_lines(lines, engine)
+
+
+def process_job_descriptions(sources, backend=None, engine=None):
+    """
+    process_job_description for a batch of JDs -> (results, stats). results[i] is the section
+    dict for sources[i], or the exception raised while reading it. Documents are extracted in
+    parallel and segmented together (see LinearJDSegmenter.segment_many); stats holds the
+    document / line / header counts and the time spent in each stage.
+    """
+    engine = (engine or SEGMENT_ENGINE).lower()
+    sources = list(sources)
+    started = time.perf_counter()
+    extracted = extract_lines_many(sources, backend=backend)
+    extract_seconds = time.perf_counter() - started
+    
+    ok = [i for i, lines in enumerate(extracted) if not isinstance(lines, Exception)]
+    stats = {'documents': len(extracted), 'failed': len(extracted) - len(ok),
+             'lines': sum(len(extracted[i]) for i in ok), 'engine': engine}
+    segment_started = time.perf_counter()
+    if engine == 'linear':
+        sections = linear_segmenter.segment_many([extracted[i] for i in ok], stats)
+    else:
+        sections = [segment_jd_lines(extracted[i], engine) for i in ok]
+    results = list(extracted)
+    for i, document_sections in zip(ok, sections):
+        results[i] = document_sections
+    
+    total_seconds = time.perf_counter() - started
+    stats.update({
+        'extract_seconds': round(extract_seconds, 4),
+        'segment_seconds': round(time.perf_counter() - segment_started, 4),
+        'total_seconds': round(total_seconds, 4),
+        'documents_per_second': round(len(extracted) / total_seconds, 2) if total_seconds else None,
+    })
+    if 'embed_seconds' in stats:
+        stats['embed_seconds'] = round(stats['embed_seconds'], 4)
+    for source, lines in zip(sources, extracted):
+        if isinstance(lines, Exception):
+            print(f"⚠️ Could not read JD {source_name(source)}: {lines}")
+    return results, stats
 
 
 # Main execution
@@ -0,0 +1,437 @@
+"""
+Background Job Queue
+Persistent job table (SQLite, shared by every worker process on the host) with a
+thread pool that runs registered handlers, per-key deduplication and retries with backoff.
+Finished jobs are deleted once they are older than the retention period.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+ACTIVE_STATUSES = ('queued', 'running')
+FINISHED_STATUSES = ('succeeded', 'failed')
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (bad input, missing data)"""
+
+
+class JobQueue:
+    def __init__(self, path: str, workers: int = 2, max_attempts: int = 3,
+                 retry_delay: float = 5.0, poll_interval: float = 2.0,
+                 stale_after: float = 900.0, retention: float = 7 * 86400.0,
+                 prune_interval: float = 3600.0):
+        """
+        path          -> SQLite file holding the job table
+        workers       -> handler threads in this process (0 = submit only, never run jobs)
+        max_attempts  -> attempts per job before it is marked failed
+        retry_delay   -> base backoff in seconds (doubles per attempt)
+        poll_interval -> how often to look for jobs submitted by other processes
+        stale_after   -> running jobs without a heartbeat for this long are re-queued
+        retention     -> seconds a succeeded/failed job is kept after it finished (0 = forever)
+        prune_interval -> how often a running dispatcher deletes expired jobs
+        """
+        self.path = path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.retention = retention
+        self.prune_interval = prune_interval
+
+        self._handlers = {}
+        self._finish_listeners = []
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._running = set()
+        self._claimed = set()   # jobs run by callers of claim() in this process
+        self._executor = None
+        self._started_pid = None
+        self._stopping = False
+        self._worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                dedupe_key TEXT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                result TEXT,
+                error TEXT,
+                worker TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                run_after REAL NOT NULL,
+                heartbeat_at REAL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs (kind, dedupe_key, status)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_pending ON jobs (status, run_after)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (status, updated_at)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # ==================== REGISTRATION ====================
+
+    def register(self, kind: str, handler: Callable[[Dict], Dict]):
+        """Register the function that runs jobs of this kind (payload dict -> result dict)"""
+        self._handlers[kind] = handler
+
+    def add_finish_listener(self, callback: Callable[[Dict], None]):
+        """Call callback(job) in the worker process once a job succeeds or finally fails"""
+        self._finish_listeners.append(callback)
+
+    # ==================== SUBMIT / QUERY ====================
+
+    def submit(self, kind: str, payload: Dict, dedupe_key: Optional[str] = None,
+               force: bool = False) -> Dict:
+        """
+        Queue a job. With a dedupe_key, an active or already succeeded job of the same
+        kind/key is returned instead of queueing a duplicate (force=True skips the
+        succeeded check but still joins an active job).
+        """
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            existing = self._find_dedupe(conn, kind, dedupe_key, force)
+            if existing is not None:
+                conn.execute("COMMIT")
+                return existing
+
+            job_id = uuid.uuid4().hex
+            conn.execute("""
+                INSERT INTO jobs (job_id, kind, dedupe_key, payload, status, attempts,
+                                  max_attempts, created_at, updated_at, run_after)
+                VALUES (?, ?, ?, ?, 'queued', 0, ?, ?, ?, ?)
+            """, (job_id, kind, dedupe_key, json.dumps(payload), self.max_attempts, now, now, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        self._wakeup.set()
+        job = self.get(job_id)
+        job['deduplicated'] = False
+        return job
+
+    def claim(self, kind: str, payload: Dict, dedupe_key: Optional[str] = None,
+              force: bool = False, max_attempts: int = 1) -> Dict:
+        """
+        Like submit, but the caller runs the work itself (e.g. streaming it straight to a
+        client): a new job is created already 'running' in this process and must be closed
+        with complete() or handed to run_claimed(). Dedupe is the same as submit, so a
+        concurrent caller gets the in-flight job back (deduplicated=True) instead of doing
+        the work twice. With the default single attempt, a job whose process dies is failed
+        by the stale sweep; more attempts let it be re-queued for any worker.
+        """
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            existing = self._find_dedupe(conn, kind, dedupe_key, force)
+            if existing is not None:
+                conn.execute("COMMIT")
+                return existing
+
+            job_id = uuid.uuid4().hex
+            conn.execute("""
+                INSERT INTO jobs (job_id, kind, dedupe_key, payload, status, attempts, max_attempts,
+                                  worker, created_at, updated_at, run_after, heartbeat_at)
+                VALUES (?, ?, ?, ?, 'running', 1, ?, ?, ?, ?, ?, ?)
+            """, (job_id, kind, dedupe_key, json.dumps(payload), max_attempts, self._worker_id,
+                  now, now, now, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._lock:
+            self._claimed.add(job_id)
+        job = self.get(job_id)
+        job['deduplicated'] = False
+        return job
+
+    def run_claimed(self, job: Dict):
+        """
+        Run a job taken with claim() through its registered handler in this process, with the
+        usual retries (re-queued for any worker) and finish listeners. Returns immediately.
+        """
+        self.start()
+        with self._lock:
+            self._claimed.discard(job['job_id'])
+            self._running.add(job['job_id'])
+        if self._executor is not None:
+            self._executor.submit(self._run, job)
+        else:
+            # workers=0: this process never dispatches, but it still runs what it claimed
+            threading.Thread(target=self._run, args=(job,), name='job-claimed', daemon=True).start()
+
+    def complete(self, job_id: str, result: Dict = None, error: str = None) -> Dict:
+        """Finish a job taken with claim(): failed when error is given, else succeeded"""
+        self._finish(job_id, 'failed' if error else 'succeeded', result=result, error=error)
+        with self._lock:
+            self._claimed.discard(job_id)
+        self._wakeup.set()
+        job = self.get(job_id)
+        for callback in self._finish_listeners:
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"⚠️ Job finish listener error for {job_id}: {e}")
+        return job
+
+    def _find_dedupe(self, conn, kind: str, dedupe_key: Optional[str], force: bool) -> Optional[Dict]:
+        """Job a new submission of kind/key should join instead (inside the caller's transaction)"""
+        if dedupe_key is None:
+            return None
+        statuses = ACTIVE_STATUSES if force else ACTIVE_STATUSES + ('succeeded',)
+        placeholders = ','.join('?' * len(statuses))
+        row = conn.execute(f"""
+            SELECT * FROM jobs
+            WHERE kind = ? AND dedupe_key = ? AND status IN ({placeholders})
+            ORDER BY created_at DESC LIMIT 1
+        """, (kind, dedupe_key, *statuses)).fetchone()
+        if row is None:
+            return None
+        job = self._row_to_job(row)
+        job['deduplicated'] = True
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        row = self._conn().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def find(self, kind: str, dedupe_key: str) -> Optional[Dict]:
+        """Most recent job of this kind/key, whatever its status"""
+        row = self._conn().execute("""
+            SELECT * FROM jobs WHERE kind = ? AND dedupe_key = ?
+            ORDER BY created_at DESC LIMIT 1
+        """, (kind, dedupe_key)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def stats(self) -> Dict:
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        with self._lock:
+            running_here = len(self._running)
+        return {
+            'by_status': {status: count for status, count in rows},
+            'running_in_process': running_here,
+            'workers': self.workers,
+            'worker_id': self._worker_id,
+        }
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Delete succeeded/failed jobs that finished more than `retention` seconds ago"""
+        if self.retention <= 0:
+            return 0
+        cutoff = (now if now is not None else time.time()) - self.retention
+        placeholders = ','.join('?' * len(FINISHED_STATUSES))
+        deleted = self._conn().execute(f"""
+            DELETE FROM jobs WHERE status IN ({placeholders}) AND updated_at < ?
+        """, (*FINISHED_STATUSES, cutoff)).rowcount
+        if deleted:
+            print(f"🧹 Pruned {deleted} finished jobs older than {self.retention / 86400:g} days")
+        return deleted
+
+    @staticmethod
+    def _row_to_job(row) -> Dict:
+        job = dict(row)
+        job['payload'] = json.loads(job['payload']) if job['payload'] else None
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    # ==================== WORKERS ====================
+
+    def start(self):
+        """Start the dispatcher thread and handler pool for this process (idempotent, fork-aware)"""
+        if self.workers <= 0 or self._started_pid == os.getpid():
+            return
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            # Threads do not survive fork(), so a forked worker starts its own
+            self._running = set()
+            self._claimed = set()
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job-worker')
+            threading.Thread(target=self._dispatch_loop, name='job-dispatcher', daemon=True).start()
+            self._started_pid = os.getpid()
+        print(f"⚙️ Job queue started ({self.workers} workers, {self.path})")
+
+    def stop(self, wait: bool = True):
+        self._stopping = True
+        self._wakeup.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+    def _dispatch_loop(self):
+        # First pass prunes right away, so a worker start clears out what piled up while it was down
+        last_maintenance = last_prune = 0.0
+        while not self._stopping:
+            try:
+                now = time.time()
+                if now - last_maintenance >= self.poll_interval:
+                    self._heartbeat_and_requeue_stale(now)
+                    last_maintenance = now
+                if now - last_prune >= self.prune_interval:
+                    last_prune = now
+                    self.prune(now)
+
+                self._wakeup.clear()
+                claimed = False
+                while self._free_slots() > 0:
+                    job = self._claim_next()
+                    if job is None:
+                        break
+                    claimed = True
+                    with self._lock:
+                        self._running.add(job['job_id'])
+                    self._executor.submit(self._run, job)
+
+                if not claimed:
+                    self._wakeup.wait(self.poll_interval)
+            except Exception as e:
+                print(f"❌ Job dispatcher error: {e}")
+                traceback.print_exc()
+                time.sleep(self.poll_interval)
+
+    def _free_slots(self) -> int:
+        with self._lock:
+            return self.workers - len(self._running)
+
+    def _claim_next(self) -> Optional[Dict]:
+        """Atomically move the oldest runnable job to 'running' for this process"""
+        kinds = list(self._handlers)
+        if not kinds:
+            return None
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            placeholders = ','.join('?' * len(kinds))
+            row = conn.execute(f"""
+                SELECT job_id FROM jobs
+                WHERE status = 'queued' AND run_after <= ? AND kind IN ({placeholders})
+                ORDER BY run_after, created_at LIMIT 1
+            """, (now, *kinds)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute("""
+                UPDATE jobs
+                SET status = 'running', attempts = attempts + 1, worker = ?,
+                    updated_at = ?, heartbeat_at = ?
+                WHERE job_id = ?
+            """, (self._worker_id, now, now, row['job_id']))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row['job_id'])
+
+    def _heartbeat_and_requeue_stale(self, now: float):
+        conn = self._conn()
+        with self._lock:
+            running = list(self._running | self._claimed)
+        if running:
+            placeholders = ','.join('?' * len(running))
+            conn.execute(f"UPDATE jobs SET heartbeat_at = ? WHERE job_id IN ({placeholders})",
+                         (now, *running))
+        # Jobs whose worker process died mid-run
+        conn.execute("""
+            UPDATE jobs SET status = 'queued', run_after = ?, updated_at = ?,
+                error = 'Worker stopped responding; re-queued'
+            WHERE status = 'running' AND heartbeat_at < ? AND attempts < max_attempts
+        """, (now, now, now - self.stale_after))
+        conn.execute("""
+            UPDATE jobs SET status = 'failed', updated_at = ?,
+                error = 'Worker stopped responding; no attempts left'
+            WHERE status = 'running' AND heartbeat_at < ? AND attempts >= max_attempts
+        """, (now, now - self.stale_after))
+
+    def _run(self, job: Dict):
+        job_id = job['job_id']
+        handler = self._handlers[job['kind']]
+        print(f"⚙️ Running {job['kind']} job {job_id} (attempt {job['attempts']}/{job['max_attempts']})")
+        try:
+            result = handler(job['payload'])
+            self._finish(job_id, 'succeeded', result=result)
+            print(f"✅ Job {job_id} succeeded")
+        except Exception as e:
+            retryable = not isinstance(e, PermanentJobError) and job['attempts'] < job['max_attempts']
+            if retryable:
+                delay = self.retry_delay * (2 ** (job['attempts'] - 1))
+                self._requeue(job_id, str(e), delay)
+                print(f"⚠️ Job {job_id} failed ({e}); retrying in {delay:.0f}s")
+            else:
+                self._finish(job_id, 'failed', error=str(e))
+                print(f"❌ Job {job_id} failed: {e}")
+                if not isinstance(e, PermanentJobError):
+                    traceback.print_exc()
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+            self._wakeup.set()
+
+        if not self._finish_listeners:
+            return
+        finished = self.get(job_id)
+        if finished is not None and finished['status'] in FINISHED_STATUSES:
+            for callback in self._finish_listeners:
+                try:
+                    callback(finished)
+                except Exception as e:
+                    print(f"⚠️ Job finish listener error for {job_id}: {e}")
+
+    def _requeue(self, job_id: str, error: str, delay: float):
+        now = time.time()
+        self._conn().execute("""
+            UPDATE jobs SET status = 'queued', error = ?, run_after = ?, updated_at = ?
+            WHERE job_id = ?
+        """, (error, now + delay, now, job_id))
+
+    def _finish(self, job_id: str, status: str, result: Dict = None, error: str = None):
+        self._conn().execute("""
+            UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ?
+            WHERE job_id = ?
+        """, (status, json.dumps(result, default=str) if result is not None else None,
+              error, time.time(), job_id))
+
+
+def job_status_payload(job: Dict) -> Dict:
+    """Public view of a job for status endpoints (no payload/result bodies)"""
+    return {
+        'job_id': job['job_id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'attempts': job['attempts'],
+        'max_attempts': job['max_attempts'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at'],
+    }
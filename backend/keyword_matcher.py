@@ -0,0 +1,234 @@
+"""
+Keyword Matcher
+Scores text against every section's keyword list in a single regex pass. The keywords are
+compiled once into a trie-shaped pattern; each search finds the longest keyword at the
+next position where any keyword starts and the scan resumes one character later. Shorter
+keywords contained in a match are added from a precomputed closure, so the scores are
+identical to running `keyword in text.lower()` for every keyword.
+
+Keyword sets can also be returned as integer bitmasks. scan_lines() scans a whole document
+once and scores any run of its lines joined by spaces from the per-line masks, so callers
+that score overlapping windows of lines never rescan them.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Dict, List, Set
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordMatcher:
+    def __init__(self, section_keywords: Dict[str, List[str]], word_boundaries: bool = False):
+        """
+        section_keywords -> {section: [keyword, ...]} (case-insensitive)
+        word_boundaries  -> only match keywords as whole words ("java" no longer matches
+                            inside "javascript"); off by default to keep substring semantics
+        """
+        self.sections = list(section_keywords)
+        self.word_boundaries = word_boundaries
+
+        # keyword -> sections listing it (a section listing it twice scores it twice, like the loop did)
+        self._owners = {}
+        for section, keywords in section_keywords.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword:
+                    self._owners.setdefault(keyword, []).append(section)
+
+        self._pattern = re.compile(self._trie_pattern(self._build_trie(self._owners)))
+        self._closure = {keyword: self._contained_keywords(keyword) for keyword in self._owners}
+
+        # Bitmask form: bit i is keyword i; a section keyword listed n times sits in n layers
+        self._bits = {keyword: 1 << index for index, keyword in enumerate(self._owners)}
+        self._closure_mask = {keyword: sum(self._bits[other] for other in contained)
+                              for keyword, contained in self._closure.items()}
+        self._section_layers = {section: [] for section in self.sections}
+        for keyword, owners in self._owners.items():
+            for section in owners:
+                layers = self._section_layers[section]
+                for index, layer in enumerate(layers):
+                    if not layer & self._bits[keyword]:
+                        layers[index] |= self._bits[keyword]
+                        break
+                else:
+                    layers.append(self._bits[keyword])
+        self._scores_by_mask = {}       # most texts share a handful of masks (often 0)
+
+        # Only keywords containing a space can run across the space that joins two lines. Split
+        # at such a space, the line before must end with the left piece (or be a suffix of it)
+        # and the line after must start with the right piece (or be a prefix of it).
+        spanning = [] if word_boundaries else [keyword for keyword in self._owners if ' ' in keyword]
+        pieces = [(k[:i], k[i + 1:]) for k in spanning for i, ch in enumerate(k) if ch == ' ']
+        self._span_pattern = re.compile(self._trie_pattern(self._build_trie(spanning))) if spanning else None
+        self._span_reach = max(map(len, spanning), default=1) - 1
+        self._left_reversed = re.compile(self._trie_pattern(self._build_trie({l[::-1] for l, _ in pieces})))
+        self._right_pattern = re.compile(self._trie_pattern(self._build_trie({r for _, r in pieces})))
+        self._left_suffixes = {l[i:] for l, _ in pieces for i in range(len(l) + 1)}
+        self._right_prefixes = {r[:i] for _, r in pieces for i in range(len(r) + 1)}
+
+    # ==================== COMPILATION ====================
+
+    @staticmethod
+    def _build_trie(keywords) -> Dict:
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for ch in keyword:
+                node = node.setdefault(ch, {})
+            node[''] = True
+        return trie
+
+    def _trie_pattern(self, node: Dict, prev_char: str = None) -> str:
+        """Regex for a trie node; longer continuations are tried before ending here"""
+        alternatives = []
+        for ch in sorted(k for k in node if k):
+            prefix = re.escape(ch)
+            if self.word_boundaries and prev_char is None and _is_word_char(ch):
+                prefix = r'\b' + prefix
+            alternatives.append(prefix + self._trie_pattern(node[ch], ch))
+        if '' in node:
+            alternatives.append(r'\b' if self.word_boundaries and _is_word_char(prev_char) else '')
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return '(?:' + '|'.join(alternatives) + ')'
+
+    def _keyword_regex(self, keyword: str):
+        start = r'\b' if self.word_boundaries and _is_word_char(keyword[0]) else ''
+        end = r'\b' if self.word_boundaries and _is_word_char(keyword[-1]) else ''
+        return re.compile(start + re.escape(keyword) + end)
+
+    def _contained_keywords(self, keyword: str) -> Set[str]:
+        """Every keyword that also occurs wherever this one matches"""
+        if not self.word_boundaries:
+            return {other for other in self._owners if other in keyword}
+        # Edges of the match already satisfy their own boundaries, so testing inside the keyword is exact
+        return {other for other in self._owners if self._keyword_regex(other).search(keyword)}
+
+    # ==================== MATCHING ====================
+
+    def _longest(self, text: str, pattern=None) -> Set[str]:
+        text = text.lower()
+        search = (pattern or self._pattern).search
+        longest = set()
+        match = search(text)
+        while match:
+            longest.add(match.group())
+            # Resume inside the match: another keyword may start there and run past its end
+            match = search(text, match.start() + 1)
+        return longest
+
+    def found(self, text: str) -> Set[str]:
+        """Distinct keywords occurring in text"""
+        longest = self._longest(text)
+        found = set()
+        for keyword in longest:
+            found |= self._closure[keyword]
+        return found
+
+    def scores(self, text: str) -> Dict[str, int]:
+        """Number of each section's keywords present in text (same as the per-keyword `in` loop)"""
+        scores = dict.fromkeys(self.sections, 0)
+        for keyword in self.found(text):
+            for section in self._owners[keyword]:
+                scores[section] += 1
+        return scores
+
+    # ==================== BITMASKS ====================
+
+    def mask(self, text: str) -> int:
+        """Distinct keywords occurring in text, as a bitmask"""
+        mask = 0
+        for keyword in self._longest(text):
+            mask |= self._closure_mask[keyword]
+        return mask
+
+    def scan_lines(self, lines: List[str]) -> 'ScannedLines':
+        """Keyword masks of every line, from one scan over the whole document"""
+        return ScannedLines(self, lines)
+
+    def scores_from_mask(self, mask: int) -> Dict[str, int]:
+        """scores() for text whose keyword mask is given"""
+        scores = self._scores_by_mask.get(mask)
+        if scores is None:
+            scores = {section: sum(bin(mask & layer).count('1') for layer in layers)
+                      for section, layers in self._section_layers.items()}
+            if len(self._scores_by_mask) >= 4096:
+                self._scores_by_mask.clear()
+            self._scores_by_mask[mask] = scores
+        return dict(scores)
+
+
+class ScannedLines:
+    """A document's lines with their keyword masks, for scoring runs of lines joined by spaces"""
+
+    def __init__(self, matcher: KeywordMatcher, lines: List[str]):
+        self.matcher = matcher
+        self.lines = lines
+        self._lowered = [line.lower() for line in lines]
+        self._may_end = {}      # index -> line could hold the start of a keyword crossing a join
+        self._may_start = {}    # index -> line could hold the end of one
+        self.masks = self._scan()
+
+    def _scan(self) -> List[int]:
+        matcher = self.matcher
+        if any('\n' in keyword for keyword in matcher._owners):
+            return [matcher.mask(line) for line in self.lines]
+        starts = []
+        offset = 0
+        for line in self._lowered:
+            starts.append(offset)
+            offset += len(line) + 1
+        # No keyword contains a newline, so no match runs from one line into the next
+        text = '\n'.join(self._lowered)
+        masks = [0] * len(self.lines)
+        search = matcher._pattern.search
+        match = search(text)
+        while match:
+            masks[bisect_right(starts, match.start()) - 1] |= matcher._closure_mask[match.group()]
+            match = search(text, match.start() + 1)
+        return masks
+
+    def _can_cross(self, left: int, right: int) -> bool:
+        """Whether a keyword could run across the space joining these two lines"""
+        matcher = self.matcher
+        if left not in self._may_end:
+            line = self._lowered[left]
+            self._may_end[left] = (line in matcher._left_suffixes
+                                   or matcher._left_reversed.match(line[::-1]) is not None)
+        if right not in self._may_start:
+            line = self._lowered[right]
+            self._may_start[right] = (line in matcher._right_prefixes
+                                      or matcher._right_pattern.match(line) is not None)
+        return self._may_end[left] and self._may_start[right]
+
+    def mask_of(self, indices: List[int]) -> int:
+        """mask(' '.join(lines[i] for i in indices)) without rescanning the lines"""
+        matcher = self.matcher
+        if len(indices) == 1:
+            return self.masks[indices[0]]
+        if matcher.word_boundaries:
+            # A window clipped around a join would invent word boundaries at its edges
+            return matcher.mask(' '.join(self.lines[i] for i in indices))
+        mask = 0
+        for i in indices:
+            mask |= self.masks[i]
+        if matcher._span_pattern is None:
+            return mask
+
+        joined = None
+        reach = matcher._span_reach
+        position = 0
+        for left, right in zip(indices, indices[1:]):
+            position += len(self._lowered[left])
+            if self._can_cross(left, right):
+                if joined is None:
+                    joined = ' '.join(self._lowered[i] for i in indices)
+                # A keyword covering this space lies within `reach` characters of it
+                region = joined[max(0, position - reach):position + 1 + reach]
+                for keyword in matcher._longest(region, matcher._span_pattern):
+                    mask |= matcher._closure_mask[keyword]
+            position += 1
+        return mask
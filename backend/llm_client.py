@@ -0,0 +1,278 @@
+"""
+LLM Client
+Long-lived connections to the report LLMs. One asyncio event loop runs on a background
+thread and owns an AsyncGroq client (httpx keep-alive pool) and an aiohttp session for
+Ollama, so consecutive calls reuse warm TCP/TLS connections instead of opening new ones.
+Flask handlers and job threads use the blocking facade (chat_groq, generate_ollama,
+stream_groq, stream_ollama), which runs the coroutines on that loop.
+
+Every call first takes its share of the shared LLM quota (llm_quota) at the caller's
+priority. A 429 from the provider pauses that model for every process and the call is
+retried (LLM_RATE_LIMIT_RETRIES times) once quota is available again.
+
+    OLLAMA_URL           Ollama server (default http://localhost:11434)
+    LLM_TIMEOUT          seconds per request (default 750)
+    LLM_MAX_CONNECTIONS  pooled connections per provider (default 10)
+    LLM_RATE_LIMIT_RETRIES  retries after a provider 429 (default 2)
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import queue
+import threading
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from llm_quota import PRIORITY_NORMAL, estimate_tokens, get_quota, rate_limit_retry_after
+
+OLLAMA_URL = os.getenv('OLLAMA_URL', 'http://localhost:11434')
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 750))
+LLM_MAX_CONNECTIONS = int(os.getenv('LLM_MAX_CONNECTIONS', 10))
+LLM_RATE_LIMIT_RETRIES = int(os.getenv('LLM_RATE_LIMIT_RETRIES', 2))
+
+_DONE = object()
+
+
+class LLMClient:
+    def __init__(self, groq_key: Optional[str] = None, ollama_url: str = OLLAMA_URL,
+                 timeout: float = LLM_TIMEOUT, max_connections: int = LLM_MAX_CONNECTIONS,
+                 quota=None):
+        """
+        groq_key        -> Groq API key (only needed for the Groq calls)
+        ollama_url      -> base URL of the Ollama server
+        timeout         -> seconds per request; streams time out when no chunk arrives for this long
+        max_connections -> keep-alive pool size per provider
+        quota           -> LLMQuota to draw from (default: the process-wide one, None if disabled)
+        """
+        self.quota = quota if quota is not None else get_quota()
+        self.groq_key = groq_key
+        self.ollama_url = ollama_url.rstrip('/')
+        self.timeout = timeout
+        self.max_connections = max_connections
+
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._loop_pid = None
+        self._groq = None       # created on the loop, so they bind to it
+        self._session = None
+        self._stats = {'requests': 0, 'streams': 0, 'errors': 0, 'rate_limited': 0}
+
+    # ==================== EVENT LOOP ====================
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        # Started lazily per process: a forked worker gets its own loop and connections
+        if self._loop is None or self._loop_pid != os.getpid():
+            with self._lock:
+                if self._loop is None or self._loop_pid != os.getpid():
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(target=loop.run_forever, name='llm-client', daemon=True)
+                    thread.start()
+                    if self._loop_pid is None:
+                        atexit.register(self.close)
+                    self._loop, self._thread, self._loop_pid = loop, thread, os.getpid()
+                    self._groq = None
+                    self._session = None
+        return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run a coroutine on the client's loop and wait for its result"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+        try:
+            return future.result(timeout if timeout is not None else self.timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def iterate(self, agen: AsyncIterator) -> Iterator:
+        """Items of an async generator, consumed on the client's loop, as a blocking iterator"""
+        items = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in agen:
+                    items.put((item, None))
+            except Exception as e:
+                items.put((None, e))
+            finally:
+                items.put(_DONE)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._get_loop())
+        try:
+            while True:
+                try:
+                    entry = items.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"No LLM output for {self.timeout:.0f}s")
+                if entry is _DONE:
+                    return
+                item, error = entry
+                if error is not None:
+                    raise error
+                yield item
+        finally:
+            # Consumer stopped early (client went away): cancelling closes the HTTP response
+            future.cancel()
+
+    def close(self):
+        """Close pooled connections and stop the loop (registered with atexit)"""
+        loop = self._loop
+        if loop is None or self._loop_pid != os.getpid() or not loop.is_running():
+            return
+
+        async def shutdown():
+            if self._session is not None:
+                await self._session.close()
+            if self._groq is not None:
+                await self._groq.close()
+            self._session = self._groq = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result(5)
+        except Exception as e:
+            print(f"⚠️ LLM client shutdown: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['loop_running'] = self._loop is not None and self._loop_pid == os.getpid()
+        stats['groq_connected'] = self._groq is not None
+        stats['ollama_connected'] = self._session is not None
+        return stats
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    # ==================== CONNECTIONS ====================
+
+    def _groq_client(self):
+        """AsyncGroq bound to this loop (only ever called on the loop thread)"""
+        if self._groq is None:
+            import httpx
+            from groq import AsyncGroq
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_connections)
+            self._groq = AsyncGroq(api_key=self.groq_key, timeout=self.timeout,
+                                   http_client=httpx.AsyncClient(limits=limits, timeout=self.timeout))
+        return self._groq
+
+    def _ollama_session(self):
+        """aiohttp session bound to this loop (only ever called on the loop thread)"""
+        if self._session is None:
+            import aiohttp
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    # ==================== QUOTA ====================
+
+    async def _within_quota(self, provider: str, model: str, tokens: int, priority: int, call):
+        """await call() once the shared quota allows it; a 429 pauses the model and retries"""
+        for attempt in range(LLM_RATE_LIMIT_RETRIES + 1):
+            if self.quota is not None:
+                await self.quota.acquire_async(provider, model, tokens, priority)
+            try:
+                return await call()
+            except Exception as e:
+                retry_after = rate_limit_retry_after(e)
+                if retry_after is None or attempt == LLM_RATE_LIMIT_RETRIES:
+                    self._count('errors')
+                    raise
+                self._count('rate_limited')
+                if self.quota is not None:
+                    await asyncio.to_thread(self.quota.backoff, provider, model, retry_after)
+                else:
+                    await asyncio.sleep(retry_after)
+
+    @staticmethod
+    def _groq_tokens(messages: List[Dict], params: Dict) -> int:
+        prompt = sum(estimate_tokens(str(message.get('content', ''))) for message in messages)
+        return prompt + int(params.get('max_completion_tokens') or params.get('max_tokens') or 0)
+
+    # ==================== ASYNC API ====================
+
+    async def achat_groq(self, model: str, messages: List[Dict], priority: int = PRIORITY_NORMAL,
+                         **params) -> str:
+        """Full completion text"""
+        self._count('requests')
+        completion = await self._within_quota(
+            'groq', model, self._groq_tokens(messages, params), priority,
+            lambda: self._groq_client().chat.completions.create(
+                model=model, messages=messages, stream=False, **params))
+        return completion.choices[0].message.content or ''
+
+    async def astream_groq(self, model: str, messages: List[Dict], priority: int = PRIORITY_NORMAL,
+                           **params) -> AsyncIterator[str]:
+        """Completion text chunks as they arrive"""
+        self._count('streams')
+        stream = await self._within_quota(
+            'groq', model, self._groq_tokens(messages, params), priority,
+            lambda: self._groq_client().chat.completions.create(
+                model=model, messages=messages, stream=True, **params))
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+
+    async def agenerate_ollama(self, model: str, prompt: str, priority: int = PRIORITY_NORMAL,
+                               **options) -> str:
+        """Full /api/generate response text"""
+        self._count('requests')
+        payload = {"model": model, "prompt": prompt, "stream": False}
+        if options:
+            payload["options"] = options
+
+        async def call():
+            async with self._ollama_session().post(f"{self.ollama_url}/api/generate", json=payload) as response:
+                response.raise_for_status()
+                return await response.json()
+
+        data = await self._within_quota('ollama', model, estimate_tokens(prompt), priority, call)
+        return data.get("response", "").strip() or data.get("output") or ""
+
+    async def astream_ollama(self, model: str, prompt: str, priority: int = PRIORITY_NORMAL,
+                             **options) -> AsyncIterator[str]:
+        """/api/generate text chunks from Ollama's newline-delimited JSON stream"""
+        self._count('streams')
+        payload = {"model": model, "prompt": prompt, "stream": True}
+        if options:
+            payload["options"] = options
+        if self.quota is not None:
+            await self.quota.acquire_async('ollama', model, estimate_tokens(prompt), priority)
+        async with self._ollama_session().post(f"{self.ollama_url}/api/generate", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.content:
+                line = line.strip()
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(f"Ollama error: {data['error']}")
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
+
+    # ==================== SYNC FACADE ====================
+
+    def chat_groq(self, model: str, messages: List[Dict], priority: int = PRIORITY_NORMAL, **params) -> str:
+        return self.run(self.achat_groq(model, messages, priority, **params))
+
+    def stream_groq(self, model: str, messages: List[Dict], priority: int = PRIORITY_NORMAL,
+                    **params) -> Iterator[str]:
+        return self.iterate(self.astream_groq(model, messages, priority, **params))
+
+    def generate_ollama(self, model: str, prompt: str, priority: int = PRIORITY_NORMAL, **options) -> str:
+        return self.run(self.agenerate_ollama(model, prompt, priority, **options))
+
+    def stream_ollama(self, model: str, prompt: str, priority: int = PRIORITY_NORMAL,
+                      **options) -> Iterator[str]:
+        return self.iterate(self.astream_ollama(model, prompt, priority, **options))
@@ -0,0 +1,301 @@
+"""
+LLM Quota
+Token buckets per provider/model, kept in a SQLite file so every API worker and agent
+process on the host draws from the same budget. Each limited model has a requests bucket
+(LLM_QUOTA_*_RPM) and optionally a token bucket (LLM_QUOTA_*_TPM); both refill
+continuously and hold at most one minute's worth.
+
+Callers that cannot proceed join a queue in the same file and are served in priority
+order (then arrival order), so a live interview turn is not stuck behind a batch of
+reports. acquire_async() waits with asyncio.sleep and never blocks the event loop;
+acquire() is for plain threads. A provider 429 drains the model's buckets for the
+retry-after period (backoff) so no process keeps hammering it.
+
+    LLM_QUOTA                     true | false (default true)
+    LLM_QUOTA_PATH                SQLite file (default data/llm_quota.db)
+    LLM_QUOTA_<PROVIDER>_RPM      requests per minute for every model of a provider
+    LLM_QUOTA_<PROVIDER>_TPM      tokens per minute (prompt estimate + max output)
+    LLM_QUOTA_<PROVIDER>_<MODEL>_RPM / _TPM   per-model override (non-alphanumerics -> _)
+
+Defaults: groq 30 RPM, gemini 15 RPM; ollama (local) is unlimited.
+"""
+
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+PRIORITY_INTERACTIVE = 0    # someone is waiting on this call right now (live interview turn)
+PRIORITY_NORMAL = 1         # user-visible but not real time (streamed reports)
+PRIORITY_BACKGROUND = 2     # queued jobs
+
+DEFAULT_LIMITS = {
+    'groq': {'rpm': 30},
+    'gemini': {'rpm': 15},
+}
+
+_quota = None
+_quota_lock = threading.Lock()
+
+
+class QuotaTimeout(TimeoutError):
+    """No quota became available within the caller's timeout"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for budgeting, not billing"""
+    return len(text) // 4 + 1
+
+
+def rate_limit_retry_after(error: Exception, default: float = 10.0) -> Optional[float]:
+    """Seconds to back off if error is a provider rate limit (HTTP 429), else None"""
+    status = getattr(error, 'status_code', None) or getattr(error, 'status', None) or getattr(error, 'code', None)
+    if status != 429 and type(error).__name__ not in ('RateLimitError', 'ResourceExhausted', 'TooManyRequests'):
+        return None
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after', default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_key(*parts: str) -> str:
+    return re.sub(r'[^A-Z0-9]+', '_', '_'.join(parts).upper()).strip('_')
+
+
+class LLMQuota:
+    def __init__(self, path: str, limits: Optional[Dict[str, Dict]] = None,
+                 poll_interval: float = 0.25, waiter_lease: float = 10.0):
+        """
+        path          -> SQLite file shared by every process on the host
+        limits        -> {provider or "provider:model": {'rpm': n, 'tpm': n}}; models without
+                         an entry use their provider's, providers without one are unlimited
+        poll_interval -> longest sleep between checks while queued
+        waiter_lease  -> a queued caller that stops polling this long loses its place
+                         (covers processes that died while waiting)
+        """
+        self.path = path
+        self.limits = dict(limits if limits is not None else DEFAULT_LIMITS)
+        self.poll_interval = poll_interval
+        self.waiter_lease = waiter_lease
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {'acquired': 0, 'waited': 0, 'wait_seconds': 0.0, 'timeouts': 0, 'backoffs': 0}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                name TEXT PRIMARY KEY,
+                level REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS waiters (
+                ticket TEXT PRIMARY KEY,
+                scope TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                enqueued_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_waiters_scope ON waiters (scope, priority, enqueued_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # ==================== LIMITS ====================
+
+    @classmethod
+    def from_env(cls) -> 'LLMQuota':
+        """Quota configured from LLM_QUOTA_* (provider-level variables for the known providers)"""
+        limits = {provider: dict(limit) for provider, limit in DEFAULT_LIMITS.items()}
+        for provider in ('groq', 'gemini', 'ollama'):
+            for unit in ('rpm', 'tpm'):
+                value = os.getenv(f"LLM_QUOTA_{_env_key(provider, unit)}")
+                if value is not None:
+                    limits.setdefault(provider, {})[unit] = float(value)
+        return cls(os.getenv('LLM_QUOTA_PATH', os.path.join('data', 'llm_quota.db')), limits)
+
+    def limits_for(self, provider: str, model: str) -> Dict[str, float]:
+        """{'rpm': n, 'tpm': n} for a model; empty means unlimited"""
+        limit = dict(self.limits.get(f"{provider}:{model}", self.limits.get(provider, {})))
+        for unit in ('rpm', 'tpm'):
+            value = os.getenv(f"LLM_QUOTA_{_env_key(provider, model, unit)}")
+            if value is not None:
+                limit[unit] = float(value)
+        return {unit: value for unit, value in limit.items() if value}
+
+    def _buckets(self, provider: str, model: str, tokens: int) -> List[Tuple[str, float, float, float]]:
+        """(name, capacity, refill per second, cost) for each bucket a call draws from"""
+        limit = self.limits_for(provider, model)
+        buckets = []
+        if 'rpm' in limit:
+            buckets.append((f"{provider}:{model}:requests", limit['rpm'], limit['rpm'] / 60, 1))
+        if 'tpm' in limit:
+            # A call larger than the whole bucket would wait forever; it takes a full bucket
+            buckets.append((f"{provider}:{model}:tokens", limit['tpm'], limit['tpm'] / 60,
+                            min(max(tokens, 1), limit['tpm'])))
+        return buckets
+
+    # ==================== ACQUIRE ====================
+
+    def try_acquire(self, provider: str, model: str, tokens: int = 0,
+                    priority: int = PRIORITY_NORMAL, ticket: Optional[str] = None) -> float:
+        """
+        Take quota if it is available and no one with precedence is queued: returns 0. Else
+        returns the seconds to wait before trying again and, with a ticket, holds the
+        caller's place in the queue.
+        """
+        buckets = self._buckets(provider, model, tokens)
+        if not buckets:
+            return 0.0
+        scope = f"{provider}:{model}"
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            conn.execute("DELETE FROM waiters WHERE expires_at < ?", (now,))
+            head = conn.execute("""
+                SELECT ticket FROM waiters WHERE scope = ?
+                ORDER BY priority, enqueued_at, ticket LIMIT 1
+            """, (scope,)).fetchone()
+
+            wait = 0.0
+            levels = {}
+            for name, capacity, rate, cost in buckets:
+                row = conn.execute("SELECT level, updated_at FROM buckets WHERE name = ?", (name,)).fetchone()
+                level, updated_at = row if row else (capacity, now)
+                levels[name] = min(capacity, level + max(0.0, now - updated_at) * rate)
+                if levels[name] < cost:
+                    wait = max(wait, (cost - levels[name]) / rate)
+            if head is not None and head[0] != ticket:
+                # Someone ahead in the queue gets the next tokens
+                wait = max(wait, self.poll_interval)
+
+            if wait == 0:
+                for name, _, _, cost in buckets:
+                    conn.execute("INSERT OR REPLACE INTO buckets (name, level, updated_at) VALUES (?, ?, ?)",
+                                 (name, levels[name] - cost, now))
+                if ticket is not None:
+                    conn.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+            elif ticket is not None:
+                conn.execute("""
+                    INSERT INTO waiters (ticket, scope, priority, enqueued_at, expires_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (ticket) DO UPDATE SET expires_at = excluded.expires_at
+                """, (ticket, scope, priority, now, now + self.waiter_lease))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def _leave(self, ticket: str):
+        try:
+            self._conn().execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not leave the LLM quota queue: {e}")
+
+    def _record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self._stats['timeouts'] += 1
+                return
+            self._stats['acquired'] += 1
+            if waited > 0:
+                self._stats['waited'] += 1
+                self._stats['wait_seconds'] += waited
+
+    def acquire(self, provider: str, model: str, tokens: int = 0, priority: int = PRIORITY_NORMAL,
+                timeout: Optional[float] = None) -> float:
+        """Block this thread until the call may go ahead; returns the seconds waited"""
+        if not self._buckets(provider, model, tokens):
+            return 0.0
+        started = time.monotonic()
+        ticket = uuid.uuid4().hex
+        try:
+            while True:
+                wait = self.try_acquire(provider, model, tokens, priority, ticket)
+                waited = time.monotonic() - started
+                if wait == 0:
+                    self._record(waited)
+                    return waited
+                if timeout is not None and waited + wait > timeout:
+                    self._record(waited, timed_out=True)
+                    raise QuotaTimeout(f"No {provider}:{model} quota within {timeout:g}s")
+                time.sleep(min(wait, self.poll_interval))
+        finally:
+            self._leave(ticket)
+
+    async def acquire_async(self, provider: str, model: str, tokens: int = 0,
+                            priority: int = PRIORITY_NORMAL, timeout: Optional[float] = None) -> float:
+        """acquire() for coroutines: waits with asyncio.sleep, database work runs off the loop"""
+        if not self._buckets(provider, model, tokens):
+            return 0.0
+        started = time.monotonic()
+        ticket = uuid.uuid4().hex
+        try:
+            while True:
+                wait = await asyncio.to_thread(self.try_acquire, provider, model, tokens, priority, ticket)
+                waited = time.monotonic() - started
+                if wait == 0:
+                    self._record(waited)
+                    return waited
+                if timeout is not None and waited + wait > timeout:
+                    self._record(waited, timed_out=True)
+                    raise QuotaTimeout(f"No {provider}:{model} quota within {timeout:g}s")
+                await asyncio.sleep(min(wait, self.poll_interval))
+        finally:
+            # Inline so it also runs when the waiting task is cancelled
+            self._leave(ticket)
+
+    def backoff(self, provider: str, model: str, seconds: float):
+        """Empty the model's buckets so nothing is sent for `seconds` (after a provider 429)"""
+        now = time.time()
+        conn = self._conn()
+        for name, _, rate, _ in self._buckets(provider, model, 0):
+            conn.execute("INSERT OR REPLACE INTO buckets (name, level, updated_at) VALUES (?, ?, ?)",
+                         (name, -rate * seconds, now))
+        with self._lock:
+            self._stats['backoffs'] += 1
+        print(f"⏳ {provider}:{model} rate limited; pausing calls for {seconds:.0f}s")
+
+    def stats(self) -> Dict:
+        """Counters for this process plus current bucket levels and queue lengths (all processes)"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['wait_seconds'] = round(stats['wait_seconds'], 3)
+        conn = self._conn()
+        now = time.time()
+        stats['buckets'] = {name: round(level, 2) for name, level in
+                            conn.execute("SELECT name, level FROM buckets").fetchall()}
+        stats['queued'] = dict(conn.execute(
+            "SELECT scope, COUNT(*) FROM waiters WHERE expires_at >= ? GROUP BY scope", (now,)).fetchall())
+        stats['limits'] = self.limits
+        return stats
+
+
+def get_quota() -> Optional[LLMQuota]:
+    """Process-wide quota from the environment (None when LLM_QUOTA=false)"""
+    global _quota
+    if os.getenv('LLM_QUOTA', 'true').lower() != 'true':
+        return None
+    if _quota is None:
+        with _quota_lock:
+            if _quota is None:
+                _quota = LLMQuota.from_env()
+    return _quota
@@ -0,0 +1,164 @@
+"""
+Event Notifier
+Wakes waiters the moment something they depend on changes (e.g. the agent posting
+interview Q&A data). Waiters in the same process are woken through a condition
+variable; other processes are reached through PostgreSQL LISTEN/NOTIFY.
+"""
+
+import json
+import os
+import select
+import socket
+import threading
+import time
+from typing import Callable, Optional
+
+import psycopg2
+
+
+class Notifier:
+    def __init__(self, db=None, channel: str = 'capstone_events', fallback_interval: float = 5.0):
+        """
+        db                -> DatabaseManager used for cross-process NOTIFY/LISTEN (None = in-process only)
+        channel           -> PostgreSQL notification channel
+        fallback_interval -> waiters re-check their condition at least this often, in case
+                             a cross-process notification is missed while the listener reconnects
+        """
+        self.db = db
+        self.channel = channel
+        self.fallback_interval = fallback_interval
+
+        self._cond = threading.Condition()
+        self._versions = {}          # (topic, key) -> change counter
+        self._subscribers = {}       # topic -> [callback(key)]
+        self._listener_pid = None
+        self._stats = {'published': 0, 'received_remote': 0, 'wakeups': 0, 'timeouts': 0}
+
+    # ==================== PUBLISH ====================
+
+    def publish(self, topic: str, key):
+        """Signal that (topic, key) changed, locally and to every other process"""
+        key = str(key)
+        self._deliver(topic, key)
+        with self._cond:
+            self._stats['published'] += 1
+
+        if self.db is not None:
+            message = json.dumps({'topic': topic, 'key': key, 'origin': self._origin()})
+            try:
+                self.db.notify(self.channel, message)
+            except Exception as e:
+                print(f"⚠️ Could not publish {topic}:{key} to other workers: {e}")
+
+    def _deliver(self, topic: str, key: str):
+        with self._cond:
+            if len(self._versions) > 10000:
+                # Keep memory flat; waiters only compare for inequality, so resetting is safe
+                self._versions.clear()
+            self._versions[(topic, key)] = self._versions.get((topic, key), 0) + 1
+            callbacks = list(self._subscribers.get(topic, []))
+            self._cond.notify_all()
+        for callback in callbacks:
+            try:
+                callback(key)
+            except Exception as e:
+                print(f"⚠️ Subscriber error for {topic}:{key}: {e}")
+
+    # ==================== SUBSCRIBE / WAIT ====================
+
+    def subscribe(self, topic: str, callback: Callable[[str], None]):
+        """Call callback(key) whenever (topic, key) is published in any process"""
+        with self._cond:
+            self._subscribers.setdefault(topic, []).append(callback)
+        self.start()
+
+    def wait_for(self, topic: str, key, check: Callable[[], Optional[object]], timeout: float):
+        """
+        Return check()'s first truthy result, re-evaluating it each time (topic, key)
+        is published. Returns None if the deadline passes first.
+        """
+        self.start()
+        key = str(key)
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self._cond:
+                seen = self._versions.get((topic, key), 0)
+
+            value = check()
+            if value:
+                return value
+
+            with self._cond:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    return None
+                # Skip waiting if a publish slipped in while check() was running
+                if self._versions.get((topic, key), 0) == seen:
+                    self._cond.wait(min(remaining, self.fallback_interval))
+                self._stats['wakeups'] += 1
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+        stats['cross_process'] = self.db is not None
+        stats['listening'] = self._listener_pid == os.getpid()
+        return stats
+
+    # ==================== CROSS-PROCESS LISTENER ====================
+
+    @staticmethod
+    def _origin() -> str:
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self):
+        """Start the LISTEN thread for this process (idempotent, fork-aware)"""
+        if self.db is None or self._listener_pid == os.getpid():
+            return
+        with self._cond:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+        threading.Thread(target=self._listen_loop, name='notifier-listener', daemon=True).start()
+
+    def _listen_loop(self):
+        backoff = 1.0
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.db.db_config)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel}")
+                backoff = 1.0
+
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self._handle_remote(notify.payload)
+            except Exception as e:
+                print(f"⚠️ Notifier listener error ({e}); reconnecting in {backoff:.0f}s")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def _handle_remote(self, payload: str):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        # Our own publishes were already delivered locally
+        if message.get('origin') == self._origin():
+            return
+        with self._cond:
+            self._stats['received_remote'] += 1
+        self._deliver(message['topic'], str(message['key']))
@@ -0,0 +1,128 @@
+"""
+Parse Cache
+Parsed resume / JD data keyed by the SHA-256 of the uploaded file bytes plus the parser
+version, so re-uploading an identical file skips PDF extraction and the embedding model.
+A small in-memory LRU sits in front of a SQLite table shared by every worker on the host.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+class ParseCache:
+    def __init__(self, path: str, memory_entries: int = 256):
+        """
+        path           -> SQLite file holding the durable cache
+        memory_entries -> parsed results kept in this process (LRU)
+        """
+        self.path = path
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()    # cache key -> parsed JSON text
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                cache_key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                parsed_data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def make_key(kind: str, version: str, data: bytes) -> str:
+        return f"{kind}:{version}:{hashlib.sha256(data).hexdigest()}"
+
+    # ==================== LOOKUP / STORE ====================
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return json.loads(text)
+
+        conn = self._conn()
+        row = conn.execute("SELECT parsed_data FROM parse_cache WHERE cache_key = ?", (key,)).fetchone()
+        if row is None:
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+        with conn:
+            conn.execute("UPDATE parse_cache SET hit_count = hit_count + 1 WHERE cache_key = ?", (key,))
+        self._remember(key, row[0])
+        with self._lock:
+            self._stats['disk_hits'] += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, kind: str, parsed_data: Dict):
+        text = json.dumps(parsed_data, default=str)
+        conn = self._conn()
+        with conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO parse_cache (cache_key, kind, parsed_data, created_at)
+                VALUES (?, ?, ?, ?)
+            """, (key, kind, text, time.time()))
+        self._remember(key, text)
+
+    def lookup(self, kind: str, version: str, data: bytes) -> Optional[Dict]:
+        """Cached result for these file bytes, or None (cache errors count as a miss)"""
+        return self._safe_get(self.make_key(kind, version, data))
+
+    def _safe_get(self, key: str) -> Optional[Dict]:
+        try:
+            return self.get(key)
+        except sqlite3.Error as e:
+            print(f"⚠️ Parse cache read failed: {e}")
+            return None
+
+    def get_or_parse(self, kind: str, version: str, data: bytes,
+                     parse: Callable[[], Dict]) -> Tuple[Dict, bool]:
+        """Return (parsed_data, cache_hit); parse() runs only on a miss"""
+        key = self.make_key(kind, version, data)
+        cached = self._safe_get(key)
+        if cached is not None:
+            return cached, True
+
+        parsed_data = parse()
+        try:
+            self.put(key, kind, parsed_data)
+        except sqlite3.Error as e:
+            print(f"⚠️ Parse cache write failed: {e}")
+        return parsed_data, False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+        return stats
+
+    def _remember(self, key: str, text: str):
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
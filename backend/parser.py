@@ -1,48 +1,94 @@
-import pdfplumber
+import hashlib
+import json
+import os
 import re
 from collections import defaultdict
-def extract_text_from_pdf(file_path):
-    text=""
-    with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            text+=page.extract_text()+"\n"
-    lines=[line.strip() for line in text.split('\n') if line.strip()]
-
-    cleaned_lines=[]
-    prev_line=None
-    for line in lines:
-        if line!=prev_line:
-            cleaned_lines.append(line)
-            prev_line=line
-    lines=cleaned_lines
-
-    section_patterns = {
-        "education": r"^(education|academic\s*background)$",
-        "skills": r"^(skills|technical\s*skills|coursework\s*/\s*skills)$",
-        "projects": r"^(projects|academic\s*projects|personal\s*projects)$",
-        "experience": r"^(experience|work\s*experience|professional\s*experience|internship|employment)$",
-        "certifications": r"^(certifications|certificates|achievements|awards|awards\s*certifications)$",
-        "extracurricular": r"^(extracurricular|activities|leadership|extracurricular\s*activities)$",
-    }
-
-    headers = []
-    for i, line in enumerate(lines):
-        clean_line = line.strip().lower()
-        for section, pattern in section_patterns.items():
-            if re.match(pattern, clean_line):
-                headers.append((i, section))
-    if not headers:
-        print(" warning: no section headers found!")
-        return {}
-    
-    headers.sort(key=lambda x: x[0])
-    parsed = defaultdict(list)
 
-    # Split into sections
-    for idx, (start_idx, section) in enumerate(headers):
-        end_idx = headers[idx + 1][0] if idx + 1 < len(headers) else len(lines)
-        parsed[section].extend(lines[start_idx + 1:end_idx])
+from document_text import iter_lines, iter_page_texts, resolve_backend
+
+# Bump when parsing output changes so cached results are not reused
+PARSER_BASE_VERSION = '1'
+
+section_patterns = {
+    "education": r"^(education|academic\s*background)$",
+    "skills": r"^(skills|technical\s*skills|coursework\s*/\s*skills)$",
+    "projects": r"^(projects|academic\s*projects|personal\s*projects)$",
+    "experience": r"^(experience|work\s*experience|professional\s*experience|internship|employment)$",
+    "certifications": r"^(certifications|certificates|achievements|awards|awards\s*certifications)$",
+    "extracurricular": r"^(extracurricular|activities|leadership|extracurricular\s*activities)$",
+}
+
+class SectionHeaderMatcher:
+    """
+    All header patterns compiled into one alternation with a named group per section, so
+    classifying a line is a single match. If a line fits several sections the first listed wins.
+    """
+
+    def __init__(self, patterns, extra_phrases=None):
+        """
+        patterns      -> {section: regex or [regex, ...]} matched against the lowercased line
+        extra_phrases -> {section: [phrase, ...]} additional plain-text headers; words may be
+                         separated by any whitespace. New section names are allowed.
         """
+        by_section = {section: list(p) if isinstance(p, (list, tuple)) else [p]
+                      for section, p in patterns.items()}
+        for section, phrases in (extra_phrases or {}).items():
+            by_section.setdefault(section, []).extend(
+                r'^' + r'\s*'.join(re.escape(word) for word in phrase.lower().split()) + r'$'
+                for phrase in phrases if phrase.strip()
+            )
+
+        self.sections = list(by_section)
+        # Group names must be identifiers, so sections are addressed by position
+        self._group_section = {f"s{i}": section for i, section in enumerate(self.sections)}
+        self._regex = re.compile('|'.join(
+            f"(?P<s{i}>" + '|'.join(f"(?:{p})" for p in by_section[section]) + ")"
+            for i, section in enumerate(self.sections)
+        ))
+
+    def match(self, clean_line):
+        """Section whose header this (lowercased, stripped) line is, else None"""
+        m = self._regex.match(clean_line)
+        return self._group_section[m.lastgroup] if m else None
+
+
+def load_section_vocabulary(path):
+    """Extra header phrases from a JSON file: {"section": ["phrase", ...]}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# RESUME_SECTION_VOCAB points at a JSON file of extra header phrases
+_vocab_path = os.getenv('RESUME_SECTION_VOCAB')
+_extra_vocabulary = load_section_vocabulary(_vocab_path) if _vocab_path else {}
+header_matcher = SectionHeaderMatcher(section_patterns, _extra_vocabulary)
+
+# The text backend and a custom vocabulary change the output, so they are part of the version
+PARSER_VERSION = f"{PARSER_BASE_VERSION}:{resolve_backend()}"
+if _extra_vocabulary:
+    PARSER_VERSION += ':' + hashlib.sha256(
+        json.dumps(_extra_vocabulary, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+def extract_text_from_pdf(source, max_pages=None, time_budget=None, matcher=None, backend=None):
+    """
+    Parse resume sections, detecting headers line by line as pages are extracted.
+    source is a file path, the PDF bytes or a readable binary stream.
+    """
+    matcher = matcher or header_matcher
+    parsed = defaultdict(list)
+    current_section = None
+
+    for line in iter_lines(iter_page_texts(source, max_pages, time_budget, backend)):
+        section = matcher.match(line.lower())
+        if section is not None:
+            parsed.setdefault(section, [])
+            current_section = section
+        elif current_section is not None:
+            parsed[current_section].append(line)
+
+    if current_section is None:
+        print(" warning: no section headers found!")
+        return {}
+    """
     cleaned = defaultdict(list)
 
     for section, lines in parsed.items():
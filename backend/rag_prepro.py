@@ -1,14 +1,13 @@
-import pdfplumber
 import re
 import json
 
-def extract_structured_json_from_pdf(pdf_path, output_path="company_data.json"):
-    with pdfplumber.open(pdf_path) as pdf:
-        text = ""
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
+from document_text import iter_page_texts
+
+def extract_structured_json_from_pdf(pdf_path, output_path="company_data.json", backend=None):
+    # No page/time budget: this is an offline conversion of the whole document
+    text = "".join(page_text + "\n" for page_text in
+                   iter_page_texts(pdf_path, max_pages=0, time_budget=0, backend=backend)
+                   if page_text)
 
     # 🧹 Step 1: Clean up newlines inside JSON
     # Remove random newlines, multiple spaces, and PDF artifacts
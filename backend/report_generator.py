@@ -1,47 +1,79 @@
 """
 Interview Report Generator with Email Functionality
 Generates detailed interview reports using LLM, creates PDFs, and emails them
+
+stream_report() produces the same report as markdown chunks while the LLM is still
+writing it (Groq stream=True / Ollama streaming), so the UI can show text right away.
+All LLM calls go through the generator's LLMClient, which keeps one event loop and pooled
+keep-alive connections for the life of the process, and draws from the shared LLM quota
+(llm_quota): queued report jobs at background priority, streamed reports at normal.
 """
 
 import os
 from dotenv import load_dotenv
 import json
-from datetime import datetime, timedelta
-from collections import deque
+from datetime import datetime
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
-import requests 
 
 load_dotenv()
 import time
+# After load_dotenv: both read their settings from the environment at import
+from llm_client import LLMClient
+from llm_quota import PRIORITY_BACKGROUND, PRIORITY_NORMAL
 
-class APIRateLimiter:
-    def __init__(self):
-        self.requests = deque(maxlen=15)  # Track last 15 requests
-    
-    def wait_if_needed(self):
-        now = datetime.now()
-        
-        # Remove requests older than 60 seconds
-        while self.requests and (now - self.requests[0]) > timedelta(seconds=60):
-            self.requests.popleft()
-        
-        # If we've made 14+ requests in last 60 seconds, wait
-        if len(self.requests) >= 14:
-            wait_time = 60 - (now - self.requests[0]).total_seconds()
-            if wait_time > 0:
-                print(f"⏳ Rate limit protection: waiting {wait_time:.1f}s...")
-                time.sleep(wait_time + 1)
-                self.requests.clear()
-        
-        self.requests.append(now)
 
-# Create a global rate limiter
-rate_limiter = APIRateLimiter()
+# parsed_data sections loaded for the report (used to project the JSONB documents when
+# loading the report context). _build_report_prompt dumps the whole documents, so these are
+# every section the parsers produce: parser.section_patterns and jd_parser.FINAL_SECTIONS
+REPORT_RESUME_KEYS = ["education", "skills", "projects", "experience", "certifications", "extracurricular"]
+REPORT_JD_KEYS = ["Company Info", "Role", "Responsibilities", "Requirements",
+                  "Technical Skills", "Soft Skills", "Benefits", "Miscellaneous"]
+
+
+class ReportStream:
+    """
+    Markdown chunks of a report, in order, as the LLM produces them. Once iteration ends,
+    .report holds the dict generate_report would have returned: the fallback report if the
+    provider failed (.error then says why) or produced nothing.
+    """
+    
+    def __init__(self, generator, chunks, interview_type: str, qa_pairs: list):
+        self._generator = generator
+        self._chunks = chunks
+        self.interview_type = interview_type
+        self.qa_pairs = qa_pairs
+        self.report = None
+        self.error = None
+        self.first_chunk_seconds = None
+    
+    def __iter__(self):
+        started = time.perf_counter()
+        parts = []
+        try:
+            for chunk in self._chunks:
+                if self.first_chunk_seconds is None:
+                    self.first_chunk_seconds = time.perf_counter() - started
+                    print(f"⚡ First report chunk after {self.first_chunk_seconds:.2f}s")
+                parts.append(chunk)
+                yield chunk
+            report_text = "".join(parts).strip()
+            if not report_text:
+                raise ValueError("Empty response from LLM")
+            print(f"✅ Report streamed ({len(report_text)} chars in {time.perf_counter() - started:.1f}s)")
+            self.report = self._generator._parse_llm_response(report_text, self.interview_type, self.qa_pairs)
+        except Exception as e:
+            print(f"❌ Report streaming failed: {e}")
+            self.error = str(e)
+            self.report = self._generator._generate_fallback_report(self.interview_type, self.qa_pairs, self.error)
+        finally:
+            close = getattr(self._chunks, "close", None)
+            if close:
+                close()
 
 
 class InterviewReportGenerator:
@@ -59,6 +91,9 @@ class InterviewReportGenerator:
         else:
             raise ValueError("No LLM configured. Set USE_OLLAMA=True or GROQ_API_KEY.")
         
+        # Long-lived loop + connection pools, shared by every report this process generates
+        self.llm = LLMClient(groq_key=self.groq_key)
+        
     def generate_report(self, interview_type: str, qa_pairs: list, resume_data: dict = None, jd_data: dict = None, full_transcript: dict = None, company_name: str= None) -> dict:
         """
         Generate comprehensive interview report using LLM
@@ -69,26 +104,17 @@ class InterviewReportGenerator:
         
         # Build the prompt for LLM
         prompt = self._build_report_prompt(interview_type, qa_pairs, resume_data, jd_data, full_transcript)
-        import asyncio
         print("🤖 Generating report with  AI...")
         
         if self.use_ollama:
             return self._generate_with_ollama(prompt, interview_type, qa_pairs)
         else:
-            return asyncio.run(self._generate_with_groq(prompt, interview_type, qa_pairs))
+            return self._generate_with_groq(prompt, interview_type, qa_pairs)
 
     def _generate_with_ollama(self, prompt, interview_type, qa_pairs):
         """Generate report using local Ollama model."""
         try:
-            response = requests.post(
-                "http://localhost:11434/api/generate",
-                json={"model": self.ollama_model, "prompt": prompt, "stream": False},
-                timeout=750
-            )
-
-            response.raise_for_status()
-            data = response.json()
-            report_text = data.get("response", "").strip() or data.get("output") or ""
+            report_text = self.llm.generate_ollama(self.ollama_model, prompt, priority=PRIORITY_BACKGROUND)
             
             if not report_text.strip():
                 raise ValueError("Empty response from Ollama")
@@ -99,35 +125,50 @@ class InterviewReportGenerator:
 
         except Exception as e:
             print(f"❌ Ollama generation failed: {e}")
-            return self._generate_fallback_report(interview_type, qa_pairs)
+            return self._generate_fallback_report(interview_type, qa_pairs, str(e))
 
-    async def _generate_with_groq(self, prompt, interview_type, qa_pairs):
+    def _groq_request(self, prompt):
+        """chat arguments for a report"""
+        return dict(
+            model=self.groq_model,
+            messages=[
+                {"role": "system", "content": "You are an expert AI interviewer and evaluator."},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.6,
+            max_completion_tokens=3000,
+            top_p=1,
+        )
 
-        from groq import AsyncGroq
-        
+    def _generate_with_groq(self, prompt, interview_type, qa_pairs):
+        """Generate report using Groq (pooled AsyncGroq client on the LLM loop)."""
         try:
-            client = AsyncGroq(api_key=self.groq_key)
-
-            completion = await client.chat.completions.create(
-                model=self.groq_model,
-                messages=[
-                    {"role": "system", "content": "You are an expert AI interviewer and evaluator."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.6,
-                max_completion_tokens=3000,
-                top_p=1,
-                stream=False,
-            )
-
-            report_text = completion.choices[0].message.content.strip()
+            report_text = self.llm.chat_groq(priority=PRIORITY_BACKGROUND, **self._groq_request(prompt)).strip()
             print(f"✅ Groq report generated ({len(report_text)} chars)")
             return self._parse_llm_response(report_text, interview_type, qa_pairs)
 
         except Exception as e:
             print(f"❌ Groq generation failed: {e}")
-            return self._generate_fallback_report(interview_type, qa_pairs)            
+            return self._generate_fallback_report(interview_type, qa_pairs, str(e))
     
+    # ==================== STREAMING ====================
+
+    def stream_report(self, interview_type: str, qa_pairs: list, resume_data: dict = None, jd_data: dict = None, full_transcript: dict = None, company_name: str = None) -> 'ReportStream':
+        """
+        Same report as generate_report, as an iterator of markdown chunks yielded while the
+        LLM writes them. The report dict is on the stream's .report once it is exhausted.
+        """
+        if not qa_pairs or len(qa_pairs) == 0:
+            raise ValueError("No Q&A pairs provided for report generation")
+        
+        prompt = self._build_report_prompt(interview_type, qa_pairs, resume_data, jd_data, full_transcript)
+        print("🤖 Streaming report with  AI...")
+        if self.use_ollama:
+            chunks = self.llm.stream_ollama(self.ollama_model, prompt, priority=PRIORITY_NORMAL)
+        else:
+            chunks = self.llm.stream_groq(priority=PRIORITY_NORMAL, **self._groq_request(prompt))
+        return ReportStream(self, chunks, interview_type, qa_pairs)
+
     def _build_report_prompt(self, interview_type: str, qa_pairs: list, resume_data: dict = None, jd_data: dict = None, full_transcript: dict = None, company_name: str = None) -> str:
         """Build comprehensive prompt for LLM"""
         
@@ -471,8 +512,8 @@ Generate the complete report now:
             }
         }
     
-    def _generate_fallback_report(self, interview_type: str, qa_pairs: list) -> dict:
-        """Generate basic report if LLM fails"""
+    def _generate_fallback_report(self, interview_type: str, qa_pairs: list, error: str = None) -> dict:
+        """Generate basic report if LLM fails (error: why, kept as fallback_reason)"""
         
         report_text = f"""# Interview Report - {interview_type}
 
@@ -506,6 +547,7 @@ Further review recommended by human evaluator.
             "qa_count": len(qa_pairs),
             "qa_pairs": qa_pairs,
             "is_fallback": True,
+            "fallback_reason": error,
             "metadata": {
                 "report_version": "3.0-fallback"
             }
@@ -0,0 +1,74 @@
+"""
+Response Cache
+Keeps serialized JSON bodies for read-only endpoints together with a strong ETag,
+so repeated requests skip the database and serialization and can be answered with 304.
+Entries are invalidated explicitly (per user) and expire after a TTL as a safety net.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple
+
+
+def make_etag(body) -> str:
+    """Strong validator derived from the exact response bytes"""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()   # (namespace, key) -> (expires_at, body, status, etag)
+        self._lock = threading.Lock()
+        self._generation = 0            # bumped by every invalidation
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def get_or_build(self, namespace: str, key, build: Callable[[], Tuple[str, int]]):
+        """
+        Return (body, status, etag) for namespace/key, calling build() -> (body, status)
+        on a miss. Exceptions from build() propagate and nothing is cached.
+        """
+        cache_key = (namespace, str(key))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(cache_key)
+                self._stats['hits'] += 1
+                return entry[1], entry[2], entry[3]
+            self._stats['misses'] += 1
+            generation = self._generation
+
+        body, status = build()
+        etag = make_etag(body)
+        with self._lock:
+            if generation != self._generation:
+                # A write landed while we were building; this body may already be stale
+                return body, status, etag
+            self._entries[cache_key] = (now + self.ttl_seconds, body, status, etag)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body, status, etag
+
+    def invalidate(self, namespace: str = None, key=None):
+        """Drop entries matching namespace and/or key (both None clears everything)"""
+        key = None if key is None else str(key)
+        with self._lock:
+            doomed = [k for k in self._entries
+                      if (namespace is None or k[0] == namespace) and (key is None or k[1] == key)]
+            for k in doomed:
+                del self._entries[k]
+            self._generation += 1
+            self._stats['invalidations'] += len(doomed)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        return stats
@@ -1,17 +1,11 @@
-import json
+from company_catalog import get_catalog
 
 def load_company_data():
-    with open("company_data.json", "r", encoding="utf-8") as f:
-        return json.load(f)
+    return get_catalog().segments()
 
 def get_company_info(company_name: str):
     """Fetch company-specific interview style data."""
-    data = load_company_data()
-    for segment in data:
-        for company in segment.get("companies", []):
-            if company["name"].lower() == company_name.lower():
-                return company
-    return None
+    return get_catalog().get(company_name)
 
 
 # Example usage
@@ -0,0 +1,243 @@
+"""
+Interview Session Store
+Holds the Q&A pairs and conversation history posted by the agent until the report is generated.
+Entries expire after a TTL and the store is bounded in size with LRU eviction.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class InterviewSessionStore:
+    """Interface shared by all session store backends"""
+
+    def put(self, interview_id, data: Dict):
+        raise NotImplementedError
+
+    def get(self, interview_id) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def delete(self, interview_id) -> bool:
+        raise NotImplementedError
+
+    def keys(self) -> list:
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        return {}
+
+    def __contains__(self, interview_id) -> bool:
+        return self.get(interview_id) is not None
+
+
+class MemorySessionStore(InterviewSessionStore):
+    """Per-process store: TTL expiry plus LRU eviction by entry count and serialized size"""
+
+    def __init__(self, ttl_seconds: float = 86400, max_bytes: int = 256 * 1024 * 1024,
+                 max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (expires_at, size, data)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._evictions = 0
+
+    def put(self, interview_id, data: Dict):
+        key = str(interview_id)
+        size = len(json.dumps(data, default=str))
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.time() + self.ttl_seconds, size, data)
+            self._total_bytes += size
+            self._evict()
+
+    def get(self, interview_id) -> Optional[Dict]:
+        key = str(interview_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def delete(self, interview_id) -> bool:
+        with self._lock:
+            return self._remove(str(interview_id))
+
+    def keys(self) -> list:
+        now = time.time()
+        with self._lock:
+            return [k for k, entry in self._entries.items() if entry[0] >= now]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self._evictions,
+            }
+
+    def _remove(self, key) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._total_bytes -= entry[1]
+        return True
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until within bounds"""
+        now = time.time()
+        for key in [k for k, entry in self._entries.items() if entry[0] < now]:
+            self._remove(key)
+        while self._entries and (self._total_bytes > self.max_bytes
+                                 or len(self._entries) > self.max_entries):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self._evictions += 1
+
+
+class SQLiteSessionStore(InterviewSessionStore):
+    """
+    Durable store in a local SQLite file (WAL mode), shared by every worker process
+    on the host. Bounded by TTL and total payload size (least recently read evicted first).
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 86400,
+                 max_bytes: int = 256 * 1024 * 1024, busy_timeout: float = 10.0):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._evictions = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS interview_sessions (
+                interview_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                saved_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_interview_sessions_accessed
+            ON interview_sessions (accessed_at)
+        """)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread (and per process, since threading.local is not inherited)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def put(self, interview_id, data: Dict):
+        payload = json.dumps(data, default=str)
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute("""
+                INSERT INTO interview_sessions
+                    (interview_id, data, size, saved_at, accessed_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(interview_id) DO UPDATE SET
+                    data = excluded.data,
+                    size = excluded.size,
+                    saved_at = excluded.saved_at,
+                    accessed_at = excluded.accessed_at,
+                    expires_at = excluded.expires_at
+            """, (str(interview_id), payload, len(payload), now, now, now + self.ttl_seconds))
+            self._evict(conn, now)
+
+    def get(self, interview_id) -> Optional[Dict]:
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute("""
+            SELECT data FROM interview_sessions
+            WHERE interview_id = ? AND expires_at >= ?
+        """, (str(interview_id), now)).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute("UPDATE interview_sessions SET accessed_at = ? WHERE interview_id = ?",
+                         (now, str(interview_id)))
+        return json.loads(row[0])
+
+    def delete(self, interview_id) -> bool:
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute("DELETE FROM interview_sessions WHERE interview_id = ?",
+                                  (str(interview_id),))
+        return cursor.rowcount > 0
+
+    def keys(self) -> list:
+        rows = self._conn().execute(
+            "SELECT interview_id FROM interview_sessions WHERE expires_at >= ? ORDER BY saved_at",
+            (time.time(),)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def stats(self) -> Dict:
+        count, total = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM interview_sessions"
+        ).fetchone()
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'entries': count,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'evictions': self._evictions,
+        }
+
+    def _evict(self, conn, now):
+        """Remove expired rows, then least recently read rows while over max_bytes"""
+        conn.execute("DELETE FROM interview_sessions WHERE expires_at < ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM interview_sessions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT interview_id, size FROM interview_sessions ORDER BY accessed_at"
+        ).fetchall()
+        for interview_id, size in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM interview_sessions WHERE interview_id = ?", (interview_id,))
+            total -= size
+            self._evictions += 1
+
+
+def create_session_store() -> InterviewSessionStore:
+    """Build the store configured by INTERVIEW_STORE_* environment variables"""
+    backend = os.getenv('INTERVIEW_STORE_BACKEND', 'sqlite').lower()
+    ttl = float(os.getenv('INTERVIEW_STORE_TTL', 86400))
+    max_bytes = int(float(os.getenv('INTERVIEW_STORE_MAX_MB', 256)) * 1024 * 1024)
+
+    if backend == 'memory':
+        return MemorySessionStore(ttl_seconds=ttl, max_bytes=max_bytes)
+    if backend == 'sqlite':
+        path = os.getenv('INTERVIEW_STORE_PATH', os.path.join('data', 'interview_sessions.db'))
+        return SQLiteSessionStore(path, ttl_seconds=ttl, max_bytes=max_bytes)
+    raise ValueError(f"Unknown INTERVIEW_STORE_BACKEND: {backend}")
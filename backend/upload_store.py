@@ -0,0 +1,180 @@
+"""
+Upload Store
+Keeps the bytes of freshly uploaded files in memory until their parse job has run, so the
+job (run by the worker that took the upload) parses straight from the request body instead
+of re-reading a file written a moment earlier. Keeping the original file permanently is an
+optional side step done on a background thread, off the request path. When it is off, the
+same thread spools the bytes to a folder every worker on the host can read, so a retry or a
+job recovered from a crashed worker still finds its upload.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+
+class UploadStore:
+    def __init__(self, folder: str, persist: bool = True, buffer_ttl: float = 600.0,
+                 writer_threads: int = 1, spool_folder: str = os.path.join('data', 'upload_spool'),
+                 spool_ttl: float = 86400.0):
+        """
+        folder         -> where original files are written when persist is on
+        persist        -> keep a copy of every upload on disk
+        buffer_ttl     -> seconds an unclaimed buffer is kept (its job ran in another worker)
+        writer_threads -> background threads writing files
+        spool_folder   -> shared folder holding uploads until their parse job finishes
+        spool_ttl      -> spooled files older than this are left over from crashed workers
+        """
+        self.folder = folder
+        self.persist = persist
+        self.buffer_ttl = buffer_ttl
+        self.writer_threads = writer_threads
+        self.spool_folder = spool_folder
+        self._buffers = {}      # key -> (bytes, held_at)
+        self._lock = threading.Lock()
+        self._writer = None
+        self._writer_pid = None
+        self._stats = {'held': 0, 'memory_reads': 0, 'spool_reads': 0, 'disk_reads': 0,
+                       'expired': 0, 'written': 0, 'write_errors': 0}
+
+        if persist:
+            os.makedirs(folder, exist_ok=True)
+        os.makedirs(spool_folder, exist_ok=True)
+        self._sweep_spool(spool_ttl)
+
+    # ==================== PERSISTENCE ====================
+
+    def _get_writer(self) -> ThreadPoolExecutor:
+        # Created lazily per process so forked workers get their own threads
+        if self._writer is None or self._writer_pid != os.getpid():
+            with self._lock:
+                if self._writer is None or self._writer_pid != os.getpid():
+                    self._writer = ThreadPoolExecutor(max_workers=self.writer_threads,
+                                                      thread_name_prefix='upload-writer')
+                    self._writer_pid = os.getpid()
+        return self._writer
+
+    def path_for(self, filename: str) -> Optional[str]:
+        """Where the upload will be written, or None when uploads are not persisted"""
+        return os.path.join(self.folder, filename) if self.persist else None
+
+    def save_async(self, path: Optional[str], data: bytes):
+        """Write data to path in the background (no-op for path None)"""
+        if path is not None:
+            self._get_writer().submit(self._write, path, data)
+
+    def _write(self, path: str, data: bytes):
+        try:
+            self._write_file(path, data)
+            with self._lock:
+                self._stats['written'] += 1
+        except OSError as e:
+            with self._lock:
+                self._stats['write_errors'] += 1
+            print(f"⚠️ Could not save upload {path}: {e}")
+
+    @staticmethod
+    def _write_file(path: str, data: bytes):
+        # Write-then-rename so readers never see a partially written file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _read_file(path: str) -> Optional[bytes]:
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    # ==================== SPOOL ====================
+
+    def _spool_path(self, key: str) -> str:
+        return os.path.join(self.spool_folder, key.replace(':', '_').replace(os.sep, '_'))
+
+    def _sweep_spool(self, max_age: float):
+        """Remove spooled uploads whose job never finished (worker died before releasing them)"""
+        cutoff = time.time() - max_age
+        for entry in os.scandir(self.spool_folder):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    # ==================== PENDING BUFFERS ====================
+
+    def hold(self, key: str, data: bytes, path: Optional[str] = None):
+        """
+        Keep data for the parse job that will ask for key. path is where save_async writes the
+        permanent copy; without one the bytes are spooled in the background for other workers.
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, (_, held_at) in self._buffers.items() if now - held_at > self.buffer_ttl]
+            for k in expired:
+                del self._buffers[k]
+            self._stats['expired'] += len(expired)
+            self._buffers[key] = (data, now)
+            self._stats['held'] += 1
+        if path is None:
+            self._get_writer().submit(self._spool, key, data)
+
+    def _spool(self, key: str, data: bytes):
+        with self._lock:
+            if key not in self._buffers:
+                return      # job already finished
+        self._write(self._spool_path(key), data)
+        with self._lock:
+            released = key not in self._buffers
+        if released:
+            self._remove_spool(key)
+
+    def read(self, key: str, path: Optional[str]) -> Optional[bytes]:
+        """Bytes held for key in this worker, else the spooled copy, else the persisted file, else None"""
+        with self._lock:
+            entry = self._buffers.get(key)
+            if entry is not None:
+                self._stats['memory_reads'] += 1
+                return entry[0]
+        for source, file_path in (('spool_reads', self._spool_path(key)), ('disk_reads', path)):
+            data = self._read_file(file_path) if file_path is not None else None
+            if data is not None:
+                with self._lock:
+                    self._stats[source] += 1
+                return data
+        return None
+
+    def release(self, key: str):
+        """Drop the buffer and spooled copy once its job has finished (succeeded or finally failed)"""
+        with self._lock:
+            self._buffers.pop(key, None)
+        self._remove_spool(key)
+
+    def _remove_spool(self, key: str):
+        try:
+            os.remove(self._spool_path(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"⚠️ Could not remove spooled upload {key}: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['buffered'] = len(self._buffers)
+            stats['buffered_bytes'] = sum(len(data) for data, _ in self._buffers.values())
+        stats['persist'] = self.persist
+        stats['spooled'] = sum(1 for entry in os.scandir(self.spool_folder) if entry.is_file())
+        return stats
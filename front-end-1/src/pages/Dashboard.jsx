@@ -9,6 +9,15 @@ const readinessMilestones = [
   { label: "Interview type chosen", key: "session" },
 ];
 
+const SUPPORTED_DOCUMENT_TYPES = [
+  "application/pdf",
+  "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+];
+
+// Some browsers leave file.type empty for Word files, so fall back to the extension
+const isSupportedDocument = (file) =>
+  SUPPORTED_DOCUMENT_TYPES.includes(file.type) || /\.(pdf|docx)$/i.test(file.name);
+
 export default function Dashboard() {
   const [user, setUser] = useState(null);
   const [resumeUploaded, setResumeUploaded] = useState(false);
@@ -52,8 +61,8 @@ export default function Dashboard() {
     const file = e.target.files[0];
     if (!file) return;
 
-    if (file.type !== "application/pdf") {
-      setMessage("Please upload a PDF file");
+    if (!isSupportedDocument(file)) {
+      setMessage("Please upload a PDF or DOCX file");
       return;
     }
 
@@ -82,8 +91,8 @@ export default function Dashboard() {
     const file = e.target.files[0];
     if (!file) return;
 
-    if (file.type !== "application/pdf") {
-      setMessage("Please upload a PDF file");
+    if (!isSupportedDocument(file)) {
+      setMessage("Please upload a PDF or DOCX file");
       return;
     }
 
@@ -232,7 +241,7 @@ export default function Dashboard() {
             <input
               ref={resumeInputRef}
               type="file"
-              accept=".pdf"
+              accept=".pdf,.docx"
               onChange={handleResumeUpload}
               hidden
               disabled={uploading}
@@ -244,7 +253,7 @@ export default function Dashboard() {
                 onClick={() => resumeInputRef.current?.click()}
                 disabled={uploading}
               >
-                {resumeUploaded ? "Replace resume" : "Upload PDF"}
+                {resumeUploaded ? "Replace resume" : "Upload resume"}
               </button>
               <button type="button" className="ghost-button" onClick={openProfile}>
                 Manage profile
@@ -265,7 +274,7 @@ export default function Dashboard() {
             <input
               ref={jdInputRef}
               type="file"
-              accept=".pdf"
+              accept=".pdf,.docx"
               onChange={handleJDUpload}
               hidden
               disabled={uploading}
@@ -10,6 +10,7 @@ export default function InterviewReport() {
   const [generating, setGenerating] = useState(false);
   const [error, setError] = useState("");
   const [generationProgress, setGenerationProgress] = useState("");
+  const [streamedText, setStreamedText] = useState("");
   const [waitingForData, setWaitingForData] = useState(true);
   const [retryCount, setRetryCount] = useState(0);
   const { interviewId } = useParams();
@@ -119,8 +120,13 @@ export default function InterviewReport() {
       
       console.log(`🤖 Calling API to generate report for interview ${interviewId}...`);
       
-      // Call the generate endpoint
-      const response = await api.generateReport(interviewId);
+      // Stream the report so text shows up as soon as the model starts writing
+      const response = await api.streamReport(interviewId, {
+        onChunk: (chunk, text) => {
+          setGenerationProgress("Writing report...");
+          setStreamedText(text);
+        },
+      });
 
       if (response.success) {
         console.log("✅ Report generated successfully");
@@ -160,6 +166,7 @@ export default function InterviewReport() {
       setGenerating(false);
       setLoading(false);
       setGenerationProgress("");
+      setStreamedText("");
     }
   };
 
@@ -262,6 +269,24 @@ export default function InterviewReport() {
                 ? "The agent is saving your interview responses..."
                 : "This may take 10-30 seconds..."}
             </p>
+            {streamedText && (
+              <pre
+                style={{
+                  whiteSpace: "pre-wrap",
+                  textAlign: "left",
+                  color: "#ddd",
+                  background: "#ffffff0d",
+                  padding: "1em",
+                  borderRadius: "0.5em",
+                  maxWidth: "800px",
+                  maxHeight: "50vh",
+                  overflowY: "auto",
+                  marginTop: "1em",
+                }}
+              >
+                {streamedText}
+              </pre>
+            )}
             {retryCount > 0 && (
               <p style={{ fontSize: "0.85em", color: "#ff9900", marginTop: "0.5em" }}>
                 Retry attempt {retryCount}/2
@@ -1,5 +1,23 @@
 const API_BASE_URL = 'http://localhost:5000/api';
 
+// Long-poll an upload's parse status until it is parsed or failed
+const waitForParse = async (statusUrl, { maxWait = 300000 } = {}) => {
+  const startTime = Date.now();
+  
+  while (Date.now() - startTime < maxWait) {
+    const url = new URL(statusUrl, API_BASE_URL);
+    url.searchParams.set('wait', '25');
+    const response = await fetch(url);
+    const data = await response.json();
+    
+    if (response.status !== 202) {
+      return data;
+    }
+  }
+  
+  return { success: false, error: 'Timed out waiting for parsing' };
+};
+
 export const api = {
   // Auth endpoints
   register: async (name, email, password) => {
@@ -99,7 +117,9 @@ export const api = {
         return { success: false, error: error.error || 'Upload failed' };
       }
       
-      return await response.json();
+      const result = await response.json();
+      // 202: stored, parsing in the background
+      return response.status === 202 ? await waitForParse(result.status_url) : result;
     } catch (error) {
       console.error('Upload resume API error:', error);
       return { success: false, error: 'Network error' };
@@ -123,7 +143,9 @@ export const api = {
         return { success: false, error: error.error || 'Upload failed' };
       }
       
-      return await response.json();
+      const result = await response.json();
+      // 202: stored, parsing in the background
+      return response.status === 202 ? await waitForParse(result.status_url) : result;
     } catch (error) {
       console.error('Upload JD API error:', error);
       return { success: false, error: 'Network error' };
@@ -290,25 +312,96 @@ export const api = {
 
   // ==================== Report Endpoints ====================
   
-  generateReport: async (interviewId) => {
+  generateReport: async (interviewId, { pollInterval = 3000, maxWait = 900000 } = {}) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/generate-report/${interviewId}`, {
+      // Queue the report job (deduplicated per interview on the server)
+      const submitResponse = await fetch(`${API_BASE_URL}/generate-report/${interviewId}`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' }
       });
       
-      if (!response.ok) {
-        const error = await response.json();
+      if (!submitResponse.ok) {
+        const error = await submitResponse.json();
         return { success: false, error: error.error || 'Failed to generate report' };
       }
       
-      return await response.json();
+      const { result_url: resultUrl } = await submitResponse.json();
+      const startTime = Date.now();
+      
+      // Poll until the background job finishes
+      while (Date.now() - startTime < maxWait) {
+        // result_url is a server path; resolve it against the API's origin
+        const response = await fetch(new URL(resultUrl, API_BASE_URL));
+        const data = await response.json();
+        
+        if (response.status !== 202) {
+          return data;
+        }
+        
+        await new Promise(resolve => setTimeout(resolve, pollInterval));
+      }
+      
+      return { success: false, error: 'Timed out waiting for report generation' };
     } catch (error) {
       console.error('Generate report error:', error);
       return { success: false, error: 'Network error' };
     }
   },
 
+  // Streams the report over server-sent events; onChunk(text, fullTextSoFar) runs as markdown
+  // arrives. Resolves to the same body as generateReport. Falls back to the polling job when
+  // the stream cannot start or the report is already being generated by a job.
+  streamReport: (interviewId, { onChunk = () => {} } = {}) => {
+    if (typeof EventSource === 'undefined') {
+      return api.generateReport(interviewId);
+    }
+
+    return new Promise((resolve) => {
+      const source = new EventSource(`${API_BASE_URL}/generate-report/${interviewId}/stream`);
+      let text = '';
+      let settled = false;
+
+      const finish = (result) => {
+        if (settled) return;
+        settled = true;
+        source.close();
+        resolve(result);
+      };
+
+      source.addEventListener('chunk', (event) => {
+        const { text: chunk } = JSON.parse(event.data);
+        text += chunk;
+        onChunk(chunk, text);
+      });
+      source.addEventListener('done', (event) => {
+        const result = JSON.parse(event.data);
+        // Set when the LLM failed and report_data is the fallback report
+        if (result.error) {
+          console.warn('Report generated with fallback:', result.error);
+        }
+        finish(result);
+      });
+      source.addEventListener('job', () => {
+        source.close();
+        settled = true;
+        api.generateReport(interviewId).then(resolve);
+      });
+      // Server-sent 'error' events carry a body; connection errors do not
+      source.addEventListener('error', (event) => {
+        if (settled) return;
+        if (event.data) {
+          finish(JSON.parse(event.data));
+        } else if (!text) {
+          source.close();
+          settled = true;
+          api.generateReport(interviewId).then(resolve);
+        } else {
+          finish({ success: false, error: 'Connection lost while generating report' });
+        }
+      });
+    });
+  },
+
   getInterviewReport: async (interviewId) => {
     try {
       const response = await fetch(`${API_BASE_URL}/interview-report/${interviewId}`);